@@ -0,0 +1,418 @@
+"""
+    Benchmark suite - synthetic workspaces and timings
+"""
+
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from scythe import __version__
+from scythe.models.models import ArtifactInfo, Project, ProjectType, ScanResult
+from scythe.models.compact import CompactScanResult
+from scythe.scanner.scanner import scan_directory
+from scythe.rules.rules import ARTIFACT_PATTERNS, PROJECT_MARKERS
+from scythe.scanner.threaded import free_threaded
+from scythe.cleaner.cleaner import clean_artifacts
+from scythe.formatter.formatter import format_to_json, format_to_csv
+from scythe.utils.utils import calculate_directory_size
+from scythe.logger.logger import get_logger
+
+# Version of the JSON report layout
+REPORT_VERSION = 1
+
+# Name given to '*' in marker and artifact patterns (*.csproj, *.egg-info)
+WILDCARD_NAME = "bench"
+
+# Directory holding the targets of hard-linked artifact files
+SHARED_STORE = "shared-store"
+
+
+@dataclass
+class WorkspaceConfig:
+    """
+        Shape of a synthetic workspace, the same seed gives the same tree
+    """
+    projects: int = 100
+    depth: int = 2
+    fan_out: int = 4
+    files: int = 8
+    artifact_depth: int = 2
+    file_size: int = 1024
+    hardlink_ratio: float = 0.0
+    seed: int = 42
+
+
+@dataclass
+class WorkspaceStats:
+    projects: int = 0
+    directories: int = 0
+    files: int = 0
+    hard_links: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    timings: List[float] = field(default_factory=list)
+
+    @property
+    def best(self) -> float:
+        return min(self.timings)
+
+    @property
+    def mean(self) -> float:
+        return statistics.mean(self.timings)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings)
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.timings) if len(self.timings) > 1 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "runs": len(self.timings),
+            "best": self.best,
+            "mean": self.mean,
+            "median": self.median,
+            "stdev": self.stdev,
+            "timings": self.timings
+        }
+
+
+def project_layout(project_type: ProjectType) -> Tuple[str, List[str]]:
+    """
+        Marker file and artifact directories generated for a project type
+    """
+    marker = PROJECT_MARKERS[project_type][0].replace('*', WILDCARD_NAME)
+    artifacts = [
+        pattern.replace('*', WILDCARD_NAME)
+        for pattern in ARTIFACT_PATTERNS.get(project_type, [])
+        if '/' not in pattern and not pattern.startswith('.coverage')
+    ]
+    return marker, artifacts[:2]
+
+
+PROJECT_TYPES = [project_type for project_type in ProjectType if project_type in PROJECT_MARKERS]
+
+
+class WorkspaceGenerator:
+    """
+        Build a reproducible workspace of projects of every type
+    """
+
+    def __init__(self, root: Path, config: WorkspaceConfig):
+        self.root = Path(root)
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.stats = WorkspaceStats()
+        self.store: List[Path] = []
+
+    def generate(self) -> WorkspaceStats:
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._make_store()
+
+        parents = self._make_parents()
+        for index in range(self.config.projects):
+            project_type = PROJECT_TYPES[index % len(PROJECT_TYPES)]
+            parent = parents[index % len(parents)]
+            self._make_project(parent / f"{project_type.value}-{index}", project_type)
+
+        return self.stats
+
+    def _make_parents(self) -> List[Path]:
+        """
+            Directories of depth `depth` below the root, `fan_out` children each
+        """
+        level = [self.root]
+        for depth in range(self.config.depth):
+            level = [
+                parent / f"group-{depth}-{child}"
+                for parent in level
+                for child in range(self.config.fan_out)
+            ]
+            for directory in level:
+                self._mkdir(directory)
+        return level
+
+    def _make_store(self) -> None:
+        if self.config.hardlink_ratio <= 0:
+            return
+
+        store = self.root / SHARED_STORE
+        self._mkdir(store)
+        for index in range(max(1, self.config.files)):
+            path = store / f"blob-{index}.bin"
+            self._write(path)
+            self.store.append(path)
+
+    def _make_project(self, path: Path, project_type: ProjectType) -> None:
+        marker, artifacts = project_layout(project_type)
+
+        self._mkdir(path / "src")
+        self._write(path / marker, size=64)
+        for index in range(self.config.files):
+            self._write(path / "src" / f"source-{index}.txt")
+
+        for artifact in artifacts:
+            self._make_artifact_tree(path / artifact, self.config.artifact_depth)
+
+        self.stats.projects += 1
+
+    def _make_artifact_tree(self, path: Path, depth: int) -> None:
+        self._mkdir(path)
+        for index in range(self.config.files):
+            target = path / f"file-{index}.bin"
+            if self.store and self.random.random() < self.config.hardlink_ratio:
+                self._link(self.random.choice(self.store), target)
+            else:
+                self._write(target)
+
+        if depth > 0:
+            for child in range(self.config.fan_out):
+                self._make_artifact_tree(path / f"dir-{child}", depth - 1)
+
+    def _mkdir(self, path: Path) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        self.stats.directories += 1
+
+    def _write(self, path: Path, size: Optional[int] = None) -> None:
+        if size is None:
+            size = self.random.randint(1, max(1, 2 * self.config.file_size))
+        path.write_bytes(b"x" * size)
+        self.stats.files += 1
+        self.stats.bytes += size
+
+    def _link(self, source: Path, target: Path) -> None:
+        try:
+            os.link(source, target)
+        except OSError:
+            # File system without hard links, keep the tree shape
+            shutil.copyfile(source, target)
+            self.stats.bytes += source.stat().st_size
+        else:
+            self.stats.hard_links += 1
+        self.stats.files += 1
+
+
+def generate_workspace(root: Path, config: Optional[WorkspaceConfig] = None) -> WorkspaceStats:
+    return WorkspaceGenerator(root, config or WorkspaceConfig()).generate()
+
+
+def time_call(name: str,
+              func: Callable[[], Any],
+              repeat: int = 3,
+              setup: Optional[Callable[[], None]] = None) -> BenchmarkResult:
+    """
+        Run func `repeat` times, setup runs before each run and is not timed
+    """
+    result = BenchmarkResult(name=name)
+    for _ in range(max(1, repeat)):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        result.timings.append(time.perf_counter() - start)
+    return result
+
+
+def synthetic_projects(artifacts: int, per_project: int = 2, seed: int = 42):
+    """
+        In-memory projects shaped like a scan result, no file system involved
+    """
+    rnd = random.Random(seed)
+    now = datetime.now()
+    for index in range(0, artifacts, per_project):
+        project_type = PROJECT_TYPES[index % len(PROJECT_TYPES)]
+        marker, names = project_layout(project_type)
+        path = Path("/bench") / f"group-{index % 97}" / f"{project_type.value}-{index}"
+        yield Project(
+            path=path,
+            project_type=project_type,
+            marker_files=[marker],
+            artifacts=[
+                ArtifactInfo(
+                    path=path / names[number % len(names)],
+                    size_bytes=rnd.randint(1, 1 << 30),
+                    last_modified=now,
+                    artifact_type=names[number % len(names)]
+                )
+                for number in range(min(per_project, artifacts - index))
+            ]
+        )
+
+
+def measure_memory(build: Callable[[], Any]) -> int:
+    """
+        Bytes still allocated by build() once it returns
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return allocated
+
+
+def result_memory(artifacts: int) -> Dict[str, Any]:
+    """
+        Memory of a ScanResult of `artifacts` artifacts, objects vs columns
+    """
+    def objects() -> ScanResult:
+        return ScanResult(root_path=Path("/bench"), projects=list(synthetic_projects(artifacts)))
+
+    def columns() -> CompactScanResult:
+        compact = CompactScanResult(root_path=Path("/bench"))
+        compact.extend(synthetic_projects(artifacts))
+        return compact
+
+    objects_bytes = measure_memory(objects)
+    compact_bytes = measure_memory(columns)
+
+    return {
+        "artifacts": artifacts,
+        "scan_result_bytes": objects_bytes,
+        "scan_result_build": time_call("scan_result_build", objects, repeat=1).best,
+        "compact_bytes": compact_bytes,
+        "compact_build": time_call("compact_build", columns, repeat=1).best,
+        "ratio": objects_bytes / compact_bytes if compact_bytes else None
+    }
+
+
+def run_benchmarks(config: Optional[WorkspaceConfig] = None,
+                   repeat: int = 3,
+                   jobs: int = 1,
+                   workdir: Optional[Path] = None,
+                   real_clean: bool = True,
+                   keep: bool = False,
+                   memory_artifacts: int = 0,
+                   walkers: Optional[List[int]] = None,
+                   progress_callback: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+        Generate a workspace and time scan, sizing, formatting and cleaning
+        walkers: thread counts of the scaling runs (scan and sizing walks)
+        return: machine readable report
+    """
+    config = config or WorkspaceConfig()
+    base = Path(tempfile.mkdtemp(prefix="scythe-bench-", dir=workdir))
+    logger = get_logger()
+
+    def report(message: str) -> None:
+        logger.debug(message)
+        if progress_callback:
+            progress_callback(message)
+
+    try:
+        root = base / "workspace"
+        report("Generating workspace")
+        start = time.perf_counter()
+        stats = generate_workspace(root, config)
+        generate_duration = time.perf_counter() - start
+
+        results: List[BenchmarkResult] = []
+        scan_result = None
+
+        def scan() -> None:
+            nonlocal scan_result
+            scan_result = scan_directory(root, jobs=jobs)
+
+        report("Timing scan_directory")
+        results.append(time_call("scan_directory", scan, repeat))
+
+        report("Timing calculate_directory_size")
+        results.append(time_call("calculate_directory_size", lambda: calculate_directory_size(root), repeat))
+
+        report("Timing formatters")
+        results.append(time_call("format_json", lambda: format_to_json(scan_result), repeat))
+        results.append(time_call("format_csv", lambda: format_to_csv(scan_result), repeat))
+
+        report("Timing clean_artifacts (dry run)")
+        results.append(time_call(
+            "clean_dry_run",
+            lambda: clean_artifacts(scan_result.projects, dry_run=True, jobs=jobs),
+            repeat
+        ))
+
+        if real_clean:
+            report("Timing clean_artifacts")
+            clean_root = base / "clean"
+            projects = []
+
+            def fresh_workspace() -> None:
+                nonlocal projects
+                shutil.rmtree(clean_root, ignore_errors=True)
+                generate_workspace(clean_root, config)
+                projects = scan_directory(clean_root, jobs=jobs).projects
+
+            results.append(time_call(
+                "clean",
+                lambda: clean_artifacts(projects, jobs=jobs),
+                repeat,
+                setup=fresh_workspace
+            ))
+
+        scaling = []
+        for count in walkers or ():
+            report(f"Timing the walks on {count} threads")
+            scan_run = time_call(
+                f"scan_directory[walkers={count}]", lambda: scan_directory(root, jobs=jobs, walkers=count), repeat
+            )
+            size_run = time_call(
+                f"calculate_directory_size[jobs={count}]", lambda: calculate_directory_size(root, jobs=count), repeat
+            )
+            results.extend([scan_run, size_run])
+            scaling.append({"threads": count, "scan": scan_run.best, "size": size_run.best})
+
+        for run in scaling:
+            run["scan_speedup"] = scaling[0]["scan"] / run["scan"]
+            run["size_speedup"] = scaling[0]["size"] / run["size"]
+
+        memory = None
+        if memory_artifacts:
+            report("Measuring result memory")
+            memory = result_memory(memory_artifacts)
+
+        return {
+            "version": REPORT_VERSION,
+            "scythe_version": __version__,
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "free_threaded": free_threaded(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "jobs": jobs,
+            "repeat": repeat,
+            "config": asdict(config),
+            "workspace": {
+                **asdict(stats),
+                "generate_duration": generate_duration,
+                "projects_found": scan_result.total_projects,
+                "artifacts_found": scan_result.total_artifacts,
+                "artifacts_bytes": scan_result.total_artifacts_size
+            },
+            "results": [result.to_dict() for result in results],
+            "scaling": scaling,
+            "memory": memory
+        }
+    finally:
+        if keep:
+            report(f"Workspace kept in {base}")
+        else:
+            shutil.rmtree(base, ignore_errors=True)
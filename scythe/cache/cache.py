@@ -0,0 +1,369 @@
+"""
+    Persistent scan cache
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from scythe.models.models import AnyProjectType, ArtifactInfo, DiskUsage, get_project_type
+from scythe.utils.utils import DirectoryListing, user_cache_dir
+from scythe.logger.logger import get_logger
+
+SCHEMA_VERSION = 4
+
+# Seconds a writer waits for the database lock held by another process
+BUSY_TIMEOUT = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT NOT NULL,
+    follow_symlinks INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    dev INTEGER NOT NULL,
+    files TEXT NOT NULL,
+    directories TEXT NOT NULL,
+    project_type TEXT,
+    rules TEXT NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (path, follow_symlinks)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT NOT NULL,
+    follow_symlinks INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    dev INTEGER NOT NULL,
+    apparent_bytes INTEGER NOT NULL,
+    allocated_bytes INTEGER NOT NULL,
+    last_used REAL,
+    directories TEXT NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (path, follow_symlinks)
+);
+"""
+
+
+def default_cache_path() -> Path:
+    return user_cache_dir() / "scan-cache.sqlite3"
+
+
+def stat_key(stat_result: os.stat_result) -> Tuple[int, int, int]:
+    return stat_result.st_mtime_ns, stat_result.st_ino, stat_result.st_dev
+
+
+class CachedEntry:
+    """
+        DirEntry look-alike rebuilt from a cached directory listing
+    """
+
+    __slots__ = ('name', 'path', '_is_dir', '_is_symlink')
+
+    def __init__(self, parent: Path, name: str, is_dir: bool, is_symlink: bool):
+        self.name = name
+        self.path = os.path.join(parent, name)
+        self._is_dir = is_dir
+        self._is_symlink = is_symlink
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return self._is_dir
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        return not self._is_dir
+
+    def is_symlink(self) -> bool:
+        return self._is_symlink
+
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        return os.stat(self.path, follow_symlinks=follow_symlinks)
+
+
+class ScanCache:
+    """
+        SQLite cache of directory listings and artifact sizes
+
+        Entries are keyed by path and validated by (st_mtime_ns, st_ino, st_dev).
+        A directory listing is reused while the directory itself is unchanged
+        and the rules it was matched with are the same.
+        An artifact size is reused while the artifact root and every
+        directory below it keep their (st_mtime_ns, st_ino): the tree is
+        re-stat'ed directory by directory instead of file by file. A file
+        created, deleted or renamed anywhere in the artifact changes the
+        mtime of its directory; a file rewritten in place does not.
+        Lookups and writes may come from several threads (async scans).
+
+        Attributes :
+        path, follow_symlinks, hits, misses
+    """
+
+    def __init__(self, path: Optional[Path] = None, follow_symlinks: bool = False):
+        self.path = Path(path) if path else default_cache_path()
+        self.follow_symlinks = follow_symlinks
+        self.logger = get_logger()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._pending_directories: List[Tuple] = []
+        self._pending_artifacts: List[Tuple[ArtifactInfo, Tuple[int, int, int], Union[DiskUsage, Future]]] = []
+        self._seen_directories: List[Tuple[str, int]] = []
+        self._seen_artifacts: List[Tuple[str, int]] = []
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT, check_same_thread=False)
+        # Readers do not block the writer, sharded workers flush concurrently
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.RLock()
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.connection.executescript(
+                "DROP TABLE IF EXISTS directories; DROP TABLE IF EXISTS artifacts;"
+            )
+        self.connection.executescript(SCHEMA)
+        self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.connection.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return (self.hits / total) * 100
+
+    @property
+    def pending_count(self) -> int:
+        return (
+            len(self._pending_directories) + len(self._pending_artifacts)
+            + len(self._seen_directories) + len(self._seen_artifacts)
+        )
+
+    def get_listing(
+            self,
+            directory: Path,
+            stat_result: os.stat_result,
+            rules: str = ""
+    ) -> Optional[Tuple[DirectoryListing, Optional[AnyProjectType]]]:
+        """
+            Cached listing and project type of an unchanged directory
+            rules: RuleSet.cache_key the project type was detected with
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT mtime_ns, ino, dev, files, directories, project_type, rules "
+                "FROM directories WHERE path = ? AND follow_symlinks = ?",
+                (str(directory), int(self.follow_symlinks))
+            ).fetchone()
+
+            if row is None or tuple(row[:3]) != stat_key(stat_result) or row[6] != rules:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._seen_directories.append((str(directory), int(self.follow_symlinks)))
+
+        listing = DirectoryListing(path=directory)
+        for name, is_symlink in json.loads(row[3]):
+            listing.files.append(CachedEntry(directory, name, False, is_symlink))
+        for name, is_symlink in json.loads(row[4]):
+            listing.directories.append(CachedEntry(directory, name, True, is_symlink))
+        listing.file_names = {f.name for f in listing.files}
+
+        project_type = get_project_type(row[5]) if row[5] else None
+        return listing, project_type
+
+    def put_listing(
+            self,
+            listing: DirectoryListing,
+            stat_result: os.stat_result,
+            project_type: Optional[AnyProjectType],
+            rules: str = ""
+    ) -> None:
+        files = [[f.name, f.is_symlink()] for f in listing.files]
+        directories = [[d.name, d.is_symlink()] for d in listing.directories]
+
+        entry = (
+            str(listing.path),
+            int(self.follow_symlinks),
+            *stat_key(stat_result),
+            json.dumps(files),
+            json.dumps(directories),
+            project_type.value if project_type else None,
+            rules,
+            time.time(),
+        )
+        with self._lock:
+            self._pending_directories.append(entry)
+
+    def get_artifact_usage(self, path: Path, stat_result: os.stat_result) -> Optional[DiskUsage]:
+        """
+            Cached usage of an artifact whose directories are all unchanged
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT mtime_ns, ino, dev, apparent_bytes, allocated_bytes, last_used, directories "
+                "FROM artifacts WHERE path = ? AND follow_symlinks = ?",
+                (str(path), int(self.follow_symlinks))
+            ).fetchone()
+
+        if row is None or tuple(row[:3]) != stat_key(stat_result) or not self._unchanged(path, row[6]):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self._seen_artifacts.append((str(path), int(self.follow_symlinks)))
+        return DiskUsage(apparent_bytes=row[3], allocated_bytes=row[4], last_used=row[5])
+
+    def _unchanged(self, path: Path, directories: str) -> bool:
+        for relative_path, mtime_ns, ino in json.loads(directories):
+            try:
+                stat_result = os.stat(os.path.join(path, relative_path), follow_symlinks=self.follow_symlinks)
+            except OSError:
+                return False
+            if stat_result.st_mtime_ns != mtime_ns or stat_result.st_ino != ino:
+                return False
+        return True
+
+    def remember_artifact(
+            self,
+            artifact: ArtifactInfo,
+            stat_result: os.stat_result,
+            usage: Union[DiskUsage, Future]
+    ) -> None:
+        """
+            Store the size of an artifact once it is known, see flush()
+            usage: measured with directories tracked, or the Future of a
+            deferred measure
+        """
+        with self._lock:
+            self._pending_artifacts.append((artifact, stat_key(stat_result), usage))
+
+    @staticmethod
+    def _directory_keys(artifact: ArtifactInfo, usage: Union[DiskUsage, Future]) -> Optional[str]:
+        """
+            JSON of the [relative path, mtime_ns, ino] of the artifact's
+            sub directories, None when they were not tracked
+        """
+        if isinstance(usage, Future):
+            usage = usage.result()
+        if usage.directories is None:
+            return None
+
+        prefix = len(str(artifact.path)) + 1
+        return json.dumps([[path[prefix:], mtime_ns, ino] for path, mtime_ns, ino in usage.directories])
+
+    def flush(self) -> None:
+        """
+            Write pending entries, artifacts must be fully sized
+        """
+        with self._lock:
+            now = time.time()
+
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        self._pending_directories
+                    )
+                    artifacts = [
+                        (a, key, self._directory_keys(a, usage)) for a, key, usage in self._pending_artifacts
+                    ]
+                    self.connection.executemany(
+                        "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                str(a.path), int(self.follow_symlinks), *key,
+                                a.apparent_bytes if a.apparent_bytes is not None else a.size_bytes,
+                                a.allocated_bytes if a.allocated_bytes is not None else a.size_bytes,
+                                a.last_used.timestamp() if a.last_used else None,
+                                directories,
+                                now
+                            )
+                            for a, key, directories in artifacts
+                            if directories is not None
+                        ]
+                    )
+                    self.connection.executemany(
+                        "UPDATE directories SET last_seen = ? WHERE path = ? AND follow_symlinks = ?",
+                        [(now, *key) for key in self._seen_directories]
+                    )
+                    self.connection.executemany(
+                        "UPDATE artifacts SET last_seen = ? WHERE path = ? AND follow_symlinks = ?",
+                        [(now, *key) for key in self._seen_artifacts]
+                    )
+            except sqlite3.Error as e:
+                self.logger.warning(f"Cannot write the scan cache {self.path}: {e}")
+
+            self._pending_directories = []
+            self._pending_artifacts = []
+            self._seen_directories = []
+            self._seen_artifacts = []
+
+    def prune(self, max_age_days: Optional[float] = None, prune_all: bool = False) -> int:
+        """
+            Remove entries of deleted paths and entries not seen for max_age_days
+            return: number of removed entries
+        """
+        removed = 0
+
+        with self.connection:
+            for table in ("directories", "artifacts"):
+                if prune_all:
+                    removed += self.connection.execute(f"DELETE FROM {table}").rowcount
+                    continue
+
+                if max_age_days is not None:
+                    cutoff = time.time() - max_age_days * 86400
+                    removed += self.connection.execute(
+                        f"DELETE FROM {table} WHERE last_seen < ?", (cutoff,)
+                    ).rowcount
+
+                missing = [
+                    (path,)
+                    for (path,) in self.connection.execute(f"SELECT DISTINCT path FROM {table}")
+                    if not os.path.lexists(path)
+                ]
+                removed += self.connection.executemany(
+                    f"DELETE FROM {table} WHERE path = ?", missing
+                ).rowcount
+
+        self.connection.execute("VACUUM")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        directories = self.connection.execute("SELECT COUNT(*) FROM directories").fetchone()[0]
+        artifacts, artifacts_size = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(apparent_bytes), 0) FROM artifacts"
+        ).fetchone()
+        oldest = self.connection.execute(
+            "SELECT MIN(last_seen) FROM (SELECT last_seen FROM directories "
+            "UNION ALL SELECT last_seen FROM artifacts)"
+        ).fetchone()[0]
+
+        return {
+            "path": str(self.path),
+            "file_size": self.path.stat().st_size if self.path.exists() else 0,
+            "directories": directories,
+            "artifacts": artifacts,
+            "artifacts_size": artifacts_size,
+            "oldest_entry": oldest,
+        }
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
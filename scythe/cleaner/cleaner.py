@@ -2,14 +2,73 @@
 Cleaner of Artifacts
 """
 
-import shutil
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Callable
+from typing import Dict, Iterable, List, Optional, Callable, Tuple
 from datetime import datetime
 
 from scythe.models.models import Project, ArtifactInfo, CleanResult
+from scythe.cleaner.trash import Trash, spawn_purge_worker
+from scythe.cleaner.deleter import TreeDeleter, remove_tree
+from scythe.mounts.mounts import mount_point
 from scythe.logger.logger import get_logger
+from scythe.progress.progress import ProgressReporter
+
+# Levels of an artifact looked into for entries to delete in parallel
+FAN_OUT_DEPTH = 4
+
+
+def free_bytes(path: Path) -> Optional[int]:
+    """
+        Free bytes of the file system holding path, None without os.statvfs
+    """
+    if not hasattr(os, "statvfs"):
+        return None
+    try:
+        stat_result = os.statvfs(path)
+    except OSError:
+        return None
+    return stat_result.f_bfree * stat_result.f_frsize
+
+
+class FreeSpaceProbe:
+    """
+        Free space of the file systems of a clean, before and after
+
+        One os.statvfs per file system on each side. The delta also holds
+        whatever other processes wrote or deleted there in the meantime.
+    """
+
+    def __init__(self, paths: Iterable[Path]):
+        self.before: Dict[int, Tuple[Path, int]] = {}
+
+        for path in paths:
+            try:
+                device = os.lstat(path).st_dev
+            except OSError:
+                continue
+            if device in self.before:
+                continue
+
+            root = mount_point(path)
+            free = free_bytes(root)
+            if free is not None:
+                self.before[device] = (root, free)
+
+    def delta(self) -> Dict[str, int]:
+        """
+            Bytes freed per mount point since the probe was created
+        """
+        deltas = {}
+        for root, free in self.before.values():
+            after = free_bytes(root)
+            if after is not None:
+                deltas[str(root)] = after - free
+        return deltas
+
 
 class ArtifactCleaner:
 
@@ -20,6 +79,30 @@ class ArtifactCleaner:
     dry_run
     verbose
     progress_callback
+    progress
+    jobs
+    instant
+
+    With jobs > 1, artifacts are deleted concurrently and the entries of
+    each artifact are removed in parallel: its top level entries, or the
+    entries of the first level below holding at least jobs directories
+    (FAN_OUT_DEPTH levels at most), so that a target/ holding a single
+    debug/ is not deleted by one thread. Counters, errors and progress
+    callbacks are guarded by a lock.
+
+    With instant, artifacts are renamed into a trash directory of their
+    filesystem and unlinked afterwards by a detached worker (detach=True)
+    or by scythe.cleaner.trash.purge().
+
+    Files and trees are removed by a TreeDeleter (directory fd walk,
+    dir_fd-relative unlinks), which counts the entries removed and the
+    bytes of the inodes it released. CleanResult reports these measured
+    bytes next to the scan estimate (space_freed) and the free space
+    gained by every file system (statvfs before and after).
+
+    progress_callback is called once per project, progress (a
+    ProgressReporter) counts deleted artifacts and bytes against the
+    total of the projects to clean.
     """
 
     def __init__(
@@ -27,13 +110,26 @@ class ArtifactCleaner:
             dry_run: bool = False,
             verbose: bool = False,
             progress_callback: Optional[Callable[[str], None]] = None,
+            jobs: int = 1,
+            instant: bool = False,
+            detach: bool = True,
+            progress: Optional[ProgressReporter] = None,
     ):
 
         self.dry_run = dry_run
         self.verbose = verbose
         self.progress_callback = progress_callback
+        self.jobs = max(1, jobs)
+        self.instant = instant
+        self.detach = detach
+        self.progress = progress
+        self.trash = Trash()
+        self.deleter = TreeDeleter()
         self.logger = get_logger()
 
+        self._lock = threading.Lock()
+        self._subtree_executor: Optional[ThreadPoolExecutor] = None
+
         self.artifacts_deleted = 0
         self.space_freed = 0
         self.errors: List[str] = []
@@ -50,17 +146,38 @@ class ArtifactCleaner:
         self.space_freed = 0
         self.errors = []
         self.skipped = []
+        self.deleter = TreeDeleter()
+
+        probe = None
+        if not self.dry_run :
+            probe = FreeSpaceProbe(a.path for p in projects for a in p.artifacts)
+
+        if self.progress :
+            self.progress.start(
+                bytes_total=sum(a.size_bytes for p in projects for a in p.artifacts),
+                items_total=sum(len(p.artifacts) for p in projects)
+            )
+
+        if self.jobs > 1 :
+            projects_cleaned = self._clean_projects_parallel(projects)
+        else :
+            projects_cleaned = []
 
-        projects_cleaned = []
+            for project in projects:
+                self._report_progress(f"Cleaning {project.path.name}")
 
-        for project in projects:
-            if self.progress_callback :
-                self.progress_callback(f"Cleaning {project.path.name}")
+                if self.clean_project(project):
+                    projects_cleaned.append(project)
 
-            if self.clean_project(project):
-                projects_cleaned.append(project)
+        trash_dirs = [str(d) for d in self.trash.trash_dirs]
+        if self.instant and trash_dirs and self.detach :
+            spawn_purge_worker()
 
         clean_duration = time.time() - start_time
+        if self.progress :
+            self.progress.finish()
+
+        observed = probe.delta() if probe else {}
 
         result = CleanResult(
             projects_cleaned=projects_cleaned,
@@ -69,16 +186,69 @@ class ArtifactCleaner:
             errors=self.errors,
             skipped=self.skipped,
             clean_duration=clean_duration,
-            dry_run=self.dry_run
+            dry_run=self.dry_run,
+            trash_dirs=trash_dirs,
+            entries_removed=self.deleter.entries,
+            space_freed_measured=None if self.dry_run or self.instant else self.deleter.bytes_freed,
+            inodes_freed=self.deleter.inodes_freed,
+            space_freed_observed=sum(observed.values()) if observed else None,
+            space_freed_by_filesystem=observed
         )
 
         self.logger.info(
             f"Clean ends in {clean_duration:.2f}s - "
-            f"{self.artifacts_deleted} artifacts deleted"
+            f"{self.artifacts_deleted} artifacts deleted, "
+            f"{result.entries_removed} entries ({result.entries_per_second:.0f}/s)"
         )
 
         return result
 
+    def _clean_projects_parallel(self, projects: List[Project]) -> List[Project]:
+        """
+            Delete every artifact on a pool, projects are returned in input order
+        """
+        with ThreadPoolExecutor(self.jobs, thread_name_prefix="scythe-clean") as artifact_executor, \
+                ThreadPoolExecutor(self.jobs, thread_name_prefix="scythe-clean-tree") as subtree_executor:
+            self._subtree_executor = subtree_executor
+
+            try:
+                futures = []
+                for project in projects:
+                    remaining = [len(project.artifacts)]
+                    if not project.artifacts :
+                        self.logger.debug(f"Noting to clean in {project.path}")
+                        self._report_progress(f"Cleaning {project.path.name}")
+
+                    project_futures = []
+                    for artifact in project.artifacts :
+                        future = artifact_executor.submit(self.clean_artifact, artifact)
+                        future.add_done_callback(
+                            lambda _, p=project, r=remaining: self._artifact_done(p, r)
+                        )
+                        project_futures.append(future)
+                    futures.append(project_futures)
+
+                return [
+                    project
+                    for project, project_futures in zip(projects, futures)
+                    if any([f.result() for f in project_futures])
+                ]
+            finally:
+                self._subtree_executor = None
+
+    def _artifact_done(self, project: Project, remaining: List[int]) -> None:
+        with self._lock:
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+
+        if finished :
+            self._report_progress(f"Cleaning {project.path.name}")
+
+    def _report_progress(self, message: str) -> None:
+        if self.progress_callback :
+            with self._lock:
+                self.progress_callback(message)
+
     def clean_project(self, project: Project)-> bool:
         if not project.artifacts:
             self.logger.debug(f"Noting to clean in {project.path}")
@@ -94,77 +264,149 @@ class ArtifactCleaner:
 
 
     def clean_artifact(self, artifact: ArtifactInfo)-> bool:
+        cleaned = self._remove_artifact(artifact)
+
+        if self.progress :
+            self.progress.item_done(artifact.size_bytes, str(artifact.path))
+
+        return cleaned
+
+    def _remove_artifact(self, artifact: ArtifactInfo)-> bool:
         artifact_path = artifact.path
 
         try:
             if not artifact_path.exists() : #Check a valid path
                 self.logger.debug(f"Artifact removed: {artifact_path}")
-                self.skipped.append(str(artifact_path))
+                with self._lock:
+                    self.skipped.append(str(artifact_path))
                 return False
 
             #Simulation
             if self.dry_run :
                 self.logger.info(f"[DRY-RUN] Removing {artifact_path}")
-                self.artifacts_deleted +=1
-                self.space_freed += artifact.size_bytes
+                self._record_deleted(artifact)
                 return True
 
             #Real world removing :)
-            if artifact_path.is_dir():
-                self._delete_directory(artifact_path)
+            if self.instant :
+                staged_path = self.trash.stage(artifact_path)
+                self.logger.debug(f"Moved {artifact_path} to {staged_path}")
+            elif artifact_path.is_dir():
+                self._delete_tree(artifact_path)
             else:
                 self._delete_file(artifact_path)
 
-            self.artifacts_deleted +=1
-            self.space_freed += artifact.size_bytes
+            self._record_deleted(artifact)
 
             self.logger.info(f"✓ Deleted : {artifact_path}")
 
             return True
 
         except PermissionError as e :
-            error_msg = f"Permission Denied: {artifact_path}"
-            self.logger.error(error_msg)
-            self.errors.append(error_msg)
+            self._record_error(f"Permission Denied: {artifact_path}")
             return False
 
         except OSError as e :
-            error_msg = f"Can\'t remove {artifact_path}: {e}"
-            self.logger.error(error_msg)
-            self.errors.append(error_msg)
+            self._record_error(f"Can\'t remove {artifact_path}: {e}")
             return False
 
         except Exception as e:
-            error_msg = f"Unknown error {artifact_path}: {e}"
-            self.logger.error(error_msg)
-            self.errors.append(error_msg)
+            self._record_error(f"Unknown error {artifact_path}: {e}")
             return False
 
-    @staticmethod
-    def _delete_directory(path: Path)-> None:
+    def _record_deleted(self, artifact: ArtifactInfo) -> None:
+        with self._lock:
+            self.artifacts_deleted +=1
+            self.space_freed += artifact.size_bytes
+
+    def _record_error(self, error_msg: str) -> None:
+        self.logger.error(error_msg)
+        with self._lock:
+            self.errors.append(error_msg)
+
+    def _delete_tree(self, path: Path) -> None:
+        """
+            Delete a directory, its entries in parallel when a subtree pool
+            is running (see _fan_out)
+            raise: OSError naming every entry that could not be removed
+        """
+        if self._subtree_executor is None :
+            self._delete_directory(path)
+            return
+
+        directories, entries = self._fan_out(path)
+        futures = [self._subtree_executor.submit(self._delete_entry, entry) for entry in entries]
+
+        failures = [e for e in (f.exception() for f in futures) if e is not None]
+        if len(failures) == 1 :
+            raise failures[0]
+        if failures :
+            raise OSError(f"{len(failures)} entries not removed: " + "; ".join(str(e) for e in failures))
+
+        # Emptied by the entries, deepest first
+        for directory in reversed(directories):
+            self.deleter.remove(directory)
+
+    def _fan_out(self, path: Path) -> Tuple[List[str], List[str]]:
+        """
+            Split a directory into entries to delete in parallel, going one
+            level deeper while a level holds fewer directories than jobs
+            return: (directories left empty by the entries, parents first; entries)
+        """
+        directories: List[str] = []
+        files: List[str] = []
+        level = [str(path)]
+
+        for _ in range(FAN_OUT_DEPTH):
+            directories.extend(level)
+            sub_directories = []
+            for directory in level:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            sub_directories.append(entry.path)
+                        else:
+                            files.append(entry.path)
+            level = sub_directories
+
+            if not level or len(level) >= self.jobs:
+                break
+
+        return directories, files + level
+
+    def _delete_entry(self, path: str) -> None:
+        self.deleter.remove(path)
+
+    def _delete_directory(self, path: Path)-> None:
 
         if not path.is_dir() :
             raise ValueError(f"Not a directory: {path}")
 
-        shutil.rmtree(path, ignore_errors=False)
+        self.deleter.remove(path)
 
     def _delete_file(self, path: Path)-> None:
 
         if not path.is_file() :
             raise ValueError(f"Not a file: {path}")
 
-        path.unlink()
+        self.deleter.remove(path)
 
 
 def clean_artifacts(
         projects: List[Project],
         dry_run: bool = False,
-        progress_callback: Optional[Callable[[str], None]] = None
+        progress_callback: Optional[Callable[[str], None]] = None,
+        jobs: int = 1,
+        instant: bool = False,
+        progress: Optional[ProgressReporter] = None
     ) -> CleanResult:
 
         cleaner = ArtifactCleaner(
             dry_run=dry_run,
-            progress_callback=progress_callback
+            progress_callback=progress_callback,
+            jobs=jobs,
+            instant=instant,
+            progress=progress
         )
         return cleaner.clean_projects(projects)
 
@@ -175,10 +417,8 @@ def safe_delete(path: Path, dry_run: bool = False) -> bool:
             return path.exists()
 
         try:
-            if path.is_dir() :
-                shutil.rmtree(path)
-            elif path.is_file() :
-                path.unlink()
+            if path.is_dir() or path.is_file() :
+                remove_tree(path)
             else:
                 return False
 
@@ -0,0 +1,190 @@
+"""
+    Deletion engine - trees removed through directory fds
+"""
+
+import os
+import stat
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from scythe.fdwalk.fdwalk import DIRECTORY_FDS, FD_WALK, FdBudget, open_directory
+
+
+def allocated_bytes(stat_result: os.stat_result) -> int:
+    """
+        Disk blocks of an inode (st_size where st_blocks is not available)
+    """
+    blocks = getattr(stat_result, "st_blocks", None)
+    return blocks * 512 if blocks is not None else stat_result.st_size
+
+
+class DeletionCounts:
+    """
+        Entries removed by one deletion, kept when it fails half way
+    """
+
+    __slots__ = ("files", "directories", "bytes_removed", "bytes_freed", "inodes_freed")
+
+    def __init__(self):
+        self.files = 0
+        self.directories = 0
+        self.bytes_removed = 0
+        self.bytes_freed = 0
+        self.inodes_freed = 0
+
+    def unlinked(self, stat_result: os.stat_result) -> None:
+        """
+            Account a file unlinked after stat_result was taken
+        """
+        self.files += 1
+        self.bytes_removed += stat_result.st_size
+        # Its last link: the inode and its blocks are released
+        if stat_result.st_nlink <= 1:
+            self.inodes_freed += 1
+            self.bytes_freed += allocated_bytes(stat_result)
+
+    def removed_directory(self, allocated: int) -> None:
+        self.directories += 1
+        self.inodes_freed += 1
+        self.bytes_freed += allocated
+
+
+class TreeDeleter:
+    """
+        Delete files and directory trees
+
+        A tree is emptied depth first through directory fds: each directory
+        is opened relative to its parent, listed once with os.scandir(fd),
+        its files are unlinked by name (os.unlink with dir_fd) and its
+        sub directories are removed with os.rmdir(name, dir_fd) once empty.
+        Leaf directories are removed right after their files, without
+        being listed again. Symlinks are unlinked, never followed.
+        Every entry is stat'ed once, through the listing, right before it
+        is removed: bytes_removed adds up the st_size of the unlinked files,
+        bytes_freed the allocated blocks of the inodes actually released,
+        files whose last link was removed (st_nlink was 1) and directories.
+        A file with hard links outside the tree frees nothing.
+        Past the fd budget, and on systems without dir_fd support, the
+        same walk is done with paths.
+        Thread safe, the counters sum every deletion.
+
+        Attributes :
+        budget, files, directories, bytes_removed, bytes_freed, inodes_freed
+    """
+
+    def __init__(self, budget: Optional[FdBudget] = None):
+        self.budget = budget or DIRECTORY_FDS
+        self.files = 0
+        self.directories = 0
+        self.bytes_removed = 0
+        self.bytes_freed = 0
+        self.inodes_freed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self) -> int:
+        return self.files + self.directories
+
+    def remove(self, path: Union[str, Path]) -> None:
+        """
+            Delete a file, a symlink or a directory tree
+            raise: OSError on the first entry that cannot be removed
+        """
+        path = str(path)
+        counts = DeletionCounts()
+
+        try:
+            stat_result = os.lstat(path)
+            if stat.S_ISDIR(stat_result.st_mode):
+                self._remove_tree(path, allocated_bytes(stat_result), counts)
+            else:
+                os.unlink(path)
+                counts.unlinked(stat_result)
+        finally:
+            with self._lock:
+                self.files += counts.files
+                self.directories += counts.directories
+                self.bytes_removed += counts.bytes_removed
+                self.bytes_freed += counts.bytes_freed
+                self.inodes_freed += counts.inodes_freed
+
+    def _open(self, name: str, path: str, dir_fd: Optional[int]) -> Optional[int]:
+        """
+            fd of a directory to empty, None to walk it by path
+        """
+        if not FD_WALK or not self.budget.acquire():
+            return None
+        try:
+            return open_directory(name if dir_fd is not None else path, dir_fd)
+        except OSError:
+            self.budget.release()
+            raise
+
+    def _close(self, fd: Optional[int]) -> None:
+        if fd is not None:
+            os.close(fd)
+            self.budget.release()
+
+    @staticmethod
+    def _unlink_files(path: str, fd: Optional[int], counts: DeletionCounts) -> List[Tuple[str, int]]:
+        """
+            Unlink the files of a directory
+            return: (name, allocated bytes) of its sub directories
+        """
+        sub_directories = []
+
+        with os.scandir(path if fd is None else fd) as entries:
+            for entry in entries:
+                try:
+                    stat_result = entry.stat(follow_symlinks=False)
+                    if entry.is_dir(follow_symlinks=False):
+                        sub_directories.append((entry.name, allocated_bytes(stat_result)))
+                        continue
+                    # entry.path is the name with an fd, the full path without
+                    os.unlink(entry.path, dir_fd=fd)
+                except FileNotFoundError:
+                    continue
+                counts.unlinked(stat_result)
+
+        return sub_directories
+
+    def _remove_tree(self, path: str, allocated: int, counts: DeletionCounts) -> None:
+        # (fd, path, name, allocated bytes, sub directories left) of the directories being emptied
+        frames: List[Tuple[Optional[int], str, str, int, List[Tuple[str, int]]]] = []
+
+        try:
+            fd = self._open(path, path, None)
+            frames.append((fd, path, path, allocated, []))
+            frames[-1][4].extend(self._unlink_files(path, fd, counts))
+
+            while frames:
+                fd, directory, name, allocated, sub_directories = frames[-1]
+
+                if not sub_directories:
+                    frames.pop()
+                    self._close(fd)
+                    parent_fd = frames[-1][0] if frames else None
+                    os.rmdir(name if parent_fd is not None else directory, dir_fd=parent_fd)
+                    counts.removed_directory(allocated)
+                    continue
+
+                child_name, child_allocated = sub_directories.pop()
+                child = os.path.join(directory, child_name)
+                child_fd = self._open(child_name, child, fd)
+                frames.append((child_fd, child, child_name, child_allocated, []))
+                frames[-1][4].extend(self._unlink_files(child, child_fd, counts))
+        finally:
+            for fd, _, _, _, _ in frames:
+                self._close(fd)
+
+
+def remove_tree(path: Union[str, Path]) -> Tuple[int, int]:
+    """
+        Delete a file or a directory tree, see TreeDeleter
+        return: (entries removed, bytes freed)
+        raise: OSError on the first entry that cannot be removed
+    """
+    deleter = TreeDeleter()
+    deleter.remove(path)
+    return deleter.entries, deleter.bytes_freed
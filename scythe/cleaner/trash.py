@@ -0,0 +1,167 @@
+"""
+    Staging area for instant deletion
+
+    Artifacts are renamed into a trash directory on their own filesystem,
+    an O(1) os.rename, and the trash is emptied later by a detached worker
+    (python -m scythe.cleaner.trash). Every trash directory is recorded in
+    a registry so an interrupted purge is resumed by the next one.
+"""
+
+import os
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from scythe.utils.utils import user_cache_dir
+from scythe.cleaner.deleter import TreeDeleter
+from scythe.mounts.mounts import mount_point
+from scythe.logger.logger import get_logger
+
+TRASH_DIR_NAME = ".scythe-trash"
+
+
+def registry_path() -> Path:
+    return user_cache_dir() / "trash-dirs"
+
+
+def read_registry() -> List[Path]:
+    try:
+        lines = registry_path().read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    return [Path(line) for line in dict.fromkeys(lines) if line]
+
+
+def _register(trash_dir: Path) -> None:
+    if trash_dir in read_registry():
+        return
+    registry_path().parent.mkdir(parents=True, exist_ok=True)
+    with open(registry_path(), "a", encoding="utf-8") as registry:
+        registry.write(f"{trash_dir}\n")
+
+
+class Trash:
+    """
+        Per filesystem trash directories
+
+        For an artifact, the first candidate writable and on the same device
+        is used: the user cache directory, the root of the mount point, then
+        the artifact's parent directory. Every candidate is named after
+        TRASH_DIR_NAME, which scans ignore (IGNORED_PATTERNS): staged
+        artifacts are not reported again before the purge.
+    """
+
+    def __init__(self):
+        self.logger = get_logger()
+        self._trash_dirs: Dict[int, Path] = {}
+
+    @property
+    def trash_dirs(self) -> List[Path]:
+        return list(self._trash_dirs.values())
+
+    def trash_dir_for(self, path: Path) -> Path:
+        device = os.lstat(path).st_dev
+        if device in self._trash_dirs:
+            return self._trash_dirs[device]
+
+        user_id = getattr(os, "getuid", lambda: "user")()
+        candidates = [
+            user_cache_dir() / TRASH_DIR_NAME,
+            mount_point(path) / f"{TRASH_DIR_NAME}-{user_id}",
+            path.parent / TRASH_DIR_NAME,
+        ]
+
+        for candidate in candidates:
+            try:
+                candidate.mkdir(parents=True, exist_ok=True)
+                if os.stat(candidate).st_dev == device and os.access(candidate, os.W_OK):
+                    _register(candidate)
+                    self._trash_dirs[device] = candidate
+                    return candidate
+            except OSError:
+                continue
+
+        raise OSError(f"No trash directory on the filesystem of {path}")
+
+    def stage(self, path: Path) -> Path:
+        """
+            Move path into the trash of its filesystem
+            return: the new location
+        """
+        target = self.trash_dir_for(path) / f"{path.name}-{uuid.uuid4().hex}"
+        os.rename(path, target)
+        return target
+
+
+def purge(trash_dirs: Optional[List[Path]] = None) -> Tuple[int, List[str]]:
+    """
+        Delete the content of trash directories (every registered one by default)
+        return: (entries removed, errors)
+    """
+    logger = get_logger()
+    deleter = TreeDeleter()
+    removed = 0
+    errors = []
+
+    for trash_dir in trash_dirs if trash_dirs is not None else read_registry():
+        try:
+            entries = list(os.scandir(trash_dir))
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            errors.append(f"Cannot read {trash_dir}: {e}")
+            continue
+
+        for entry in entries:
+            try:
+                deleter.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                errors.append(f"Cannot remove {entry.path}: {e}")
+
+    for error in errors:
+        logger.warning(error)
+
+    return removed, errors
+
+
+def pending_entries(trash_dirs: Optional[List[Path]] = None) -> int:
+    count = 0
+    for trash_dir in trash_dirs if trash_dirs is not None else read_registry():
+        try:
+            count += len(os.listdir(trash_dir))
+        except OSError:
+            continue
+    return count
+
+
+def spawn_purge_worker() -> Optional[subprocess.Popen]:
+    """
+        Empty the registered trash directories in a detached process
+    """
+    options = {}
+    if sys.platform == "win32":
+        options["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options["start_new_session"] = True
+
+    try:
+        return subprocess.Popen(
+            [sys.executable, "-m", "scythe.cleaner.trash"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            **options
+        )
+    except OSError as e:
+        get_logger().warning(f"Cannot start the trash worker: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    purge()
@@ -9,24 +9,94 @@ from rich.panel import Panel
 from pathlib import Path
 
 import json
+import sqlite3
 from datetime import datetime
+from typing import Dict, List, Optional
 
 from rich.table import Table
 
 from scythe import __version__
-from scythe.logger.logger import setup_logger
-from scythe.scanner.scanner import scan_directory
+from scythe.logger.logger import setup_logger, get_logger, redirect_console_to_stderr
+from scythe.scanner.scanner import scan_directory, iter_projects
+from scythe.scanner.roots import DEVICE_JOBS, distinct_roots, scan_roots
 from scythe.cleaner.cleaner import clean_artifacts
+from scythe.cache.cache import ScanCache
+from scythe.progress.progress import ProgressReporter
+from scythe.mounts.mounts import expand_fs_types
+from scythe.config import ConfigError, load_rules
+from scythe.rules.rules import RuleSet
+from scythe.utils.utils import parse_age, parse_size
 from scythe.ui.ui import (
-    display_scan_result,
-    progress_bar, interactive_select_project, confirm_action
+    display_scan_result, display_rules,
+    progress_bar, describe_progress, interactive_select_project, confirm_action
 )
 
-from scythe.formatter.formatter import save_report
+from scythe.formatter.formatter import save_report, write_ndjson
 
 
 console = Console()
 
+
+def parse_size_option(ctx, param, value: Optional[str]) -> int:
+    if value is None:
+        return 0
+
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def parse_age_option(ctx, param, value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+
+    try:
+        return parse_age(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def parse_counts_option(ctx, param, value: Optional[str]) -> List[int]:
+    if value is None:
+        return []
+
+    try:
+        counts = [int(count) for count in value.split(",") if count.strip()]
+    except ValueError:
+        raise click.BadParameter(f"{value!r} is not a comma separated list of numbers")
+    if any(count < 1 for count in counts):
+        raise click.BadParameter("thread counts must be at least 1")
+    return counts
+
+
+def root_rules(ctx, roots: List[Path]) -> Dict[Path, RuleSet]:
+    """
+        Rules of every scan root: the user configuration (or --config)
+        and the pyproject.toml nearest to the root
+    """
+    try:
+        return {root: load_rules(user_config=ctx.obj["config"], project_dir=root) for root in roots}
+    except ConfigError as e:
+        raise click.ClickException(str(e))
+
+
+def item_progress(ctx):
+    """
+        Per directory / per project messages, only logged in verbose mode
+    """
+    if not ctx.obj.get("verbose"):
+        return None
+    return ctx.obj["logger"].debug
+
+
+def scan_progress(progress, task) -> ProgressReporter:
+    def update(snapshot) -> None:
+        progress.update(task, description=f"[cyan]{describe_progress(snapshot)}")
+
+    return ProgressReporter(update, phase="scan")
+
+
 @click.group()
 @click.version_option(version=__version__, prog_name="SCYTHE")
 @click.option(
@@ -39,8 +109,13 @@ console = Console()
     is_flag=True,
     help='Deactivate log mode',
 )
+@click.option(
+    '--config',
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help='Rules file to use instead of ~/.config/scythe/config.toml',
+)
 @click.pass_context
-def cli(ctx, verbose, no_log_file):
+def cli(ctx, verbose, no_log_file, config):
     """
         Scan directories for build artifacts and project metadata.
 
@@ -50,14 +125,29 @@ def cli(ctx, verbose, no_log_file):
 
         \b
         Arguments:
-            PATH    Directory to analyze (default: current directory)
+            PATH    Directories to analyze (default: current directory)
 
         \b
         Options:
             --depth, -d        Maximum recursion depth (default: -1, infinite)
             --follow-symlinks  Follow symbolic links during traversal
+            --no-prune         Also descend into detected artifacts
+            --jobs, -j N       Size artifacts on N threads (default: 1)
+            --no-cache         Ignore the scan cache (~/.cache/scythe)
+            --size-mode MODE   apparent (file sizes) or allocated (disk blocks)
+            --dedupe           Count hard links once, report exclusive size
+            --low-memory       Keep results in compact columns (huge trees)
+            --top N            Only keep the N largest artifacts
+            --min-size SIZE    Ignore artifacts smaller than SIZE (100M, 1.5G)
+            --older-than AGE   Only keep artifacts unused for AGE (30d, 12h)
+            --device-jobs N    Roots of one device scanned at once (default: 1)
+            --processes, -P N  Walk each root on N worker processes
+            --walkers N        Walker threads (default: all cores without the GIL)
+            -x, --xdev         Stay on the file system of each root
+            --skip-fs-type T   Never enter mounts of type T (nfs, pseudo, ...)
             --verbose, -v      Show detailed logs and hidden project markers
             --no-log-file      Does not generate a log file
+            --config FILE      Rules file (default: ~/.config/scythe/config.toml)
 
         \b
         Examples:
@@ -65,6 +155,9 @@ def cli(ctx, verbose, no_log_file):
             scythe scan ~/dev --depth 2         # 2. Shallow scan of your dev folder
             scythe scan /opt --follow-symlinks  # 3. Scan including symlinks
             scythe scan . --verbose             # 4. Scan with debug logging
+            scythe scan ~/dev --top 50          # 5. The 50 largest artifacts
+            scythe scan ~/dev /mnt/nfs /data    # 6. Several roots, one walker per device
+            scythe scan /srv/repos -P 32        # 7. Spread a huge tree over 32 processes
 
         \b
         Notes:
@@ -79,12 +172,16 @@ def cli(ctx, verbose, no_log_file):
     ctx.ensure_object(dict)
     ctx.obj["logger"] = logger
     ctx.obj["console"] = console
+    ctx.obj["verbose"] = verbose
+
+    # Rules are loaded by the commands that scan, for their own roots
+    ctx.obj["config"] = config
 
     if ctx.invoked_subcommand is None:
        display_header()
 
 @cli.command()
-@click.argument('path', type=click.Path(exists=True), default='.')
+@click.argument('paths', nargs=-1, type=click.Path(exists=True), metavar='[PATH]...')
 @click.option(
     '--depth',
     '-d',
@@ -102,7 +199,7 @@ def cli(ctx, verbose, no_log_file):
 
 @click.option(
     '--format',
-    type=click.Choice(['table', 'tree', 'compact', 'json']),
+    type=click.Choice(['table', 'tree', 'compact', 'json', 'ndjson']),
     default='table',
     help='Format the output of the result'
 )
@@ -115,33 +212,232 @@ def cli(ctx, verbose, no_log_file):
 
 @click.option('--no-artifacts', is_flag=True, help='Disable artifacts details output')
 
+@click.option(
+    '--no-prune',
+    is_flag=True,
+    help="Also descend into detected artifacts (node_modules, target, ...)"
+)
+
+@click.option(
+    '--jobs', '-j',
+    type=click.IntRange(min=1),
+    default=1,
+    metavar='N',
+    help="Number of threads used to size artifacts",
+    show_default=True
+)
+
+@click.option(
+    '--no-cache',
+    is_flag=True,
+    help="Do not read or update the scan cache"
+)
+
+@click.option(
+    '--size-mode',
+    type=click.Choice(['apparent', 'allocated']),
+    default='apparent',
+    help="Count file sizes (apparent) or allocated disk blocks (allocated)",
+    show_default=True
+)
+
+@click.option(
+    '--dedupe',
+    is_flag=True,
+    help="Count hard-linked files once and report the exclusive size"
+)
+
+@click.option(
+    '--low-memory',
+    is_flag=True,
+    help="Keep scan results in compact columns (very large trees)"
+)
+
+@click.option(
+    '--top',
+    type=click.IntRange(min=1),
+    metavar='N',
+    help="Only keep the N largest artifacts"
+)
+
+@click.option(
+    '--min-size',
+    callback=parse_size_option,
+    metavar='SIZE',
+    help="Ignore artifacts smaller than SIZE (e.g. 100M, 1.5G)"
+)
+
+@click.option(
+    '--older-than',
+    callback=parse_age_option,
+    metavar='AGE',
+    help="Only keep artifacts unused for AGE (e.g. 30d, 12h, 2w)"
+)
+
+@click.option(
+    '--one-file-system', '--xdev', '-x', 'one_file_system',
+    is_flag=True,
+    help="Do not cross file system boundaries (mount points on another device)"
+)
+
+@click.option(
+    '--skip-fs-type',
+    multiple=True,
+    metavar='TYPE',
+    help="Never enter mounts of this file system type (nfs, fuse.sshfs, ...; 'pseudo' for /proc-like types)"
+)
+
+@click.option(
+    '--device-jobs',
+    type=click.IntRange(min=1),
+    default=DEVICE_JOBS,
+    show_default=True,
+    metavar='N',
+    help="Roots of the same device scanned at the same time (several PATHs)"
+)
+
+@click.option(
+    '--processes', '-P',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    metavar='N',
+    help="Walk each root on N worker processes (all cores: os.cpu_count())"
+)
+
+@click.option(
+    '--walkers',
+    type=click.IntRange(min=1),
+    default=None,
+    metavar='N',
+    help="Walker threads of a single root scan (default: every core on free-threaded Python, 1 otherwise)"
+)
+
 @click.pass_context
-def scan(ctx, path, depth, follow_symlinks, format, output, no_artifacts):
+def scan(ctx, paths, depth, follow_symlinks, format, output, no_artifacts, no_prune, jobs, no_cache,
+         size_mode, dedupe, low_memory, top, min_size, older_than, one_file_system, skip_fs_type,
+         device_jobs, processes, walkers):
     """
-        Scan the directory
+        Scan one or more directories
     """
     logger = ctx.obj["logger"]
     console = ctx.obj["console"]
 
-    scan_path = Path(path).resolve()
+    roots = distinct_roots([Path(path) for path in paths or ('.',)])
+    skip_fs_types = expand_fs_types(skip_fs_type)
+    scan_path = roots[0]
+    rules = root_rules(ctx, roots)
 
-    logger.info(f"Scanning directory: {path}")
-    logger.info(f"Maximal Depth: {depth}")
+    if format == 'ndjson':
+        redirect_console_to_stderr(logger)
 
-    with progress_bar() as progress:
-        task = progress.add_task("[cyan]Scanning...", total=None)
+    logger.info(f"Scanning directory: {', '.join(str(root) for root in roots)}")
+    logger.info(f"Maximal Depth: {depth}")
 
-        def update_progress(message: str):
-            progress.update(task, description=f"[cyan]{message}")
+    cache = open_scan_cache(no_cache, follow_symlinks)
 
-        # Lancer le scan
-        result = scan_directory(
+    if format == 'ndjson' and (len(roots) > 1 or processes > 1):
+        # Roots and shards are merged (and --top applied) once all of them are scanned
+        projects = scan_roots(
+            paths=roots,
+            max_depth=depth,
+            follow_symlinks=follow_symlinks,
+            prune_artifacts=not no_prune,
+            jobs=jobs,
+            cache=cache,
+            size_mode=size_mode,
+            deduplicate=dedupe,
+            top=top,
+            min_size=min_size,
+            older_than=older_than,
+            one_file_system=one_file_system,
+            skip_fs_types=skip_fs_types,
+            device_jobs=device_jobs,
+            root_rules=rules,
+            processes=processes
+        ).projects
+    elif format == 'ndjson':
+        projects = iter_projects(
             path=scan_path,
             max_depth=depth,
             follow_symlinks=follow_symlinks,
-            progress_callback=update_progress
+            prune_artifacts=not no_prune,
+            jobs=jobs,
+            cache=cache,
+            size_mode=size_mode,
+            deduplicate=dedupe,
+            top=top,
+            min_size=min_size,
+            older_than=older_than,
+            one_file_system=one_file_system,
+            skip_fs_types=skip_fs_types,
+            rules=rules[scan_path],
+            walkers=walkers
         )
 
+    if format == 'ndjson':
+        if output:
+            with open(output, 'w', encoding='utf-8') as stream:
+                write_ndjson(projects, stream)
+        else:
+            write_ndjson(projects, click.get_text_stream('stdout'))
+
+        if cache:
+            cache.close()
+        return
+
+    with progress_bar() as progress:
+        task = progress.add_task("[cyan]Scanning...", total=None)
+
+        # Lancer le scan
+        if len(roots) > 1 or processes > 1:
+            result = scan_roots(
+                paths=roots,
+                max_depth=depth,
+                follow_symlinks=follow_symlinks,
+                progress_callback=item_progress(ctx),
+                progress=scan_progress(progress, task),
+                prune_artifacts=not no_prune,
+                jobs=jobs,
+                cache=cache,
+                size_mode=size_mode,
+                deduplicate=dedupe,
+                compact=low_memory,
+                top=top,
+                min_size=min_size,
+                older_than=older_than,
+                one_file_system=one_file_system,
+                skip_fs_types=skip_fs_types,
+                device_jobs=device_jobs,
+                root_rules=rules,
+                processes=processes
+            )
+            scan_path = result.root_path
+        else:
+            result = scan_directory(
+                path=scan_path,
+                max_depth=depth,
+                follow_symlinks=follow_symlinks,
+                progress_callback=item_progress(ctx),
+                progress=scan_progress(progress, task),
+                prune_artifacts=not no_prune,
+                jobs=jobs,
+                cache=cache,
+                size_mode=size_mode,
+                deduplicate=dedupe,
+                compact=low_memory,
+                top=top,
+                min_size=min_size,
+                older_than=older_than,
+                one_file_system=one_file_system,
+                skip_fs_types=skip_fs_types,
+                rules=rules[scan_path],
+                walkers=walkers
+            )
+
+    if cache:
+        cache.close()
+
 
     if format == 'json':
         from scythe.formatter.formatter import format_to_json
@@ -199,8 +495,91 @@ def scan(ctx, path, depth, follow_symlinks, format, output, no_artifacts):
     help='Save the report of the clean result in a file'
 )
 
+@click.option(
+    '--no-prune',
+    is_flag=True,
+    help="Also descend into detected artifacts (node_modules, target, ...)"
+)
+
+@click.option(
+    '--jobs', '-j',
+    type=click.IntRange(min=1),
+    default=1,
+    metavar='N',
+    help="Number of threads used to size and delete artifacts",
+    show_default=True
+)
+
+@click.option(
+    '--no-cache',
+    is_flag=True,
+    help="Do not read or update the scan cache"
+)
+
+@click.option(
+    '--size-mode',
+    type=click.Choice(['apparent', 'allocated']),
+    default='apparent',
+    help="Count file sizes (apparent) or allocated disk blocks (allocated)",
+    show_default=True
+)
+
+@click.option(
+    '--dedupe',
+    is_flag=True,
+    help="Count hard-linked files once and report the exclusive size"
+)
+
+@click.option(
+    '--low-memory',
+    is_flag=True,
+    help="Keep scan results in compact columns (very large trees)"
+)
+
+@click.option(
+    '--top',
+    type=click.IntRange(min=1),
+    metavar='N',
+    help="Only keep the N largest artifacts"
+)
+
+@click.option(
+    '--min-size',
+    callback=parse_size_option,
+    metavar='SIZE',
+    help="Ignore artifacts smaller than SIZE (e.g. 100M, 1.5G)"
+)
+
+@click.option(
+    '--older-than',
+    callback=parse_age_option,
+    metavar='AGE',
+    help="Only keep artifacts unused for AGE (e.g. 30d, 12h, 2w)"
+)
+
+@click.option(
+    '--one-file-system', '--xdev', '-x', 'one_file_system',
+    is_flag=True,
+    help="Do not cross file system boundaries (mount points on another device)"
+)
+
+@click.option(
+    '--skip-fs-type',
+    multiple=True,
+    metavar='TYPE',
+    help="Never enter mounts of this file system type (nfs, fuse.sshfs, ...; 'pseudo' for /proc-like types)"
+)
+
+@click.option(
+    '--instant',
+    is_flag=True,
+    help="Move artifacts to a trash directory and delete them in the background"
+)
+
 @click.pass_context
-def clean(ctx, path, interactive, dry_run, depth, force, output):
+def clean(ctx, path, interactive, dry_run, depth, force, output, no_prune, jobs, no_cache,
+          size_mode, dedupe, low_memory, top, min_size, older_than, one_file_system, skip_fs_type,
+          instant):
     """
         Clean detected build artifacts.
 
@@ -216,6 +595,12 @@ def clean(ctx, path, interactive, dry_run, depth, force, output):
             --dry-run       Simulation mode (no actual deletion; recommended first)
             --interactive   Manually select which projects to clean
             --force         Skip confirmation (useful for automated scripts)
+            --jobs N        Size and delete artifacts on N threads
+            --instant       Move artifacts to a trash, delete them in the background
+            --top N         Only clean the N largest artifacts
+            --min-size SIZE Leave artifacts smaller than SIZE alone
+            --older-than AGE Only clean artifacts unused for AGE (30d)
+            --xdev, -x      Do not cross into other mounted file systems
 
         \b
         Examples:
@@ -224,10 +609,15 @@ def clean(ctx, path, interactive, dry_run, depth, force, output):
             scythe clean  path_to_project  --interactive         # 3. Manual selection mode
             scythe clean  path_to_project  --force               # 4. Clean without confirmation
             scythe clean  path_to_project  -o report.json        # 5. Export results to a report
+            scythe clean  path_to_project  --top 20 -i           # 6. Pick among the 20 largest artifacts
+            scythe clean  path_to_project  --older-than 90d      # 7. Only artifacts unused for 3 months
 
         \b
         Warning:
-            • Deletion is PERMANENT (files are not moved to the trash)
+            • Deletion is PERMANENT: artifacts are deleted in place, or with
+              --instant renamed into a .scythe-trash directory of their file
+              system and purged in the background (scythe trash purge);
+              nothing goes to the desktop trash
             • Always perform a --dry-run first to avoid accidental data loss
             • Ensure that projects are not currently open or in use by other processes
     """
@@ -236,21 +626,38 @@ def clean(ctx, path, interactive, dry_run, depth, force, output):
     console = ctx.obj["console"]
 
     scan_path = Path(path).resolve()
+    skip_fs_types = expand_fs_types(skip_fs_type)
+    rules = root_rules(ctx, [scan_path])[scan_path]
 
     console.print("[bold cyan]Step 1/2 : Scanning projects...[/bold cyan]")
 
+    cache = open_scan_cache(no_cache)
+
     with progress_bar() as progress:
         task = progress.add_task("[cyan]Scanning...", total=None)
 
-        def update_progress(message: str) :
-            progress.update(task, description=f"[cyan]{message}")
-
         scan_result = scan_directory(
             path=scan_path,
             max_depth=depth,
-            progress_callback=update_progress
+            progress_callback=item_progress(ctx),
+            progress=scan_progress(progress, task),
+            prune_artifacts=not no_prune,
+            jobs=jobs,
+            cache=cache,
+            size_mode=size_mode,
+            deduplicate=dedupe,
+            compact=low_memory,
+            top=top,
+            min_size=min_size,
+            older_than=older_than,
+            one_file_system=one_file_system,
+            skip_fs_types=skip_fs_types,
+            rules=rules
         )
 
+    if cache:
+        cache.close()
+
     project_with_artifacts = [p for p in scan_result.projects if p.artifacts]
 
     if not project_with_artifacts :
@@ -259,8 +666,8 @@ def clean(ctx, path, interactive, dry_run, depth, force, output):
         )
         return
 
-    total_artifacts = sum(len(p.artifacts) for p in project_with_artifacts)
-    total_size = sum(p.total_artifact_size for p in project_with_artifacts)
+    total_artifacts = scan_result.total_artifacts
+    total_size = scan_result.total_artifacts_size
     from scythe.utils.utils import format_size
 
     console.print(
@@ -269,8 +676,7 @@ def clean(ctx, path, interactive, dry_run, depth, force, output):
     )
 
     if interactive :
-        selected_projects = interactive_select_project
-        (project_with_artifacts, scan_path)
+        selected_projects = interactive_select_project(project_with_artifacts, scan_path)
         if not selected_projects :
             console.print(
                 "[yellow]Nothing found[/yellow]"
@@ -301,16 +707,19 @@ def clean(ctx, path, interactive, dry_run, depth, force, output):
         console.print("[yellow]DRY-RUN enabled - simulation, no data is deleted[/yellow]\n")
 
     with progress_bar() as progress:
-        task = progress.add_task("[cyan]Cleaning...")
-        total = len(selected_projects)
+        total_bytes = sum(a.size_bytes for p in selected_projects for a in p.artifacts)
+        task = progress.add_task("[cyan]Cleaning...", total=total_bytes or None)
 
-        def update_clean_progress(message: str) :
-            progress.update(task, advance=1, description=f"[cyan]{message}")
+        def update_clean_progress(snapshot) :
+            progress.update(task, completed=snapshot.bytes_done, description=f"[cyan]{describe_progress(snapshot)}")
 
         clean_result = clean_artifacts(
             selected_projects,
             dry_run=dry_run,
-            progress_callback=update_clean_progress
+            progress_callback=item_progress(ctx),
+            jobs=jobs,
+            instant=instant,
+            progress=ProgressReporter(update_clean_progress, phase="clean")
         )
 
 
@@ -325,6 +734,11 @@ def clean(ctx, path, interactive, dry_run, depth, force, output):
         console.print(
             f"[bold green]✓ Cleaning end in {clean_result.clean_duration:.2f}s[/bold green]"
         )
+        if clean_result.trash_dirs:
+            console.print(
+                "[dim]Artifacts were moved to the trash, deletion continues in the background "
+                "(scythe trash status)[/dim]"
+            )
 
     console.print()
 
@@ -334,7 +748,20 @@ def clean(ctx, path, interactive, dry_run, depth, force, output):
 
     result_table.add_row("Cleaned projects", str(len(clean_result.projects_cleaned)))
     result_table.add_row("Artifacts deleted", str(clean_result.artifacts_deleted))
-    result_table.add_row("Freed memory", clean_result.space_freed_formatted)
+    if clean_result.space_freed_measured is not None :
+        result_table.add_row("Freed space (measured)", format_size(clean_result.space_freed_measured))
+    result_table.add_row("Freed space (scan estimate)", clean_result.space_freed_formatted)
+    if clean_result.space_freed_observed is not None :
+        observed = clean_result.space_freed_observed
+        result_table.add_row(
+            "Freed space (file systems)",
+            format_size(observed) if observed >= 0 else f"-{format_size(-observed)}"
+        )
+    if clean_result.entries_removed :
+        result_table.add_row(
+            "Entries removed",
+            f"{clean_result.entries_removed} ({clean_result.entries_per_second:.0f}/s)"
+        )
     result_table.add_row("Operation success rate",  f"{clean_result.success_rate:.1f}%")
 
     if clean_result.skipped :
@@ -348,12 +775,12 @@ def clean(ctx, path, interactive, dry_run, depth, force, output):
 
     if clean_result.errors:
         console.print()
-    console.print(f"[bold red] Errors : [/bold red]")
-    for error in clean_result.errors[:5]:
-        console.print(f"  [red]•[/red] {error}")
+        console.print(f"[bold red] Errors : [/bold red]")
+        for error in clean_result.errors[:5]:
+            console.print(f"  [red]•[/red] {error}")
 
-    if len(clean_result.errors) > 5:
-        console.print(f"  [dim]... and {len(clean_result.errors) - 5} others[/dim]")
+        if len(clean_result.errors) > 5:
+            console.print(f"  [dim]... and {len(clean_result.errors) - 5} others[/dim]")
 
     report = {
         "clean_date": datetime.now().isoformat(),
@@ -377,6 +804,224 @@ def clean(ctx, path, interactive, dry_run, depth, force, output):
         console.print(f"\n[green]✓ Report saved: {output_path}[/green]")
 
 
+def open_scan_cache(no_cache: bool, follow_symlinks: bool = False) -> Optional[ScanCache]:
+    if no_cache:
+        return None
+
+    try:
+        return ScanCache(follow_symlinks=follow_symlinks)
+    except (OSError, sqlite3.Error) as e:
+        get_logger().warning(f"Scan cache disabled: {e}")
+        return None
+
+
+@cli.group()
+def cache():
+    """
+        Manage the scan cache (~/.cache/scythe)
+    """
+
+
+@cache.command('stats')
+@click.pass_context
+def cache_stats(ctx):
+    """
+        Show the content of the scan cache
+    """
+    console = ctx.obj["console"]
+    from scythe.utils.utils import format_size
+
+    with ScanCache() as scan_cache:
+        stats = scan_cache.stats()
+
+    oldest = "N/A"
+    if stats["oldest_entry"]:
+        oldest = datetime.fromtimestamp(stats["oldest_entry"]).strftime("%Y-%m-%d %H:%M")
+
+    stats_table = Table(title="Scan cache", box=box.SIMPLE)
+    stats_table.add_column("Metric", style="cyan")
+    stats_table.add_column("Value", style="green")
+
+    stats_table.add_row("Location", stats["path"])
+    stats_table.add_row("File size", format_size(stats["file_size"]))
+    stats_table.add_row("Directories", str(stats["directories"]))
+    stats_table.add_row("Artifacts", str(stats["artifacts"]))
+    stats_table.add_row("Cached artifacts size", format_size(stats["artifacts_size"]))
+    stats_table.add_row("Oldest entry", oldest)
+
+    console.print(stats_table)
+
+
+@cache.command('prune')
+@click.option(
+    '--older-than',
+    type=float,
+    default=30,
+    metavar='DAYS',
+    help="Remove entries not seen for DAYS days",
+    show_default=True
+)
+@click.option('--all', 'prune_all', is_flag=True, help="Remove every entry")
+@click.pass_context
+def cache_prune(ctx, older_than, prune_all):
+    """
+        Remove stale entries from the scan cache
+    """
+    console = ctx.obj["console"]
+
+    with ScanCache() as scan_cache:
+        removed = scan_cache.prune(max_age_days=older_than, prune_all=prune_all)
+
+    console.print(f"[green]✓ {removed} cache entries removed[/green]")
+
+
+@cli.group()
+def trash():
+    """
+        Manage artifacts moved to the trash by clean --instant
+    """
+
+
+@trash.command('status')
+@click.pass_context
+def trash_status(ctx):
+    """
+        Show the trash directories and the entries left to delete
+    """
+    console = ctx.obj["console"]
+    from scythe.cleaner.trash import read_registry, pending_entries
+
+    trash_dirs = read_registry()
+    if not trash_dirs:
+        console.print("[yellow]No trash directory[/yellow]")
+        return
+
+    for trash_dir in trash_dirs:
+        console.print(f"  [cyan]•[/cyan] {trash_dir} : {pending_entries([trash_dir])} entries")
+
+
+@trash.command('purge')
+@click.option('--background', is_flag=True, help="Purge in a detached process")
+@click.pass_context
+def trash_purge(ctx, background):
+    """
+        Delete everything left in the trash directories
+    """
+    console = ctx.obj["console"]
+    from scythe.cleaner.trash import purge, spawn_purge_worker
+
+    if background:
+        spawn_purge_worker()
+        console.print("[green]✓ Trash purge started in the background[/green]")
+        return
+
+    removed, errors = purge()
+    console.print(f"[green]✓ {removed} entries deleted[/green]")
+    for error in errors[:5]:
+        console.print(f"  [red]•[/red] {error}")
+
+
+@cli.command()
+@click.option('--projects', type=click.IntRange(min=1), default=100, help="Number of generated projects", show_default=True)
+@click.option('--depth', type=click.IntRange(min=0), default=2, help="Depth of the directories holding the projects", show_default=True)
+@click.option('--fan-out', type=click.IntRange(min=1), default=4, help="Sub-directories per directory", show_default=True)
+@click.option('--files', type=click.IntRange(min=0), default=8, help="Files per directory", show_default=True)
+@click.option('--artifact-depth', type=click.IntRange(min=0), default=2, help="Depth of each artifact tree", show_default=True)
+@click.option('--file-size', type=click.IntRange(min=1), default=1024, help="Mean file size in bytes", show_default=True)
+@click.option('--hardlink-ratio', type=click.FloatRange(0, 1), default=0.0, help="Share of artifact files that are hard links", show_default=True)
+@click.option('--seed', type=int, default=42, help="Seed of the workspace generator", show_default=True)
+@click.option('--repeat', '-r', type=click.IntRange(min=1), default=3, help="Runs per benchmark", show_default=True)
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1, metavar='N', help="Threads used to size and delete", show_default=True)
+@click.option('--workdir', type=click.Path(exists=True, file_okay=False), help="Where the workspace is generated (default: temp dir)")
+@click.option('--no-clean', is_flag=True, help="Skip the real clean_artifacts benchmark")
+@click.option('--keep', is_flag=True, help="Keep the generated workspace")
+@click.option('--memory-artifacts', type=click.IntRange(min=0), default=0, metavar='N',
+              help="Compare ScanResult and CompactScanResult memory for N artifacts")
+@click.option('--walkers', callback=parse_counts_option, metavar='N,N,...',
+              help="Time the scan and sizing walks on each number of threads (1,2,4,8)")
+@click.option('--format', type=click.Choice(['table', 'json']), default='table', help='Format of the results')
+@click.option('--output', '-o', type=click.Path(), help='Save the JSON results in a file')
+@click.pass_context
+def bench(ctx, projects, depth, fan_out, files, artifact_depth, file_size, hardlink_ratio, seed, repeat, jobs,
+          workdir, no_clean, keep, memory_artifacts, walkers, format, output):
+    """
+        Benchmark scan, sizing, formatting and clean on a synthetic workspace
+
+        \b
+        Examples:
+            scythe bench                                        # 1. Default workspace
+            scythe bench --projects 1000 --hardlink-ratio 0.3   # 2. Larger workspace with hard links
+            scythe bench --format json -o bench.json            # 3. Machine readable results
+            scythe bench --memory-artifacts 500000              # 4. Result memory, objects vs columns
+            scythe bench --walkers 1,2,4,8                      # 5. Thread scaling of the walks
+    """
+    import logging
+    from scythe.bench.bench import WorkspaceConfig, run_benchmarks
+    from scythe.ui.ui import display_bench_report
+
+    logger = ctx.obj["logger"]
+    console = ctx.obj["console"]
+
+    if format == 'json':
+        redirect_console_to_stderr(logger)
+
+    # Per-project logs would be timed too, keep them for --verbose
+    previous_level = logger.level
+    if previous_level == logging.INFO:
+        logger.setLevel(logging.WARNING)
+
+    config = WorkspaceConfig(
+        projects=projects,
+        depth=depth,
+        fan_out=fan_out,
+        files=files,
+        artifact_depth=artifact_depth,
+        file_size=file_size,
+        hardlink_ratio=hardlink_ratio,
+        seed=seed
+    )
+
+    try:
+        if format == 'json':
+            report = run_benchmarks(config, repeat=repeat, jobs=jobs, workdir=workdir,
+                                    real_clean=not no_clean, keep=keep,
+                                    memory_artifacts=memory_artifacts, walkers=walkers)
+        else:
+            with progress_bar() as progress:
+                task = progress.add_task("[cyan]Benchmarking...", total=None)
+
+                def update_progress(message: str):
+                    progress.update(task, description=f"[cyan]{message}")
+
+                report = run_benchmarks(config, repeat=repeat, jobs=jobs, workdir=workdir,
+                                        real_clean=not no_clean, keep=keep,
+                                        memory_artifacts=memory_artifacts, walkers=walkers,
+                                        progress_callback=update_progress)
+    finally:
+        logger.setLevel(previous_level)
+
+    if format == 'json':
+        click.echo(json.dumps(report, indent=2))
+    else:
+        display_bench_report(report)
+
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+        if format != 'json':
+            console.print(f"\n[green]✓ Results saved: {output}[/green]")
+
+
+@cli.command()
+@click.argument('path', type=click.Path(exists=True, file_okay=False, path_type=Path), default='.')
+@click.pass_context
+def rules(ctx, path):
+    """
+        Show the project and artifact rules in effect for PATH (default: .)
+    """
+    root = path.resolve()
+    display_rules(root_rules(ctx, [root])[root])
+
+
 @cli.command()
 @click.pass_context
 def info(ctx):
@@ -0,0 +1,172 @@
+"""
+    Configuration - project and artifact rules from TOML files
+
+    Rules are read from the user configuration (~/.config/scythe/config.toml)
+    then from the [tool.scythe] table of the nearest pyproject.toml:
+
+        [rules.bazel]                      # [tool.scythe.rules.bazel]
+        markers = ["WORKSPACE", "MODULE.bazel"]
+        artifacts = ["bazel-*"]
+
+        [rules.python]
+        artifacts = [".pdm-build"]         # added to the built-in patterns
+
+        [rules.ruby]
+        enabled = false
+
+    A rule named after a built-in type extends its markers and artifacts
+    (replace = true drops the built-in ones first). Other names declare new
+    project types, ranked before the built-in ones so that a directory
+    with a WORKSPACE and a package.json is a Bazel project.
+"""
+
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+from scythe.models.models import AnyProjectType, ProjectType, get_project_type
+from scythe.rules.rules import DEFAULT_RULES, Rule, RuleSet, builtin_rules
+from scythe.utils.utils import user_config_dir
+from scythe.logger.logger import get_logger
+
+RULE_NAME = re.compile(r"[a-z][a-z0-9_]*$")
+RULE_KEYS = {"markers", "artifacts", "replace", "enabled"}
+CONFIG_KEYS = {"rules"}
+
+
+class ConfigError(ValueError):
+    """
+        Unreadable or invalid configuration file
+    """
+
+
+def user_config_path() -> Path:
+    return user_config_dir() / "config.toml"
+
+
+def find_pyproject(start: Optional[Path] = None) -> Optional[Path]:
+    """
+        Nearest pyproject.toml in start (default: cwd) or its parents
+    """
+    directory = Path(start or Path.cwd()).resolve()
+    for candidate in (directory, *directory.parents):
+        pyproject = candidate / "pyproject.toml"
+        if pyproject.is_file():
+            return pyproject
+    return None
+
+
+def read_toml(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, "rb") as stream:
+            return tomllib.load(stream)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise ConfigError(f"Cannot read {path}: {e}")
+
+
+def config_sources(
+        user_config: Optional[Path] = None,
+        project_dir: Optional[Path] = None) -> List[Tuple[str, Mapping[str, Any]]]:
+    """
+        (name, table) of every configuration found, lowest priority first
+    """
+    sources = []
+
+    user_config = Path(user_config) if user_config else user_config_path()
+    if user_config.is_file():
+        sources.append((str(user_config), read_toml(user_config)))
+
+    pyproject = find_pyproject(project_dir)
+    if pyproject is not None:
+        table = read_toml(pyproject).get("tool", {}).get("scythe")
+        if table is not None:
+            sources.append((f"{pyproject} [tool.scythe]", table))
+
+    return sources
+
+
+def _string_list(source: str, name: str, options: Mapping[str, Any], key: str) -> List[str]:
+    value = options.get(key, [])
+    if not isinstance(value, list) or not all(isinstance(item, str) and item for item in value):
+        raise ConfigError(f"{source}: rules.{name}.{key} must be a list of names or patterns")
+    return value
+
+
+def _apply_rule(
+        rules: Dict[AnyProjectType, Rule],
+        source: str,
+        name: str,
+        options: Any) -> None:
+
+    if not isinstance(options, dict):
+        raise ConfigError(f"{source}: rules.{name} must be a table")
+    if not RULE_NAME.match(name) or name == ProjectType.UNKNOWN.value:
+        raise ConfigError(f"{source}: invalid rule name {name!r} (lowercase letters, digits and _)")
+
+    unknown = set(options) - RULE_KEYS
+    if unknown:
+        raise ConfigError(f"{source}: unknown keys in rules.{name}: {', '.join(sorted(unknown))}")
+
+    markers = _string_list(source, name, options, "markers")
+    artifacts = _string_list(source, name, options, "artifacts")
+    enabled = options.get("enabled", True)
+
+    project_type = get_project_type(name)
+    rule = rules.get(project_type)
+    if rule is None:
+        if enabled and not markers:
+            raise ConfigError(f"{source}: rules.{name} declares a new project type without markers")
+        rule = rules[project_type] = Rule(project_type, source=source)
+    elif rule.source != source:
+        rule.source = f"{rule.source}, {source}"
+
+    if options.get("replace", False):
+        rule.markers, rule.artifacts = [], []
+
+    rule.markers.extend(marker for marker in markers if marker not in rule.markers)
+    rule.artifacts.extend(artifact for artifact in artifacts if artifact not in rule.artifacts)
+
+    if not enabled:
+        rule.markers = []
+
+
+def build_rules(sources: List[Tuple[str, Mapping[str, Any]]]) -> RuleSet:
+    """
+        Built-in rules updated by every source in turn, compiled
+    """
+    if not sources:
+        return DEFAULT_RULES
+
+    builtin = builtin_rules()
+    rules: Dict[AnyProjectType, Rule] = {rule.project_type: rule for rule in builtin}
+
+    for source, table in sources:
+        unknown = set(table) - CONFIG_KEYS
+        if unknown:
+            get_logger().warning(f"{source}: ignoring unknown keys {', '.join(sorted(unknown))}")
+
+        rule_tables = table.get("rules", {})
+        if not isinstance(rule_tables, dict):
+            raise ConfigError(f"{source}: rules must be a table")
+        for name, options in rule_tables.items():
+            _apply_rule(rules, source, name, options)
+
+    # New project types first, then the built-in ones in their usual order
+    builtin_types = [rule.project_type for rule in builtin]
+    ordered = [rule for rule in rules.values() if rule.project_type not in builtin_types]
+    ordered += [rules[project_type] for project_type in builtin_types]
+
+    return RuleSet(ordered, sources=[source for source, _ in sources])
+
+
+def load_rules(user_config: Optional[Path] = None, project_dir: Optional[Path] = None) -> RuleSet:
+    """
+        Effective rules of the user configuration and pyproject.toml
+    """
+    return build_rules(config_sources(user_config, project_dir))
@@ -2,164 +2,139 @@
     Artifact Detector
 """
 
+import os
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Optional
 from datetime import datetime
 
-from scythe.models.models import ProjectType, ArtifactInfo
-from scythe.utils.utils import calculate_directory_size
+from scythe.models.models import AnyProjectType, ArtifactInfo
+from scythe.utils.utils import DirectoryListing, calculate_directory_size, list_directory, probe_last_used
+from scythe.sizer.sizer import SizeEngine
+from scythe.cache.cache import ScanCache
+from scythe.rules.rules import ARTIFACT_PATTERNS, RuleSet, get_rules
 from scythe.logger.logger import get_logger
 
-# Artifacts matches project type
-
-ARTIFACT_PATTERNS: Dict[ProjectType, List[str]] = {
-    ProjectType.NODE: [
-        'node_modules',
-        'dist',
-        'build',
-        '.next',
-        '.nuxt',
-        'out',
-        '.cache',
-        '.parcel-cache',
-        '.turbo',
-        'coverage'
-    ],
-
-    ProjectType.PYTHON: [
-        '.venv',
-        'venv',
-        'env',
-        '__pycache__',
-        '.pytest_cache',
-        '.mypy_cache',
-        '.ruff_cache',
-        '.tox',
-        '*.egg-info',
-        'dist',
-        'build',
-        '.eggs',
-        'htmlcov',
-        '.coverage'
-    ],
-
-    ProjectType.RUST: [
-        'target'
-    ],
-
-    ProjectType.JAVA_MAVEN: [
-        'target',
-        '.m2/repository'
-    ],
-
-    ProjectType.JAVA_GRADLE: [
-        'build',
-        '.gradle',
-        'out'
-    ],
-
-    ProjectType.GO: [
-        'bin',
-        'pkg',
-        'vendor'
-    ],
-
-    ProjectType.RUBY: [
-        'vendor/bundle',
-        '.bundle',
-        'tmp'
-    ],
-
-    ProjectType.DOTNET: [
-        'bin',
-        'obj',
-        'packages',
-        '.vs'
-    ]
-}
-
 class ArtifactDetector :
     """
         Detect artifact
 
         Attributes :
-        project_path, project_type, follow_symlinks
+        project_path, project_type, follow_symlinks, size_engine, cache, rules
+
+        When a parallel size_engine is given, directory artifacts are
+        returned with size_bytes = 0 and sized in the background until
+        size_engine.resolve() is called.
+        When a cache is given, unchanged directory artifacts take their
+        size from it instead of being walked (not when hard links are
+        deduplicated, every inode has to be seen).
+        With probe_age, artifacts that are not walked (cache hits) get their
+        last use from a sample of their entries.
+        Without rules, the active rule set is used (scythe.rules.rules.get_rules).
     """
 
 
     def __init__(
             self,
             project_path: Path,
-            project_type: ProjectType,
-            follow_symlinks: bool = False
+            project_type: AnyProjectType,
+            follow_symlinks: bool = False,
+            size_engine: Optional[SizeEngine] = None,
+            cache: Optional[ScanCache] = None,
+            probe_age: bool = False,
+            rules: Optional[RuleSet] = None
     ) :
         self.project_path = project_path
         self.project_type = project_type
         self.follow_symlinks = follow_symlinks
+        self.size_engine = size_engine
+        self.cache = cache
+        self.probe_age = probe_age
+        self.rules = rules or get_rules()
         self.logger = get_logger()
 
     def get_artifact_pattern(self) -> List[str]:
 
-        return ARTIFACT_PATTERNS.get(self.project_type, [])
+        return self.rules.artifact_patterns(self.project_type)
 
     def is_artifact(self, path: Path) -> bool:
-        patterns = self.get_artifact_pattern()
-
-        for pattern in patterns :
-            if '*' in pattern :
-                extension = pattern.replace('*', '')
-                if path.name.endswith(extension) :
-                    return True
-            elif path.name == pattern :
-                return True
+        return self.is_artifact_name(path.name)
 
-        return False
+    def is_artifact_name(self, name: str) -> bool:
+        return self.project_type in self.rules.artifacts.values(name)
 
 
-    def detect_artifacts(self) -> List[ArtifactInfo]:
+    def detect_artifacts(self, listing: Optional[DirectoryListing] = None) -> List[ArtifactInfo]:
         artifacts = []
 
-        if not self.project_path.exists() or not self.project_path.is_dir() :
-            self.logger.warning(f"Invalid Project: {self.project_path}")
-            return artifacts
+        if listing is None:
+            if not self.project_path.exists() or not self.project_path.is_dir() :
+                self.logger.warning(f"Invalid Project: {self.project_path}")
+                return artifacts
+
+            try:
+                listing = list_directory(self.project_path, self.follow_symlinks)
+            except (OSError, PermissionError) as e:
+                self.logger.warning(f"Cannot access the dir : {self.project_path}")
+                return artifacts
+
+        for entry in listing.directories :
+            if self.is_artifact_name(entry.name) :
+                artifact_info = self._create_artifact_info(Path(entry.path), entry)
+                if artifact_info :
+                    artifacts.append(artifact_info)
+                    self.logger.debug(
+                        f"Detected Artifact : {entry.name}"
+                        f"({artifact_info.size_formatted})"
+                    )
+
+        for entry in listing.files :
+            if entry.is_symlink() and not self.follow_symlinks :
+                continue
+
+            if self.is_artifact_name(entry.name) :
+                artifact_info = self._create_artifact_info(Path(entry.path), entry)
+                if artifact_info :
+                    artifacts.append(artifact_info)
 
-        try:
-            for item in self.project_path.iterdir() :
-                if item.is_symlink()  and not self.follow_symlinks :
-                    continue
+        return artifacts
 
 
-                if item.is_dir() and self.is_artifact(item) :
-                    artifact_info = self._create_artifact_info(item)
-                    if artifact_info :
-                        artifacts.append(artifact_info)
-                        self.logger.debug(
-                            f"Detected Artifact : {item.name}"
-                            f"({artifact_info.size_formatted})"
-                        )
+    def _create_artifact_info(self, path: Path, entry: Optional[os.DirEntry] = None) -> ArtifactInfo | None:
 
-                elif item.is_file() and self.is_artifact(item) :
-                    artifact_info = self._create_artifact_info(item)
-                    if artifact_info :
-                        artifacts.append(artifact_info)
+        try:
+            if entry is not None :
+                is_dir = entry.is_dir(follow_symlinks=self.follow_symlinks)
+                stat_result = entry.stat(follow_symlinks=self.follow_symlinks)
+            else :
+                is_dir = path.is_dir()
+                stat_result = path.stat()
 
-        except (OSError, PermissionError) as e:
-            self.logger.warning(f"Cannot access the dir : {self.project_path}")
+            engine = self.size_engine
+            size_mode = engine.accounting.size_mode if engine else "apparent"
 
-        return artifacts
+            # Deduplicated sizes depend on the rest of the scan, they are neither read nor stored
+            use_cache = is_dir and self.cache is not None and not (engine and engine.accounting.deduplicate)
 
+            usage = None
+            if use_cache :
+                usage = self.cache.get_artifact_usage(path, stat_result)
+            cached = usage is not None
 
-    def _create_artifact_info(self, path: Path) -> ArtifactInfo | None:
+            deferred = is_dir and not cached and engine is not None and engine.is_parallel
 
-        try:
-            if path.is_dir() :
+            if cached or deferred :
+                size = usage.size_bytes(size_mode) if cached else 0
+            elif engine is not None :
+                usage = engine.measure(path) if is_dir else engine.measure_file(stat_result)
+                size = usage.size_bytes(size_mode)
+            elif is_dir :
                 size = calculate_directory_size(path, self.follow_symlinks)
             else :
-                size = path.stat().st_size
+                size = stat_result.st_size
 
-            last_modified = datetime.fromtimestamp(path.stat().st_mtime)
+            last_modified = datetime.fromtimestamp(stat_result.st_mtime)
 
-            return ArtifactInfo(
+            artifact_info = ArtifactInfo(
                 path = path,
                 size_bytes=size,
                 last_modified=last_modified,
@@ -167,6 +142,22 @@ class ArtifactDetector :
 
             )
 
+            if usage is not None :
+                artifact_info.apply_usage(usage, size_mode)
+
+            if self.probe_age and is_dir and (cached or usage is None) and not deferred :
+                last_used = probe_last_used(path)
+                if last_used is not None :
+                    artifact_info.touch(datetime.fromtimestamp(last_used))
+
+            if deferred :
+                usage = engine.defer(artifact_info)
+
+            if use_cache and not cached and usage is not None :
+                self.cache.remember_artifact(artifact_info, stat_result, usage)
+
+            return artifact_info
+
         except (OSError, PermissionError) as e:
             self.logger.debug(f"Impossible to calculate the size of {path}: {e}")
             return None
@@ -175,9 +166,14 @@ class ArtifactDetector :
 
 def detect_artifacts(
         project_path: Path,
-        project_type: ProjectType,
-        follow_symlinks: bool = False
+        project_type: AnyProjectType,
+        follow_symlinks: bool = False,
+        listing: Optional[DirectoryListing] = None,
+        size_engine: Optional[SizeEngine] = None,
+        cache: Optional[ScanCache] = None,
+        probe_age: bool = False,
+        rules: Optional[RuleSet] = None
 ) -> List[ArtifactInfo] :
 
-    detector = ArtifactDetector(project_path, project_type, follow_symlinks)
-    return detector.detect_artifacts()
+    detector = ArtifactDetector(project_path, project_type, follow_symlinks, size_engine, cache, probe_age, rules)
+    return detector.detect_artifacts(listing)
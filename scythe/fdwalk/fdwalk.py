@@ -0,0 +1,160 @@
+"""
+    Directory fd walking - metadata lookups relative to open directories
+"""
+
+import os
+import threading
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# os.scandir(fd) and os.open / os.stat with dir_fd (not on Windows)
+FD_WALK = (
+    os.scandir in os.supports_fd
+    and os.open in os.supports_dir_fd
+    and os.stat in os.supports_dir_fd
+)
+
+# Upper bound of the directory fds held at once by all the walks
+MAX_DIRECTORY_FDS = 256
+
+DIRECTORY_FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_CLOEXEC", 0)
+NOFOLLOW_FLAG = getattr(os, "O_NOFOLLOW", 0)
+
+# visit(path, dir_fd) lists the directory at path (through dir_fd when it is
+# not None) and returns the sub directories to walk, as the DirEntry.path of
+# os.scandir: names with a dir_fd, full paths without
+Visit = Callable[[str, Optional[int]], List[str]]
+
+
+def directory_fd_limit() -> int:
+    """
+        Directory fds the walks may hold: a quarter of RLIMIT_NOFILE, the
+        rest is left to the cache, the process pools and the caller
+    """
+    if not FD_WALK or resource is None:
+        return 0
+
+    try:
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (OSError, ValueError):
+        return 0
+    if soft == resource.RLIM_INFINITY:
+        return MAX_DIRECTORY_FDS
+    return max(0, min(MAX_DIRECTORY_FDS, soft // 4))
+
+
+class FdBudget:
+    """
+        Number of directory fds left, shared by the walking threads
+
+        A walk takes one fd per level it holds open; when none is left
+        the deeper levels are walked by path. Thread safe.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.available = limit
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.available <= 0:
+                return False
+            self.available -= 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.available += 1
+
+
+DIRECTORY_FDS = FdBudget(directory_fd_limit())
+
+
+def open_directory(name: str, dir_fd: Optional[int] = None, follow_symlinks: bool = False) -> int:
+    """
+        Open a directory, relative to dir_fd when given
+        raise: OSError, also when name is a symlink and follow_symlinks is False
+    """
+    flags = DIRECTORY_FLAGS if follow_symlinks else DIRECTORY_FLAGS | NOFOLLOW_FLAG
+    return os.open(name, flags, dir_fd=dir_fd)
+
+
+def walk_paths(path: str, visit: Visit) -> None:
+    """
+        Walk a tree by path, unreadable directories are skipped
+    """
+    stack = [path]
+
+    while stack:
+        try:
+            stack.extend(visit(stack.pop(), None))
+        except OSError:
+            continue
+
+
+def walk_tree(path: str, visit: Visit, follow_symlinks: bool = False, budget: Optional[FdBudget] = None) -> None:
+    """
+        Walk a tree depth first, calling visit on every directory
+
+        Each directory is opened relative to the fd of its parent and
+        listed with os.scandir(fd): the stats of its entries are fstatat
+        calls on a name, whatever the depth of the tree, instead of a
+        resolution of every component of a long absolute path.
+        The fds of the directories being walked stay open, one per level;
+        past the budget (default: DIRECTORY_FDS) the subtree is walked by
+        path, as it is on systems without dir_fd support.
+        Unreadable directories are skipped.
+    """
+    budget = budget or DIRECTORY_FDS
+    if not FD_WALK or not budget.acquire():
+        walk_paths(path, visit)
+        return
+
+    # (fd, path, sub directories left) of the directories being walked
+    frames: List[Tuple[int, str, List[str]]] = []
+    try:
+        try:
+            fd = open_directory(path, follow_symlinks=True)
+        except OSError:
+            budget.release()
+            return
+        frames.append((fd, path, []))
+        try:
+            frames[-1][2].extend(reversed(visit(path, fd)))
+        except OSError:
+            pass
+
+        while frames:
+            fd, directory, names = frames[-1]
+            if not names:
+                frames.pop()
+                os.close(fd)
+                budget.release()
+                continue
+
+            name = names.pop()
+            child = directory + os.sep + name if directory != os.sep else os.sep + name
+
+            if not budget.acquire():
+                walk_paths(child, visit)
+                continue
+            try:
+                child_fd = open_directory(name, fd, follow_symlinks)
+            except OSError:
+                budget.release()
+                continue
+
+            frames.append((child_fd, child, []))
+            try:
+                frames[-1][2].extend(reversed(visit(child, child_fd)))
+            except OSError:
+                continue
+    finally:
+        for fd, _, _ in frames:
+            os.close(fd)
+            budget.release()
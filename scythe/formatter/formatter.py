@@ -4,8 +4,54 @@
 
 import json
 from pathlib import Path
+from typing import Any, Dict, Iterable, TextIO
 
-from scythe.models.models import ScanResult
+from scythe.models.models import Project, ScanResult
+
+
+def project_to_dict(project: Project) -> Dict[str, Any]:
+    return {
+        "path": str(project.path),
+        "type": project.project_type.value,
+        "type_display": project.project_type.display_name,
+        "marker_files": project.marker_files,
+        "artifacts": [
+            {
+                "type": artifact.artifact_type,
+                "path": str(artifact.path),
+                "size_bytes": artifact.size_bytes,
+                "size_formatted": artifact.size_formatted,
+                "apparent_bytes": artifact.apparent_bytes,
+                "allocated_bytes": artifact.allocated_bytes,
+                "exclusive_bytes": artifact.exclusive_bytes,
+                "last_modified": artifact.last_modified.isoformat(),
+                "last_used": artifact.last_used.isoformat() if artifact.last_used else None
+            }
+            for artifact in project.artifacts
+        ],
+        "total_artifact_size": project.total_artifact_size,
+        "total_size_formatted": project.total_size_formatted
+    }
+
+
+def format_project_to_ndjson(project: Project) -> str:
+    """
+        One project as a single JSON line (NDJSON / JSON Lines)
+    """
+    return json.dumps(project_to_dict(project), ensure_ascii=False)
+
+
+def write_ndjson(projects: Iterable[Project], stream: TextIO) -> int:
+    """
+        Write every project as soon as it is produced
+        return: number of projects written
+    """
+    count = 0
+    for project in projects:
+        stream.write(format_project_to_ndjson(project) + "\n")
+        stream.flush()
+        count += 1
+    return count
 
 
 def format_to_json(result: ScanResult, pretty: bool = True) -> str:
@@ -17,34 +63,18 @@ def format_to_json(result: ScanResult, pretty: bool = True) -> str:
             "directories_scanned": result.directories_scanned,
             "files_scanned": result.files_scanned,
             "total_projects": result.total_projects,
-            "total_artifacts": sum(p.artifact_count for p in result.projects),
+            "total_artifacts": result.total_artifacts,
             "total_size_bytes": result.total_artifacts_size,
-            "total_size_formatted": result.total_artifact_size_formatted
+            "total_size_formatted": result.total_artifact_size_formatted,
+            "total_exclusive_bytes": result.total_exclusive_size
         },
-        "projects": [
-            {
-                "path": str(project.path),
-                "type": project.project_type.value,
-                "type_display": project.project_type.display_name,
-                "marker_files": project.marker_files,
-                "artifacts": [
-                    {
-                        "type": artifact.artifact_type,
-                        "path": str(artifact.path),
-                        "size_bytes": artifact.size_bytes,
-                        "size_formatted": artifact.size_formatted,
-                        "last_modified": artifact.last_modified.isoformat()
-                    }
-                    for artifact in project.artifacts
-                ],
-                "total_artifact_size": project.total_artifact_size,
-                "total_size_formatted": project.total_size_formatted
-            }
-            for project in result.projects
-        ],
+        "projects": [project_to_dict(project) for project in result.projects],
         "errors": result.errors
     }
 
+    if result.roots :
+        data["roots"] = [root.to_dict() for root in result.roots]
+
     if pretty :
         return json.dumps(data, indent=2, ensure_ascii=False)
     return json.dumps(data, ensure_ascii=False)
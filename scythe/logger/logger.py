@@ -6,6 +6,7 @@ import logging
 import sys
 from pathlib import Path
 from datetime import datetime
+from rich.console import Console
 from rich.logging import RichHandler
 
 
@@ -58,4 +59,12 @@ def setup_logger(name: str = "scythe", level: int = logging.INFO, log_file: bool
     return logger
 
 def get_logger(name: str = "scythe"):
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
+
+def redirect_console_to_stderr(logger: logging.Logger) -> None:
+    """
+    Send console logs to stderr, keeps stdout clean for machine readable output
+    """
+    for handler in logger.handlers:
+        if isinstance(handler, RichHandler):
+            handler.console = Console(stderr=True)
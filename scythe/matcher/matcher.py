@@ -0,0 +1,148 @@
+"""
+    Compiled name patterns
+"""
+
+import fnmatch
+import re
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Set, Tuple
+
+WILDCARDS = ('*', '?', '[')
+
+
+def is_glob(pattern: str) -> bool:
+    return any(c in pattern for c in WILDCARDS)
+
+
+class PatternMatcher:
+    """
+        Match file names against a set of patterns, each mapped to a value
+
+        Plain names go to a hash table, '*suffix' patterns to a tuple tested
+        with str.endswith, other wildcard patterns are compiled once (fnmatch
+        semantics, case sensitive) into a single regular expression.
+        Values are ranked by the order in which they are first given, so
+        first() returns the value a first-match-wins loop would return.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Hashable]] = ()):
+        self._exact: Dict[str, Set[Hashable]] = {}
+        self._suffixes: Dict[str, Set[Hashable]] = {}
+        self._globs: List[Tuple[re.Pattern, Hashable]] = []
+        self._compiled: Dict[str, re.Pattern] = {}
+        self._rank: Dict[Hashable, int] = {}
+        self._patterns: Dict[Hashable, List[str]] = {}
+
+        for pattern, value in patterns:
+            self._rank.setdefault(value, len(self._rank))
+            self._patterns.setdefault(value, []).append(pattern)
+
+            if is_glob(pattern):
+                regex = self._compiled.setdefault(pattern, re.compile(fnmatch.translate(pattern)))
+                if pattern.startswith('*') and not is_glob(pattern[1:]):
+                    self._suffixes.setdefault(pattern[1:], set()).add(value)
+                else:
+                    self._globs.append((regex, value))
+            else:
+                self._exact.setdefault(pattern, set()).add(value)
+
+        self._suffix_tuple = tuple(self._suffixes)
+
+        self._glob_regex: Optional[re.Pattern] = None
+        if self._globs:
+            self._glob_regex = re.compile(
+                '|'.join(f'(?:{regex.pattern})' for regex, _ in self._globs)
+            )
+
+        # exact names sorted by rank, used when a directory has many files
+        self._exact_by_rank = sorted(
+            ((min(self._rank[v] for v in values), name) for name, values in self._exact.items())
+        )
+
+    @classmethod
+    def from_table(cls, table: Mapping[Hashable, Iterable[str]]) -> "PatternMatcher":
+        """
+            Compile a {value: [patterns]} table such as PROJECT_MARKERS
+        """
+        return cls((pattern, value) for value, patterns in table.items() for pattern in patterns)
+
+    @classmethod
+    def from_patterns(cls, patterns: Iterable[str]) -> "PatternMatcher":
+        return cls((pattern, True) for pattern in patterns)
+
+    def patterns(self, value: Hashable) -> List[str]:
+        return list(self._patterns.get(value, []))
+
+    def matches(self, name: str) -> bool:
+        if name in self._exact:
+            return True
+        if self._suffix_tuple and name.endswith(self._suffix_tuple):
+            return True
+        return self._glob_regex is not None and self._glob_regex.match(name) is not None
+
+    def _wildcard_values(self, name: str) -> Set[Hashable]:
+        found = set()
+
+        if self._suffix_tuple and name.endswith(self._suffix_tuple):
+            for suffix, values in self._suffixes.items():
+                if name.endswith(suffix):
+                    found.update(values)
+
+        if self._glob_regex is not None and self._glob_regex.match(name):
+            found.update(value for regex, value in self._globs if regex.match(name))
+
+        return found
+
+    def values(self, name: str) -> Set[Any]:
+        """
+            Every value with a pattern matching name
+        """
+        return set(self._exact.get(name, ())) | self._wildcard_values(name)
+
+    def first(self, names: Iterable[str]) -> Optional[Any]:
+        """
+            Best ranked value matched by any of names
+        """
+        if not isinstance(names, (set, frozenset, dict)):
+            names = set(names)
+
+        best_rank, best_value = len(self._rank), None
+
+        if len(names) > len(self._exact_by_rank):
+            for rank, name in self._exact_by_rank:
+                if name in names:
+                    best_rank = rank
+                    best_value = min(self._exact[name], key=self._rank.__getitem__)
+                    break
+        else:
+            for name in names:
+                for value in self._exact.get(name, ()):
+                    if self._rank[value] < best_rank:
+                        best_rank, best_value = self._rank[value], value
+
+        suffixes, glob_regex = self._suffix_tuple, self._glob_regex
+        if suffixes or glob_regex is not None:
+            for name in names:
+                if not (suffixes and name.endswith(suffixes)) and not (glob_regex and glob_regex.match(name)):
+                    continue
+                for value in self._wildcard_values(name):
+                    if self._rank[value] < best_rank:
+                        best_rank, best_value = self._rank[value], value
+
+        return best_value
+
+    def names_for(self, names: Iterable[str], value: Hashable) -> List[str]:
+        """
+            names matching a pattern of value, in pattern order
+        """
+        if not isinstance(names, (set, frozenset, dict)):
+            names = set(names)
+
+        found = []
+        for pattern in self._patterns.get(value, []):
+            if is_glob(pattern):
+                regex = self._compiled[pattern]
+                found.extend(sorted(name for name in names if regex.match(name)))
+            elif pattern in names:
+                found.append(pattern)
+
+        return list(dict.fromkeys(found))
@@ -0,0 +1,402 @@
+"""
+    Compact scan result - columnar storage for very large scans
+"""
+
+import os
+import sys
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from scythe.models.models import (
+    AnyProjectType, ArtifactInfo, Project, ProjectType, ResultIndex, ResultSummary, RootStats, ScanResult,
+    get_project_type
+)
+
+# Stored in the optional integer columns instead of None
+MISSING = -1
+
+# Same encoding as os.fsencode, any file name survives the round trip
+ENCODING = sys.getfilesystemencoding()
+
+PROJECT_TYPES: List[AnyProjectType] = list(ProjectType)
+PROJECT_TYPE_CODES = {project_type: code for code, project_type in enumerate(PROJECT_TYPES)}
+
+
+def project_type_code(project_type: AnyProjectType) -> int:
+    """
+        Code of a project type, types declared by rules get the next free code
+    """
+    code = PROJECT_TYPE_CODES.get(project_type)
+    if code is None:
+        code = PROJECT_TYPE_CODES.setdefault(project_type, len(PROJECT_TYPES))
+        if code == len(PROJECT_TYPES):
+            PROJECT_TYPES.append(project_type)
+    return code
+
+
+class StringTable:
+    """
+        Interned strings, each stored once and referenced by id
+    """
+
+    __slots__ = ('_strings', '_ids')
+
+    def __init__(self):
+        self._strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._ids[value] = string_id
+        return string_id
+
+    def __getitem__(self, string_id: int) -> str:
+        return self._strings[string_id]
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+class NameColumn:
+    """
+        Strings packed into one buffer, for values that are rarely repeated
+    """
+
+    __slots__ = ('_data', '_offsets')
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array('Q', [0])
+
+    def append(self, value: str) -> None:
+        self._data += value.encode(ENCODING, 'surrogateescape')
+        self._offsets.append(len(self._data))
+
+    def __getitem__(self, index: int) -> str:
+        return self._data[self._offsets[index]:self._offsets[index + 1]].decode(ENCODING, 'surrogateescape')
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+
+def _from_optional(value: int) -> Optional[int]:
+    return None if value == MISSING else value
+
+
+class ArtifactView:
+    """
+        Read-only ArtifactInfo backed by a CompactScanResult row
+    """
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: "CompactScanResult", index: int):
+        self._store = store
+        self._index = index
+
+    @property
+    def path(self) -> Path:
+        store = self._store
+        project_path = store._project_path(store._artifact_projects[self._index])
+        return project_path / store._strings[store._artifact_names[self._index]]
+
+    @property
+    def size_bytes(self) -> int:
+        return self._store._artifact_sizes[self._index]
+
+    @property
+    def last_modified(self) -> datetime:
+        return datetime.fromtimestamp(self._store._artifact_mtimes[self._index])
+
+    @property
+    def artifact_type(self) -> str:
+        return self._store._strings[self._store._artifact_types[self._index]]
+
+    @property
+    def apparent_bytes(self) -> Optional[int]:
+        return _from_optional(self._store._artifact_apparent[self._index])
+
+    @property
+    def allocated_bytes(self) -> Optional[int]:
+        return _from_optional(self._store._artifact_allocated[self._index])
+
+    @property
+    def exclusive_bytes(self) -> Optional[int]:
+        return _from_optional(self._store._artifact_exclusive[self._index])
+
+    @property
+    def last_used(self) -> Optional[datetime]:
+        timestamp = self._store._artifact_used[self._index]
+        return None if timestamp == MISSING else datetime.fromtimestamp(timestamp)
+
+    @property
+    def last_activity(self) -> datetime:
+        return self.last_used or self.last_modified
+
+    @property
+    def size_formatted(self) -> str:
+        from scythe.utils.utils import format_size
+        return format_size(self.size_bytes)
+
+    def to_artifact(self) -> ArtifactInfo:
+        return ArtifactInfo(
+            path=self.path,
+            size_bytes=self.size_bytes,
+            last_modified=self.last_modified,
+            artifact_type=self.artifact_type,
+            apparent_bytes=self.apparent_bytes,
+            allocated_bytes=self.allocated_bytes,
+            exclusive_bytes=self.exclusive_bytes,
+            last_used=self.last_used
+        )
+
+    def __repr__(self) -> str:
+        return f"ArtifactView(path={self.path!r}, size_bytes={self.size_bytes})"
+
+
+class ProjectView:
+    """
+        Read-only Project backed by a CompactScanResult row
+    """
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: "CompactScanResult", index: int):
+        self._store = store
+        self._index = index
+
+    @property
+    def path(self) -> Path:
+        return self._store._project_path(self._index)
+
+    @property
+    def project_type(self) -> AnyProjectType:
+        return PROJECT_TYPES[self._store._project_types[self._index]]
+
+    @property
+    def marker_files(self) -> List[str]:
+        store = self._store
+        start, end = store._marker_offsets[self._index], store._marker_offsets[self._index + 1]
+        return [store._strings[string_id] for string_id in store._marker_ids[start:end]]
+
+    @property
+    def artifacts(self) -> List[ArtifactView]:
+        store = self._store
+        start, end = store._artifact_offsets[self._index], store._artifact_offsets[self._index + 1]
+        return [ArtifactView(store, index) for index in range(start, end)]
+
+    @property
+    def total_artifact_size(self) -> int:
+        return self._store._project_sizes[self._index]
+
+    @property
+    def last_scanned(self) -> datetime:
+        return datetime.fromtimestamp(self._store._project_scanned[self._index])
+
+    @property
+    def total_size_formatted(self) -> str:
+        from scythe.utils.utils import format_size
+        return format_size(self.total_artifact_size)
+
+    @property
+    def artifact_count(self) -> int:
+        offsets = self._store._artifact_offsets
+        return offsets[self._index + 1] - offsets[self._index]
+
+    def to_project(self) -> Project:
+        project = Project(
+            path=self.path,
+            project_type=self.project_type,
+            marker_files=self.marker_files,
+            artifacts=[artifact.to_artifact() for artifact in self.artifacts],
+            last_scanned=self.last_scanned
+        )
+        project.total_artifact_size = self.total_artifact_size
+        return project
+
+    def __repr__(self) -> str:
+        return f"ProjectView(path={self.path!r}, project_type={self.project_type})"
+
+
+class ProjectSequence(Sequence):
+    """
+        Projects of a CompactScanResult, views are built on access
+    """
+
+    __slots__ = ('_store',)
+
+    def __init__(self, store: "CompactScanResult"):
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self._store._project_types)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [ProjectView(self._store, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("project index out of range")
+        return ProjectView(self._store, index)
+
+    def __iter__(self) -> Iterator[ProjectView]:
+        store = self._store
+        return (ProjectView(store, index) for index in range(len(self)))
+
+
+@dataclass
+class CompactScanResult(ResultSummary):
+    """
+        ScanResult stored as columns
+
+        Project paths are split into an interned parent directory and a
+        packed name, artifact paths are stored relative to their project,
+        sizes are int64 columns, dates float timestamps (-1 for None) and project types
+        enum codes. `projects` yields lightweight read-only views with the
+        Project / ArtifactInfo attributes, to_scan_result() rebuilds the
+        regular objects.
+    """
+
+    root_path: Path
+    scan_duration: float = 0.0
+    directories_scanned: int = 0
+    files_scanned: int = 0
+    errors: List[str] = field(default_factory=list)
+    scan_date: datetime = field(default_factory=datetime.now)
+    cache_hits: int = 0
+    cache_misses: int = 0
+    roots: List[RootStats] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._strings = StringTable()
+        self._index = ResultIndex()
+
+        self._project_dirs = array('I')
+        self._project_names = NameColumn()
+        self._project_types = array('B')
+        self._project_sizes = array('q')
+        self._project_scanned = array('d')
+        self._marker_ids = array('I')
+        self._marker_offsets = array('Q', [0])
+        self._artifact_offsets = array('Q', [0])
+
+        self._artifact_projects = array('I')
+        self._artifact_names = array('I')
+        self._artifact_types = array('I')
+        self._artifact_sizes = array('q')
+        self._artifact_mtimes = array('d')
+        self._artifact_used = array('d')
+        self._artifact_apparent = array('q')
+        self._artifact_allocated = array('q')
+        self._artifact_exclusive = array('q')
+
+    @classmethod
+    def from_result(cls, result: ScanResult) -> "CompactScanResult":
+        compact = cls(
+            root_path=result.root_path,
+            scan_duration=result.scan_duration,
+            directories_scanned=result.directories_scanned,
+            files_scanned=result.files_scanned,
+            errors=result.errors,
+            scan_date=result.scan_date,
+            cache_hits=result.cache_hits,
+            cache_misses=result.cache_misses
+        )
+        compact.extend(result.projects)
+        return compact
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # Codes of the types declared by rules depend on the process
+        state['_type_values'] = [project_type.value for project_type in PROJECT_TYPES]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        codes = [project_type_code(get_project_type(value)) for value in state.pop('_type_values')]
+        if codes != list(range(len(codes))):
+            state['_project_types'] = array('B', (codes[code] for code in state['_project_types']))
+        self.__dict__.update(state)
+
+    def _project_path(self, index: int) -> Path:
+        return Path(self._strings[self._project_dirs[index]], self._project_names[index])
+
+    def add_project(self, project: Union[Project, ProjectView]) -> None:
+        intern = self._strings.intern
+        project_index = len(self._project_types)
+        project_path = str(project.path)
+        parent, name = os.path.split(project_path)
+        prefix = os.path.join(project_path, '')
+
+        self._project_dirs.append(intern(parent or project_path))
+        self._project_names.append(name)
+        self._project_types.append(project_type_code(project.project_type))
+        self._project_sizes.append(project.total_artifact_size)
+        self._project_scanned.append(project.last_scanned.timestamp())
+
+        for marker in project.marker_files:
+            self._marker_ids.append(intern(marker))
+        self._marker_offsets.append(len(self._marker_ids))
+
+        artifacts = project.artifacts
+        if artifacts:
+            names, types = self._artifact_names, self._artifact_types
+            sizes, mtimes, used = self._artifact_sizes, self._artifact_mtimes, self._artifact_used
+            apparent, allocated, exclusive = self._artifact_apparent, self._artifact_allocated, self._artifact_exclusive
+            prefix_length = len(prefix)
+
+            for artifact in artifacts:
+                # Kept absolute when outside of the project, joining keeps it as is
+                artifact_path = str(artifact.path)
+                if artifact_path.startswith(prefix):
+                    artifact_path = artifact_path[prefix_length:]
+                names.append(intern(artifact_path))
+                types.append(intern(artifact.artifact_type))
+                sizes.append(artifact.size_bytes)
+                mtimes.append(artifact.last_modified.timestamp())
+                used.append(MISSING if artifact.last_used is None else artifact.last_used.timestamp())
+                apparent.append(MISSING if artifact.apparent_bytes is None else artifact.apparent_bytes)
+                allocated.append(MISSING if artifact.allocated_bytes is None else artifact.allocated_bytes)
+                exclusive.append(MISSING if artifact.exclusive_bytes is None else artifact.exclusive_bytes)
+            self._artifact_projects.extend([project_index] * len(artifacts))
+        self._artifact_offsets.append(len(self._artifact_sizes))
+        self._index.add(project)
+
+    def extend(self, projects: Iterable[Union[Project, ProjectView]]) -> None:
+        for project in projects:
+            self.add_project(project)
+
+    @property
+    def projects(self) -> ProjectSequence:
+        return ProjectSequence(self)
+
+    @property
+    def total_projects(self) -> int:
+        return len(self._project_types)
+
+    @property
+    def index(self) -> ResultIndex:
+        return self._index
+
+    def get_property_by_type(self, project_type: AnyProjectType) -> List[ProjectView]:
+        return [ProjectView(self, i) for i in self._index.projects_by_type.get(project_type, ())]
+
+    def to_scan_result(self) -> ScanResult:
+        return ScanResult(
+            root_path=self.root_path,
+            projects=[project.to_project() for project in self.projects],
+            scan_duration=self.scan_duration,
+            directories_scanned=self.directories_scanned,
+            files_scanned=self.files_scanned,
+            errors=self.errors,
+            scan_date=self.scan_date,
+            cache_hits=self.cache_hits,
+            cache_misses=self.cache_misses,
+            roots=self.roots
+        )
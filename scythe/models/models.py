@@ -2,9 +2,10 @@
     Data Structure
 """
 
+from array import array
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 
@@ -42,6 +43,36 @@ class ProjectType(Enum) :
 
         return names.get(self, self.value)
 
+@dataclass(frozen=True)
+class CustomProjectType :
+    """
+        Project type declared by rules (see scythe.config), equal to any
+        other of the same name
+    """
+
+    value: str
+
+    def __str__(self):
+        return self.value
+
+    @property
+    def display_name(self):
+        return self.value.replace("_", " ").title()
+
+AnyProjectType = Union[ProjectType, CustomProjectType]
+
+def get_project_type(value: str) -> AnyProjectType:
+    """
+        Built-in project type of a value, or the type declared by rules
+        raise: ValueError when value is not a lowercase identifier
+    """
+    try:
+        return ProjectType(value)
+    except ValueError:
+        if not isinstance(value, str) or not value.isidentifier() or value != value.lower():
+            raise
+    return CustomProjectType(value)
+
 @dataclass
 class ArtifactInfo :
         """
@@ -52,17 +83,80 @@ class ArtifactInfo :
         size_bytes: int
         last_modified: datetime
         artifact_type: str
+        apparent_bytes: Optional[int] = None
+        allocated_bytes: Optional[int] = None
+        exclusive_bytes: Optional[int] = None
+        last_used: Optional[datetime] = None
 
         @property
         def size_formatted(self) -> str :
             from scythe.utils.utils import format_size
             return format_size(self.size_bytes)
 
+        def apply_usage(self, usage: "DiskUsage", size_mode: str = "apparent") -> None:
+            self.size_bytes = usage.size_bytes(size_mode)
+            self.apparent_bytes = usage.apparent_bytes
+            self.allocated_bytes = usage.allocated_bytes
+            self.exclusive_bytes = usage.exclusive_bytes
+            if usage.last_used is not None :
+                self.touch(datetime.fromtimestamp(usage.last_used))
+
+        def touch(self, last_used: datetime) -> None:
+            """
+                Record a use of the artifact, the most recent one is kept
+            """
+            if self.last_used is None or last_used > self.last_used :
+                self.last_used = last_used
+
+        @property
+        def last_activity(self) -> datetime:
+            return self.last_used or self.last_modified
+
+
+@dataclass
+class DiskUsage :
+        """
+            Space used by a tree of files
+
+            apparent_bytes sums st_size, allocated_bytes sums st_blocks * 512
+            (sparse files count for what they really use). exclusive_bytes is
+            what deleting the tree would free, in the accounting size mode;
+            it is only measured when hard links are tracked.
+            last_used is the latest st_atime / st_mtime of the files (epoch).
+            directories holds the (path, st_mtime_ns, st_ino) of the sub
+            directories walked, when the accounting tracks them.
+        """
+
+        apparent_bytes: int = 0
+        allocated_bytes: int = 0
+        exclusive_bytes: Optional[int] = None
+        files: int = 0
+        last_used: Optional[float] = None
+        directories: Optional[List[Tuple[str, int, int]]] = None
+
+        def size_bytes(self, size_mode: str = "apparent") -> int :
+            if size_mode == "allocated" :
+                return self.allocated_bytes
+            return self.apparent_bytes
+
+        def add(self, other: "DiskUsage") -> None :
+            self.apparent_bytes += other.apparent_bytes
+            self.allocated_bytes += other.allocated_bytes
+            self.files += other.files
+            if other.exclusive_bytes is not None :
+                self.exclusive_bytes = (self.exclusive_bytes or 0) + other.exclusive_bytes
+            if other.last_used is not None and (self.last_used is None or other.last_used > self.last_used) :
+                self.last_used = other.last_used
+            if other.directories :
+                if self.directories is None :
+                    self.directories = []
+                self.directories.extend(other.directories)
+
 
 @dataclass
 class Project:
         path: Path
-        project_type: ProjectType
+        project_type: AnyProjectType
         marker_files: List[str] = field(default_factory=list)
         artifacts: List[ArtifactInfo] = field(default_factory=list)
         total_artifact_size: int = 0
@@ -79,50 +173,173 @@ class Project:
         @property
         def artifact_count(self):
             return len(self.artifacts)
+
+
 @dataclass
-class ScanResult :
-    root_path: Path
-    projects: List[Project] = field(default_factory=list)
-    scan_duration: float = 0.0
+class ResultIndex :
+    """
+        Running totals of a scan result, updated one project at a time
+
+        Every summary query reads these counters instead of walking the
+        projects again.
+    """
+
+    projects: int = 0
+    artifacts: int = 0
+    total_bytes: int = 0
+    exclusive_bytes: Optional[int] = None
+    # Indexes of the projects of every type, 4 bytes each
+    projects_by_type: Dict[AnyProjectType, array] = field(default_factory=dict)
+    bytes_by_type: Dict[AnyProjectType, int] = field(default_factory=dict)
+    artifacts_by_type: Dict[str, int] = field(default_factory=dict)
+    artifact_bytes_by_type: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, project: "Project") -> None:
+        project_type = project.project_type
+        size = project.total_artifact_size
+
+        self.projects_by_type.setdefault(project_type, array('I')).append(self.projects)
+        self.bytes_by_type[project_type] = self.bytes_by_type.get(project_type, 0) + size
+        self.projects += 1
+        self.total_bytes += size
+
+        for artifact in project.artifacts :
+            artifact_type = artifact.artifact_type
+            self.artifacts += 1
+            self.artifacts_by_type[artifact_type] = self.artifacts_by_type.get(artifact_type, 0) + 1
+            self.artifact_bytes_by_type[artifact_type] = (
+                self.artifact_bytes_by_type.get(artifact_type, 0) + artifact.size_bytes
+            )
+            if artifact.exclusive_bytes is not None :
+                self.exclusive_bytes = (self.exclusive_bytes or 0) + artifact.exclusive_bytes
+
+    def count_by_type(self, project_type: AnyProjectType) -> int:
+        return len(self.projects_by_type.get(project_type, ()))
+
+
+@dataclass
+class RootStats :
+    """
+        Stats of one root of a multi-root scan
+    """
+    path: Path
+    device: int
+    projects: int = 0
+    artifacts: int = 0
+    artifacts_size: int = 0
     directories_scanned: int = 0
     files_scanned: int = 0
-    errors: List[str] = field(default_factory=list)
-    scan_date: datetime = field(default_factory=datetime.now)
+    errors: int = 0
+    scan_duration: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "device": self.device,
+            "projects": self.projects,
+            "artifacts": self.artifacts,
+            "artifacts_size": self.artifacts_size,
+            "directories_scanned": self.directories_scanned,
+            "files_scanned": self.files_scanned,
+            "errors": self.errors,
+            "scan_duration": self.scan_duration,
+        }
+
+
+class ResultSummary :
+    """
+        Totals and summary of a scan result, read from its index
+        Shared by ScanResult and CompactScanResult.
+    """
 
     @property
-    def total_projects(self) -> int:
-        return len(self.projects)
+    def total_artifacts(self) -> int:
+        return self.index.artifacts
+
+    @property
+    def cache_hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        if lookups == 0:
+            return 0.0
+        return (self.cache_hits / lookups) * 100
 
     @property
     def total_artifacts_size(self) -> int:
-        return sum(p.total_artifact_size for p in self.projects)
+        return self.index.total_bytes
+
+    @property
+    def total_exclusive_size(self) -> Optional[int]:
+        return self.index.exclusive_bytes
 
     @property
     def total_artifact_size_formatted(self) -> str:
         from scythe.utils.utils import format_size
         return format_size(self.total_artifacts_size)
 
-    def get_property_by_type(self, project_type: ProjectType) -> List[Project]:
-        return [p for p in self.projects if p.project_type == project_type]
-
     def get_summary(self) -> Dict[str, str]:
+        index = self.index
         summary = {
             "total_projects": self.total_projects,
-            "total_artifacts": sum(p.artifact_count for p in self.projects),
-            "total_size_bytes": self.total_artifacts_size,
+            "total_artifacts": index.artifacts,
+            "total_size_bytes": index.total_bytes,
             "directories_scanned": self.directories_scanned,
             "files_scanned": self.files_scanned,
             "errors": self.errors,
         }
 
-        for project_type in ProjectType:
-            count = len(self.get_property_by_type(project_type))
-            if count > 0 :
-                summary[f"{project_type.value}_projects"] = count
+        for project_type, projects in index.projects_by_type.items():
+            summary[f"{project_type.value}_projects"] = len(projects)
 
         return summary
 
 
+@dataclass
+class ScanResult(ResultSummary) :
+    root_path: Path
+    projects: List[Project] = field(default_factory=list)
+    scan_duration: float = 0.0
+    directories_scanned: int = 0
+    files_scanned: int = 0
+    errors: List[str] = field(default_factory=list)
+    scan_date: datetime = field(default_factory=datetime.now)
+    cache_hits: int = 0
+    cache_misses: int = 0
+    roots: List[RootStats] = field(default_factory=list)
+    _index: Optional[ResultIndex] = field(default=None, init=False, repr=False, compare=False)
+    _indexed_projects: Optional[List[Project]] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def index(self) -> ResultIndex:
+        """
+            Aggregates of the projects, brought up to date on access
+
+            Projects appended to `projects` are indexed incrementally, a
+            replaced or shortened list is indexed again from scratch.
+            Projects are expected not to change once added.
+        """
+        index = self._index
+        if index is None or self._indexed_projects is not self.projects or index.projects > len(self.projects):
+            index = self._index = ResultIndex()
+            self._indexed_projects = self.projects
+
+        for project in self.projects[index.projects:] :
+            index.add(project)
+
+        return index
+
+    def add_project(self, project: Project) -> None:
+        self.projects.append(project)
+        if self._index is not None and self._indexed_projects is self.projects :
+            self._index.add(project)
+
+    @property
+    def total_projects(self) -> int:
+        return len(self.projects)
+
+    def get_property_by_type(self, project_type: AnyProjectType) -> List[Project]:
+        return [self.projects[i] for i in self.index.projects_by_type.get(project_type, ())]
+
+
 @dataclass
 class CleanResult :
     """
@@ -131,11 +348,17 @@ class CleanResult :
 
     projects_cleaned: List[Project] = field(default_factory=list)
     artifacts_deleted: int = 0
-    space_freed: int = 0 #bytes
+    space_freed: int = 0 #bytes, estimated by the scan
     errors: List[str] = field(default_factory=list)
     skipped: List[str] = field(default_factory=list)
     clean_duration: float = 0.0
     dry_run: bool = False
+    trash_dirs: List[str] = field(default_factory=list)
+    entries_removed: int = 0 #files and directories unlinked
+    space_freed_measured: Optional[int] = None #bytes of the inodes released
+    inodes_freed: int = 0
+    space_freed_observed: Optional[int] = None #statvfs delta of the file systems
+    space_freed_by_filesystem: Dict[str, int] = field(default_factory=dict)
 
     @property
     def space_freed_formatted(self)-> str:
@@ -150,6 +373,11 @@ class CleanResult :
             return 100.0
         return (self.artifacts_deleted / total) *  100
 
+    @property
+    def entries_per_second(self)-> float:
+        if self.clean_duration <= 0:
+            return 0.0
+        return self.entries_removed / self.clean_duration
 
     def get_summary(self)-> Dict[str, Any]:
         return {
@@ -160,5 +388,12 @@ class CleanResult :
             "errors": len(self.errors),
             "skipped": len(self.skipped),
             "success_rate": self.success_rate,
-            "dry_run": self.dry_run
+            "dry_run": self.dry_run,
+            "trash_dirs": self.trash_dirs,
+            "entries_removed": self.entries_removed,
+            "entries_per_second": self.entries_per_second,
+            "space_freed_measured": self.space_freed_measured,
+            "inodes_freed": self.inodes_freed,
+            "space_freed_observed": self.space_freed_observed,
+            "space_freed_by_filesystem": self.space_freed_by_filesystem
         }
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""
+    Mount points - file system boundaries of a scan
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from scythe.logger.logger import get_logger
+
+MOUNTINFO = "/proc/self/mountinfo"
+
+# Kernel and virtual file systems, `--skip-fs-type pseudo`
+PSEUDO_FS_TYPES = frozenset({
+    "proc", "sysfs", "devtmpfs", "devpts", "cgroup", "cgroup2", "debugfs", "tracefs",
+    "securityfs", "pstore", "bpf", "autofs", "mqueue", "hugetlbfs", "configfs",
+    "fusectl", "binfmt_misc", "efivarfs", "rpc_pipefs", "nsfs",
+})
+
+_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+
+@dataclass
+class Mount:
+    mount_point: str
+    fs_type: str
+    source: str
+    device: str
+
+
+def unescape(field: str) -> str:
+    """
+        Decode the octal escapes of mountinfo fields (\\040 is a space)
+    """
+    return _ESCAPE.sub(lambda match: chr(int(match.group(1), 8)), field)
+
+
+def parse_mountinfo(text: str) -> List[Mount]:
+    """
+        Mounts of a /proc/<pid>/mountinfo listing, malformed lines are skipped
+    """
+    mounts = []
+    for line in text.splitlines():
+        fields = line.split()
+        try:
+            separator = fields.index("-", 6)
+            mounts.append(Mount(
+                mount_point=unescape(fields[4]),
+                fs_type=fields[separator + 1],
+                source=unescape(fields[separator + 2]),
+                device=fields[2]
+            ))
+        except (ValueError, IndexError):
+            continue
+    return mounts
+
+
+def read_mounts(path: str = MOUNTINFO) -> Optional[List[Mount]]:
+    """
+        Mounts of this process, None where mountinfo is not available
+    """
+    try:
+        with open(path, encoding="utf-8", errors="surrogateescape") as stream:
+            return parse_mountinfo(stream.read())
+    except OSError:
+        return None
+
+
+def device_id(device: int) -> str:
+    """
+        major:minor of a st_dev, as in the third field of mountinfo
+    """
+    return f"{os.major(device)}:{os.minor(device)}"
+
+
+def mount_point(path: Path) -> Path:
+    """
+        Mount point of the file system holding path
+    """
+    path = Path(path).resolve()
+    while not os.path.ismount(path) and path.parent != path:
+        path = path.parent
+    return path
+
+
+def expand_fs_types(names: Iterable[str]) -> Set[str]:
+    """
+        File system types to skip, `pseudo` stands for PSEUDO_FS_TYPES,
+        comma separated lists are accepted
+    """
+    fs_types: Set[str] = set()
+    for name in names:
+        for fs_type in name.split(","):
+            fs_type = fs_type.strip()
+            if fs_type == "pseudo":
+                fs_types |= PSEUDO_FS_TYPES
+            elif fs_type:
+                fs_types.add(fs_type)
+    return fs_types
+
+
+class MountFilter:
+    """
+        Directories a scan of root must not enter
+
+        From the mount table, the mount points below root that are on
+        another device (one_file_system) or whose type is in skip_fs_types
+        are excluded, so the walk only pays a set lookup per directory.
+        Devices are compared with the major:minor field of the table: a
+        mount point is never stat'ed, a dead network mount cannot hang
+        the scan before it starts. Followed symlinks are checked against
+        the mount holding their target, found in the table as well.
+        Without a mount table (not Linux), one_file_system compares the
+        st_dev of every directory with the root's and file system types
+        cannot be skipped.
+
+        Attributes :
+        root, root_device, one_file_system, skip_fs_types, excluded, devices
+    """
+
+    def __init__(self,
+                 root: Path,
+                 one_file_system: bool = False,
+                 skip_fs_types: Optional[Set[str]] = None,
+                 mounts: Optional[List[Mount]] = None):
+        self.root = Path(root)
+        self.root_device = os.stat(root).st_dev
+        self.one_file_system = one_file_system
+        self.skip_fs_types = set(skip_fs_types or ())
+        self.logger = get_logger()
+
+        if mounts is None:
+            mounts = read_mounts()
+        self.check_device = mounts is None and one_file_system
+        if mounts is None and self.skip_fs_types:
+            self.logger.warning("No mount table on this system, file system types are not skipped")
+
+        # Device of every mount point, the last mount over a path wins
+        self.devices: Dict[str, str] = {mount.mount_point: mount.device for mount in mounts or ()}
+
+        self.excluded: Set[str] = set()
+        for mount in mounts or ():
+            if self._excludes_mount(mount):
+                self.logger.debug(f"Not crossing into {mount.mount_point} ({mount.fs_type})")
+                self.excluded.add(mount.mount_point)
+
+    def _excludes_mount(self, mount: Mount) -> bool:
+        mount_point = Path(mount.mount_point)
+        if mount_point == self.root or self.root not in mount_point.parents:
+            return False
+
+        if mount.fs_type in self.skip_fs_types:
+            return True
+
+        return self.one_file_system and mount.device != device_id(self.root_device)
+
+    def _device_of(self, path: str) -> Optional[str]:
+        """
+            major:minor of the mount holding path, from the mount table
+        """
+        while True:
+            device = self.devices.get(path)
+            if device is not None:
+                return device
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+
+    def excludes(self, path: str, is_symlink: bool = False) -> bool:
+        """
+            True when the directory at path is across a boundary
+            is_symlink: followed symlinks may point to any file system
+        """
+        if path in self.excluded:
+            return True
+
+        if self.check_device:
+            try:
+                return os.stat(path).st_dev != self.root_device
+            except OSError:
+                return False
+
+        if is_symlink and self.one_file_system:
+            try:
+                target = os.path.normpath(os.path.join(os.path.dirname(path), os.readlink(path)))
+            except OSError:
+                return False
+            device = self._device_of(target)
+            return device is not None and device != device_id(self.root_device)
+        return False
+
+    def has_boundary_below(self, path: Path) -> bool:
+        """
+            True when a walk of path could meet an excluded directory, sizes
+            cached by an unfiltered scan are then not valid
+        """
+        if self.check_device:
+            return True
+        prefix = str(path) + os.sep
+        return any(mount_point.startswith(prefix) for mount_point in self.excluded)
+
+
+def mount_filter(root: Path,
+                 one_file_system: bool = False,
+                 skip_fs_types: Optional[Set[str]] = None) -> Optional[MountFilter]:
+    """
+        MountFilter of root, None when nothing has to be filtered
+    """
+    if not one_file_system and not skip_fs_types:
+        return None
+    return MountFilter(root, one_file_system, skip_fs_types)
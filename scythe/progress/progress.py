@@ -0,0 +1,154 @@
+"""
+    Progress reporter - throttled counters for scan and clean
+"""
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Optional
+
+# Seconds between two snapshots sent to the callback
+REPORT_INTERVAL = 0.1
+
+
+@dataclass
+class ProgressSnapshot:
+    """
+        Counters of a running scan or clean at one point in time
+    """
+    phase: str
+    elapsed: float = 0.0
+    directories: int = 0
+    files: int = 0
+    bytes_done: int = 0
+    bytes_total: Optional[int] = None
+    items_done: int = 0
+    items_total: Optional[int] = None
+    queue_depth: int = 0
+    current: Optional[str] = None
+    finished: bool = False
+
+    @property
+    def directories_per_second(self) -> float:
+        return self.directories / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """
+            Seconds left from the bytes remaining at the current rate
+        """
+        if self.bytes_total is None:
+            return None
+        remaining = max(0, self.bytes_total - self.bytes_done)
+        if remaining == 0:
+            return 0.0
+        rate = self.bytes_per_second
+        return remaining / rate if rate > 0 else None
+
+
+class ProgressReporter:
+    """
+        Collect progress counters and send a ProgressSnapshot to callback
+        at most once every interval seconds
+
+        Counters are updated from any thread, the callback runs in the
+        thread whose update crossed the interval (never two at once) and
+        must not update the reporter itself.
+        Scans nest: every begin() is paired with a finish(), the last
+        finish() sends a final snapshot (finish() alone always does).
+    """
+
+    def __init__(self,
+                 callback: Callable[[ProgressSnapshot], None],
+                 phase: str = "scan",
+                 interval: float = REPORT_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.callback = callback
+        self.interval = interval
+        self.clock = clock
+        self.snapshot = ProgressSnapshot(phase=phase)
+        self.reports = 0
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._start = clock()
+        self._next_report = self._start + interval
+
+    def start(self, bytes_total: Optional[int] = None, items_total: Optional[int] = None) -> None:
+        with self._lock:
+            self.snapshot = ProgressSnapshot(
+                phase=self.snapshot.phase,
+                bytes_total=bytes_total,
+                items_total=items_total
+            )
+            self._start = self.clock()
+            self._next_report = self._start + self.interval
+
+    def begin(self) -> None:
+        with self._lock:
+            self._active += 1
+
+    def directory(self, path: str, files: int) -> None:
+        with self._lock:
+            self.snapshot.directories += 1
+            self.snapshot.files += files
+            self.snapshot.current = path
+        self._maybe_report()
+
+    def sized(self, size: int) -> None:
+        with self._lock:
+            self.snapshot.bytes_done += size
+        self._maybe_report()
+
+    def item_done(self, size: int = 0, name: Optional[str] = None) -> None:
+        with self._lock:
+            self.snapshot.items_done += 1
+            self.snapshot.bytes_done += size
+            if name is not None:
+                self.snapshot.current = name
+        self._maybe_report()
+
+    def advance(self, directories: int = 0, files: int = 0, bytes_done: int = 0) -> None:
+        """
+            Counters of work done elsewhere (a worker process)
+        """
+        with self._lock:
+            self.snapshot.directories += directories
+            self.snapshot.files += files
+            self.snapshot.bytes_done += bytes_done
+        self._maybe_report()
+
+    def queue(self, depth: int) -> None:
+        self.snapshot.queue_depth = depth
+
+    def finish(self) -> None:
+        with self._lock:
+            self._active = max(0, self._active - 1)
+            if self._active:
+                return
+            self.snapshot.finished = True
+            self.snapshot.queue_depth = 0
+        self._report()
+
+    def _maybe_report(self) -> None:
+        if self.clock() >= self._next_report:
+            self._report()
+
+    def _report(self) -> None:
+        with self._lock:
+            now = self.clock()
+            if now < self._next_report and not self.snapshot.finished:
+                return
+            self._next_report = now + self.interval
+            self.snapshot.elapsed = now - self._start
+            snapshot = replace(self.snapshot)
+            self.reports += 1
+            self.callback(snapshot)
@@ -0,0 +1,172 @@
+"""
+    Rules - project markers and artifact patterns, compiled once
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from scythe.models.models import AnyProjectType, ProjectType
+from scythe.matcher.matcher import PatternMatcher
+
+BUILTIN = "built-in"
+
+PROJECT_MARKERS: Dict[ProjectType, List[str]] = {
+    ProjectType.NODE: ['package.json', 'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml'],
+    ProjectType.PYTHON: ['requirements.txt', 'setup.py', 'pyproject.toml', 'Pipfile', 'poetry.lock'],
+    ProjectType.RUST: ['Cargo.toml', 'Cargo.lock'],
+    ProjectType.JAVA_MAVEN: ['pom.xml'],
+    ProjectType.JAVA_GRADLE: ['build.gradle', 'build.gradle.kts', 'settings.gradle'],
+    ProjectType.GO: ['go.mod', 'go.sum'],
+    ProjectType.RUBY: ['Gemfile', 'Gemfile.lock', '.ruby-version'],
+    ProjectType.DOTNET: ['*.csproj', '*.fsproj', '*.vbproj', '*.sln']
+}
+
+# Artifacts matches project type
+
+ARTIFACT_PATTERNS: Dict[ProjectType, List[str]] = {
+    ProjectType.NODE: [
+        'node_modules',
+        'dist',
+        'build',
+        '.next',
+        '.nuxt',
+        'out',
+        '.cache',
+        '.parcel-cache',
+        '.turbo',
+        'coverage'
+    ],
+
+    ProjectType.PYTHON: [
+        '.venv',
+        'venv',
+        'env',
+        '__pycache__',
+        '.pytest_cache',
+        '.mypy_cache',
+        '.ruff_cache',
+        '.tox',
+        '*.egg-info',
+        'dist',
+        'build',
+        '.eggs',
+        'htmlcov',
+        '.coverage'
+    ],
+
+    ProjectType.RUST: [
+        'target'
+    ],
+
+    ProjectType.JAVA_MAVEN: [
+        'target',
+        '.m2/repository'
+    ],
+
+    ProjectType.JAVA_GRADLE: [
+        'build',
+        '.gradle',
+        'out'
+    ],
+
+    ProjectType.GO: [
+        'bin',
+        'pkg',
+        'vendor'
+    ],
+
+    ProjectType.RUBY: [
+        'vendor/bundle',
+        '.bundle',
+        'tmp'
+    ],
+
+    ProjectType.DOTNET: [
+        'bin',
+        'obj',
+        'packages',
+        '.vs'
+    ]
+}
+
+
+@dataclass
+class Rule:
+    """
+        Markers that make a directory a project of project_type and the
+        artifact patterns of such a project
+    """
+    project_type: AnyProjectType
+    markers: List[str] = field(default_factory=list)
+    artifacts: List[str] = field(default_factory=list)
+    source: str = BUILTIN
+
+
+def builtin_rules() -> List[Rule]:
+    return [
+        Rule(project_type, list(markers), list(ARTIFACT_PATTERNS.get(project_type, [])))
+        for project_type, markers in PROJECT_MARKERS.items()
+    ]
+
+
+def fingerprint(rules: Iterable[Rule]) -> str:
+    """
+        Digest of what the rules match, their source is left out
+    """
+    content = [[rule.project_type.value, rule.markers, rule.artifacts] for rule in rules]
+    return hashlib.sha1(json.dumps(content).encode()).hexdigest()[:16]
+
+
+BUILTIN_FINGERPRINT = fingerprint(builtin_rules())
+
+
+class RuleSet:
+    """
+        Rules compiled into the matchers used by the scanner and the detector
+
+        A directory whose names match the markers of several rules is a
+        project of the first one, rules without markers are dropped.
+        cache_key is empty for the built-in rules, so scan cache entries
+        only change with custom rules.
+
+        Attributes :
+        rules, sources, markers, artifacts, cache_key
+    """
+
+    def __init__(self, rules: Iterable[Rule], sources: Optional[List[str]] = None):
+        self.rules = [rule for rule in rules if rule.markers]
+        self.sources = list(sources or [])
+
+        self.markers = PatternMatcher.from_table({rule.project_type: rule.markers for rule in self.rules})
+        self.artifacts = PatternMatcher.from_table({rule.project_type: rule.artifacts for rule in self.rules})
+
+        digest = fingerprint(self.rules)
+        self.cache_key = "" if digest == BUILTIN_FINGERPRINT else digest
+
+    def rule(self, project_type: AnyProjectType) -> Optional[Rule]:
+        return next((rule for rule in self.rules if rule.project_type == project_type), None)
+
+    def artifact_patterns(self, project_type: AnyProjectType) -> List[str]:
+        return self.artifacts.patterns(project_type)
+
+
+DEFAULT_RULES = RuleSet(builtin_rules())
+
+_active_rules = DEFAULT_RULES
+
+
+def get_rules() -> RuleSet:
+    """
+        Rules used by scanners created without rules, see set_rules()
+    """
+    return _active_rules
+
+
+def set_rules(rules: Optional[RuleSet]) -> None:
+    """
+        Make rules the default of every scan, None restores the built-in rules
+    """
+    global _active_rules
+    _active_rules = rules or DEFAULT_RULES
@@ -0,0 +1,288 @@
+"""
+    Async scanner - asyncio front end of the directory scanner
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from scythe.models.models import Project, ScanResult
+from scythe.models.compact import CompactScanResult
+from scythe.scanner.scanner import CACHE_FLUSH_SIZE, DirectoryScanner
+from scythe.sizer.sizer import SizeAccounting, SizeEngine
+from scythe.cache.cache import ScanCache
+from scythe.progress.progress import ProgressReporter
+from scythe.rules.rules import RuleSet
+
+# Directories listed at the same time
+DEFAULT_CONCURRENCY = 8
+
+# Seconds between two progress callbacks
+PROGRESS_INTERVAL = 0.1
+
+
+class AsyncDirectoryScanner(DirectoryScanner):
+    """
+        Scanner to await from an asyncio event loop
+
+        Directory listings, stats and artifact sizing run on a bounded pool
+        of `concurrency` threads, the event loop only schedules them and
+        hands out projects, so other coroutines keep running during a scan.
+        Projects are yielded as soon as their artifacts are sized, in
+        completion order rather than walk order.
+        progress_callback is called from the event loop every
+        progress_interval seconds with the directory being scanned,
+        instead of once per directory.
+    """
+
+    def __init__(self,
+                 root_path: Path,
+                 max_depth: int = -1,
+                 follow_symlinks: bool = False,
+                 custom_ignores: Optional[Set[str]] = None,
+                 progress_callback: Optional[Callable[[str], None]] = None,
+                 prune_artifacts: bool = True,
+                 jobs: int = 1,
+                 cache: Optional[ScanCache] = None,
+                 size_mode: str = "apparent",
+                 deduplicate: bool = False,
+                 compact: bool = False,
+                 top: Optional[int] = None,
+                 min_size: int = 0,
+                 older_than: Optional[float] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 progress_interval: float = PROGRESS_INTERVAL,
+                 progress: Optional[ProgressReporter] = None,
+                 one_file_system: bool = False,
+                 skip_fs_types: Optional[Set[str]] = None,
+                 rules: Optional[RuleSet] = None):
+        super().__init__(
+            root_path=root_path,
+            max_depth=max_depth,
+            follow_symlinks=follow_symlinks,
+            custom_ignores=custom_ignores,
+            prune_artifacts=prune_artifacts,
+            jobs=jobs,
+            cache=cache,
+            size_mode=size_mode,
+            deduplicate=deduplicate,
+            compact=compact,
+            top=top,
+            min_size=min_size,
+            older_than=older_than,
+            progress=progress,
+            one_file_system=one_file_system,
+            skip_fs_types=skip_fs_types,
+            rules=rules
+        )
+        self.concurrency = max(1, concurrency)
+        self.progress_interval = progress_interval
+        self.report_progress = progress_callback
+
+    async def scan(self) -> Union[ScanResult, CompactScanResult]:
+        if self.compact:
+            result = CompactScanResult(root_path=self.root_path)
+            async for project in self.iter_projects():
+                result.add_project(project)
+        else:
+            result = ScanResult(root_path=self.root_path, projects=[p async for p in self.iter_projects()])
+
+        return self._finish_result(result)
+
+    async def iter_projects(self) -> AsyncIterator[Project]:
+        """
+            Async version of DirectoryScanner.iter_projects
+            Closing the iterator early stops the walk, directories already
+            being listed are finished but nothing new is started.
+        """
+        selector = self._start_scan()
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="scythe-walk")
+        accounting = SizeAccounting(self.size_mode, self.deduplicate,
+                                    track_directories=self.cache is not None and not self.deduplicate)
+        size_engine = SizeEngine(self.jobs, self.follow_symlinks, accounting=accounting,
+                                 mount_filter=self.mount_filter)
+        self.size_engine = size_engine
+
+        progress = None
+        if self.report_progress:
+            progress = loop.create_task(self._progress_timer())
+
+        # Depth first worklist, keeps the number of known directories low
+        worklist: List[Tuple[Path, int]] = []
+        if not self.should_skip_directory(self.root_path, 0):
+            worklist.append((self.root_path, 0))
+
+        visits: Dict[asyncio.Future, int] = {}
+        sizing: Set[asyncio.Future] = set()
+
+        try:
+            while worklist or visits or sizing:
+                while worklist and len(visits) < self.concurrency:
+                    directory, depth = worklist.pop()
+                    visits[loop.run_in_executor(executor, self._visit, directory, depth)] = depth
+
+                if self.progress:
+                    self.progress.queue(len(worklist) + len(sizing))
+
+                done, _ = await asyncio.wait([*visits, *sizing], return_when=asyncio.FIRST_COMPLETED)
+
+                ready: List[Project] = []
+                for future in done:
+                    if future in visits:
+                        depth = visits.pop(future)
+                        project, children = future.result()
+                        worklist.extend((child, depth + 1) for child in reversed(children))
+                        if project is None:
+                            continue
+                        pending = size_engine.pending(project.artifacts)
+                        if pending:
+                            sizing.add(loop.create_task(self._sized(project, pending)))
+                        else:
+                            ready.append(self._finalize_project(project))
+                    else:
+                        sizing.discard(future)
+                        ready.append(future.result())
+
+                for project in ready:
+                    if selector is None:
+                        yield project
+                    elif selector.top is None:
+                        kept = selector.keep(project)
+                        if kept is not None:
+                            yield kept
+                    else:
+                        selector.offer(project)
+
+                if (self.cache and not visits and not sizing
+                        and self.cache.pending_count >= CACHE_FLUSH_SIZE):
+                    await loop.run_in_executor(executor, self.cache.flush)
+
+            if selector is not None and selector.top is not None:
+                for project in selector.projects():
+                    yield project
+
+            if self.cache:
+                await loop.run_in_executor(executor, self.cache.flush)
+        except Exception as e:
+            self.logger.error(f"Fatal Error while Scanning : {e}")
+            self.errors.append(f"Fatal Error: {str(e)}")
+        finally:
+            if progress:
+                progress.cancel()
+            for future in [*visits, *sizing]:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            await loop.run_in_executor(None, size_engine.close)
+            self.size_engine = None
+            self.scan_duration = time.time() - start_time
+            if self.progress:
+                self.progress.finish()
+
+    async def _sized(self, project: Project, pending: List) -> Project:
+        await asyncio.wait([asyncio.wrap_future(future) for future in pending])
+        return self._finalize_project(project)
+
+    async def _progress_timer(self) -> None:
+        last = None
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            directory = self.current_directory
+            if directory is not None and directory != last:
+                self.report_progress(f"Scanning {directory}")
+                last = directory
+
+
+async def async_scan_directory(
+        path: Path,
+        max_depth: int = -1,
+        follow_symlinks: bool = False,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        prune_artifacts: bool = True,
+        jobs: int = 1,
+        cache: Optional[ScanCache] = None,
+        size_mode: str = "apparent",
+        deduplicate: bool = False,
+        compact: bool = False,
+        top: Optional[int] = None,
+        min_size: int = 0,
+        older_than: Optional[float] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        progress: Optional[ProgressReporter] = None,
+        one_file_system: bool = False,
+        skip_fs_types: Optional[Set[str]] = None,
+        rules: Optional[RuleSet] = None) -> Union[ScanResult, CompactScanResult]:
+    """
+        Awaitable version of scan_directory
+    """
+    scanner = AsyncDirectoryScanner(
+        root_path=path,
+        max_depth=max_depth,
+        follow_symlinks=follow_symlinks,
+        progress_callback=progress_callback,
+        prune_artifacts=prune_artifacts,
+        jobs=jobs,
+        cache=cache,
+        size_mode=size_mode,
+        deduplicate=deduplicate,
+        compact=compact,
+        top=top,
+        min_size=min_size,
+        older_than=older_than,
+        concurrency=concurrency,
+        progress=progress,
+        one_file_system=one_file_system,
+        skip_fs_types=skip_fs_types,
+        rules=rules
+    )
+
+    return await scanner.scan()
+
+
+async def async_iter_projects(
+        path: Path,
+        max_depth: int = -1,
+        follow_symlinks: bool = False,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        prune_artifacts: bool = True,
+        jobs: int = 1,
+        cache: Optional[ScanCache] = None,
+        size_mode: str = "apparent",
+        deduplicate: bool = False,
+        top: Optional[int] = None,
+        min_size: int = 0,
+        older_than: Optional[float] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        progress: Optional[ProgressReporter] = None,
+        one_file_system: bool = False,
+        skip_fs_types: Optional[Set[str]] = None,
+        rules: Optional[RuleSet] = None) -> AsyncIterator[Project]:
+    """
+        Async streaming version of scan_directory, see AsyncDirectoryScanner.iter_projects
+    """
+    scanner = AsyncDirectoryScanner(
+        root_path=path,
+        max_depth=max_depth,
+        follow_symlinks=follow_symlinks,
+        progress_callback=progress_callback,
+        prune_artifacts=prune_artifacts,
+        jobs=jobs,
+        cache=cache,
+        size_mode=size_mode,
+        deduplicate=deduplicate,
+        top=top,
+        min_size=min_size,
+        older_than=older_than,
+        concurrency=concurrency,
+        progress=progress,
+        one_file_system=one_file_system,
+        skip_fs_types=skip_fs_types,
+        rules=rules
+    )
+
+    async for project in scanner.iter_projects():
+        yield project
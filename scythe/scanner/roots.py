@@ -0,0 +1,329 @@
+"""
+    Multi-root scanner - several roots in one result, scheduled per device
+"""
+
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Union
+
+from scythe.models.models import Project, RootStats, ScanResult
+from scythe.models.compact import CompactScanResult
+from scythe.scanner.scanner import DirectoryScanner
+from scythe.scanner.shards import ShardedScanner
+from scythe.selector.selector import select_projects
+from scythe.cache.cache import ScanCache
+from scythe.progress.progress import ProgressReporter
+from scythe.rules.rules import RuleSet
+from scythe.sizer.sizer import InodeSet, SizeAccounting
+from scythe.logger.logger import get_logger
+
+# Roots of one device walked at the same time
+DEVICE_JOBS = 1
+
+
+def distinct_roots(paths: List[Path]) -> List[Path]:
+    """
+        Resolved roots in input order, without duplicates and without
+        roots nested in another root (they would be scanned twice)
+    """
+    resolved: List[Path] = []
+    for path in paths:
+        root = Path(path).resolve()
+        if root not in resolved:
+            resolved.append(root)
+
+    return [
+        root for root in resolved
+        if not any(other != root and other in root.parents for other in resolved)
+    ]
+
+
+class MultiRootScanner:
+    """
+        Scan several roots into one ScanResult
+
+        Roots are grouped by st_dev and every device gets its own pool of
+        walkers (device_jobs, or device_limits[st_dev]), so a slow network
+        mount only delays the roots it holds while local disks carry on.
+        Each root is scanned by a DirectoryScanner with the same options;
+        projects are merged in root order, with --top applied again on the
+        merged projects. result.roots holds the stats of every root.
+        With deduplicate and follow_symlinks, the roots share one set of
+        inodes: a file hard linked from two roots is counted once and a
+        directory reached from two roots through symlinks is walked once,
+        by whichever root gets there first. Such scans stay in this
+        process; otherwise, with processes > 1, every root is walked by a
+        ShardedScanner.
+        root_rules gives the rules of some roots (the pyproject.toml of
+        each root may differ), the others use rules.
+
+        Attributes :
+        roots, devices, device_jobs, device_limits, processes, errors, scan_duration
+    """
+
+    def __init__(self,
+                 roots: List[Path],
+                 max_depth: int = -1,
+                 follow_symlinks: bool = False,
+                 custom_ignores: Optional[Set[str]] = None,
+                 progress_callback: Optional[Callable[[str], None]] = None,
+                 prune_artifacts: bool = True,
+                 jobs: int = 1,
+                 cache: Optional[ScanCache] = None,
+                 size_mode: str = "apparent",
+                 deduplicate: bool = False,
+                 compact: bool = False,
+                 top: Optional[int] = None,
+                 min_size: int = 0,
+                 older_than: Optional[float] = None,
+                 progress: Optional[ProgressReporter] = None,
+                 device_jobs: int = DEVICE_JOBS,
+                 device_limits: Optional[Dict[int, int]] = None,
+                 one_file_system: bool = False,
+                 skip_fs_types: Optional[Set[str]] = None,
+                 rules: Optional[RuleSet] = None,
+                 root_rules: Optional[Dict[Path, RuleSet]] = None,
+                 processes: int = 1):
+        self.roots = distinct_roots(roots)
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+        self.custom_ignores = custom_ignores
+        self.progress_callback = progress_callback
+        self.prune_artifacts = prune_artifacts
+        self.jobs = jobs
+        self.cache = cache
+        self.size_mode = size_mode
+        self.deduplicate = deduplicate
+        self.compact = compact
+        self.top = top
+        self.min_size = min_size
+        self.older_than = older_than
+        self.progress = progress
+        self.device_jobs = max(1, device_jobs)
+        self.device_limits = device_limits or {}
+        self.one_file_system = one_file_system
+        self.skip_fs_types = skip_fs_types
+        self.rules = rules
+        self.root_rules = root_rules or {}
+        self.processes = processes
+        self.logger = get_logger()
+
+        self.devices: Dict[int, List[Path]] = {}
+        self.errors: List[str] = []
+        self.scan_duration = 0.0
+        self._accounting: Optional[SizeAccounting] = None
+        self._visited: Optional[InodeSet] = None
+        self._cache_lookups = (0, 0)
+
+    def group_by_device(self) -> Dict[int, List[Path]]:
+        """
+            Roots of every device (st_dev), unreadable roots are reported
+            as errors and left out
+        """
+        devices: Dict[int, List[Path]] = {}
+        for root in self.roots:
+            try:
+                device = os.stat(root).st_dev
+            except OSError as e:
+                error_msg = f"Error accessing directory {root}: {e}"
+                self.logger.warning(error_msg)
+                self.errors.append(error_msg)
+                continue
+            devices.setdefault(device, []).append(root)
+        return devices
+
+    def scan(self) -> Union[ScanResult, CompactScanResult]:
+        start_time = time.time()
+        self.errors = []
+        self.devices = self.group_by_device()
+        self._accounting = SizeAccounting(self.size_mode, deduplicate=True) if self.deduplicate else None
+        self._visited = InodeSet() if self.follow_symlinks else None
+        self._cache_lookups = (self.cache.hits, self.cache.misses) if self.cache else (0, 0)
+        if self.processes > 1 and not self._in_workers():
+            self.logger.warning("--follow-symlinks and --dedupe scans run in a single process")
+
+        if self.progress:
+            self.progress.begin()
+
+        executors = {
+            device: ThreadPoolExecutor(
+                max_workers=max(1, self.device_limits.get(device, self.device_jobs)),
+                thread_name_prefix=f"scythe-dev-{device}"
+            )
+            for device in self.devices
+        }
+        futures: Dict[Path, Future] = {}
+        try:
+            for device, roots in self.devices.items():
+                self.logger.info(f"Device {device}: {len(roots)} roots")
+                for root in roots:
+                    futures[root] = executors[device].submit(self._scan_root, root)
+
+            device_of = {root: device for device, roots in self.devices.items() for root in roots}
+            results = [
+                (root, device_of[root], futures[root].result())
+                for root in self.roots if root in futures
+            ]
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+            if self.progress:
+                self.progress.finish()
+
+        self.scan_duration = time.time() - start_time
+        return self._merge(results)
+
+    def _in_workers(self) -> bool:
+        """
+            True when the roots are walked by worker processes, which cannot
+            share the inodes seen by the other roots
+        """
+        return self.processes > 1 and not self.deduplicate and not self.follow_symlinks
+
+    def _scan_root(self, root: Path) -> Union[ScanResult, CompactScanResult]:
+        rules = self.root_rules.get(root, self.rules)
+
+        if self._in_workers():
+            return ShardedScanner(
+                root_path=root,
+                processes=self.processes,
+                max_depth=self.max_depth,
+                follow_symlinks=self.follow_symlinks,
+                custom_ignores=self.custom_ignores,
+                prune_artifacts=self.prune_artifacts,
+                jobs=self.jobs,
+                cache=self.cache,
+                size_mode=self.size_mode,
+                deduplicate=self.deduplicate,
+                compact=self.compact,
+                top=self.top,
+                min_size=self.min_size,
+                older_than=self.older_than,
+                progress=self.progress,
+                one_file_system=self.one_file_system,
+                skip_fs_types=self.skip_fs_types,
+                rules=rules
+            ).scan()
+
+        scanner = DirectoryScanner(
+            root_path=root,
+            max_depth=self.max_depth,
+            follow_symlinks=self.follow_symlinks,
+            custom_ignores=self.custom_ignores,
+            progress_callback=self.progress_callback,
+            prune_artifacts=self.prune_artifacts,
+            jobs=self.jobs,
+            cache=self.cache,
+            size_mode=self.size_mode,
+            deduplicate=self.deduplicate,
+            compact=self.compact,
+            top=self.top,
+            min_size=self.min_size,
+            older_than=self.older_than,
+            progress=self.progress,
+            one_file_system=self.one_file_system,
+            skip_fs_types=self.skip_fs_types,
+            rules=rules,
+            accounting=self._accounting,
+            visited=self._visited
+        )
+        return scanner.scan()
+
+    def _merge(self, results: List) -> Union[ScanResult, CompactScanResult]:
+        root_path = Path(os.path.commonpath([str(root) for root in self.roots])) if self.roots else Path.cwd()
+
+        projects: List[Project] = [project for _, _, result in results for project in result.projects]
+        if self.top is not None:
+            # Every root kept its own top, the overall top is among them
+            projects = select_projects(projects, top=self.top)
+
+        if self.compact:
+            merged = CompactScanResult(root_path=root_path)
+            merged.extend(projects)
+        else:
+            merged = ScanResult(root_path=root_path, projects=projects)
+
+        merged.scan_duration = self.scan_duration
+        merged.errors = list(self.errors)
+        for root, device, result in results:
+            merged.directories_scanned += result.directories_scanned
+            merged.files_scanned += result.files_scanned
+            merged.errors.extend(result.errors)
+            merged.roots.append(RootStats(
+                path=root,
+                device=device,
+                projects=result.total_projects,
+                artifacts=result.total_artifacts,
+                artifacts_size=result.total_artifacts_size,
+                directories_scanned=result.directories_scanned,
+                files_scanned=result.files_scanned,
+                errors=len(result.errors),
+                scan_duration=result.scan_duration
+            ))
+
+        if self._in_workers():
+            # Looked up by the workers, every ShardedScanner sums its shards
+            merged.cache_hits = sum(result.cache_hits for _, _, result in results)
+            merged.cache_misses = sum(result.cache_misses for _, _, result in results)
+        elif self.cache:
+            # One cache for the roots walked at once, their results hold its running totals
+            merged.cache_hits = self.cache.hits - self._cache_lookups[0]
+            merged.cache_misses = self.cache.misses - self._cache_lookups[1]
+
+        self.logger.info(
+            f"Scan of {len(results)} roots on {len(self.devices)} devices ends in "
+            f"{self.scan_duration:.2f}s - {merged.total_projects} projects founds"
+        )
+        return merged
+
+
+def scan_roots(
+        paths: List[Path],
+        max_depth: int = -1,
+        follow_symlinks: bool = False,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        prune_artifacts: bool = True,
+        jobs: int = 1,
+        cache: Optional[ScanCache] = None,
+        size_mode: str = "apparent",
+        deduplicate: bool = False,
+        compact: bool = False,
+        top: Optional[int] = None,
+        min_size: int = 0,
+        older_than: Optional[float] = None,
+        progress: Optional[ProgressReporter] = None,
+        device_jobs: int = DEVICE_JOBS,
+        one_file_system: bool = False,
+        skip_fs_types: Optional[Set[str]] = None,
+        rules: Optional[RuleSet] = None,
+        root_rules: Optional[Dict[Path, RuleSet]] = None,
+        processes: int = 1) -> Union[ScanResult, CompactScanResult]:
+    """
+        scan_directory for several roots, see MultiRootScanner
+    """
+    scanner = MultiRootScanner(
+        roots=paths,
+        max_depth=max_depth,
+        follow_symlinks=follow_symlinks,
+        progress_callback=progress_callback,
+        prune_artifacts=prune_artifacts,
+        jobs=jobs,
+        cache=cache,
+        size_mode=size_mode,
+        deduplicate=deduplicate,
+        compact=compact,
+        top=top,
+        min_size=min_size,
+        older_than=older_than,
+        progress=progress,
+        device_jobs=device_jobs,
+        one_file_system=one_file_system,
+        skip_fs_types=skip_fs_types,
+        rules=rules,
+        root_rules=root_rules,
+        processes=processes
+    )
+
+    return scanner.scan()
@@ -1,25 +1,34 @@
+import os
+import threading
+from collections import deque
 from pathlib import Path
-from typing import List, Optional, Callable, Set
+from typing import List, Optional, Callable, Deque, Iterator, Set, Tuple, Union
+from datetime import datetime
 import time
 
-from scythe.models.models import Project, ProjectType, ScanResult
+from scythe.models.models import AnyProjectType, Project, ScanResult
+from scythe.models.compact import CompactScanResult
 from scythe.utils.utils import (
-is_ignored_path
+    DirectoryListing,
+    format_size,
+    ignore_matcher,
+    list_directory,
 )
+from scythe.rules.rules import RuleSet, get_rules
 
 from scythe.logger.logger import get_logger
-from scythe.detector.detector import detect_artifacts
-
-PROJECT_MARKERS = {
-    ProjectType.NODE: ['package.json', 'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml'],
-    ProjectType.PYTHON: ['requirements.txt', 'setup.py', 'pyproject.toml', 'Pipfile', 'poetry.lock'],
-    ProjectType.RUST: ['Cargo.toml', 'Cargo.lock'],
-    ProjectType.JAVA_MAVEN: ['pom.xml'],
-    ProjectType.JAVA_GRADLE: ['build.gradle', 'build.gradle.kts', 'settings.gradle'],
-    ProjectType.GO: ['go.mod', 'go.sum'],
-    ProjectType.RUBY: ['Gemfile', 'Gemfile.lock', '.ruby-version'],
-    ProjectType.DOTNET: ['*.csproj', '*.fsproj', '*.vbproj', '*.sln']
-}
+from scythe.detector.detector import ArtifactDetector, detect_artifacts
+from scythe.sizer.sizer import InodeSet, SizeAccounting, SizeEngine
+from scythe.cache.cache import ScanCache
+from scythe.selector.selector import ArtifactSelector
+from scythe.progress.progress import ProgressReporter
+from scythe.mounts.mounts import MountFilter, mount_filter
+
+# Projects waiting for their artifacts to be sized before being yielded
+MAX_PENDING_PROJECTS = 256
+
+# Cache entries buffered before being written
+CACHE_FLUSH_SIZE = 10000
 
 class DirectoryScanner :
     def __init__(self,
@@ -27,12 +36,48 @@ class DirectoryScanner :
                  max_depth: -1,
                  follow_symlinks: bool = False,
                  custom_ignores: Optional[Set[str]] = None,
-                 progress_callback: Optional[Callable[[str], None]] = None):
+                 progress_callback: Optional[Callable[[str], None]] = None,
+                 prune_artifacts: bool = True,
+                 jobs: int = 1,
+                 cache: Optional[ScanCache] = None,
+                 size_mode: str = "apparent",
+                 deduplicate: bool = False,
+                 compact: bool = False,
+                 top: Optional[int] = None,
+                 min_size: int = 0,
+                 older_than: Optional[float] = None,
+                 progress: Optional[ProgressReporter] = None,
+                 one_file_system: bool = False,
+                 skip_fs_types: Optional[Set[str]] = None,
+                 rules: Optional[RuleSet] = None,
+                 accounting: Optional[SizeAccounting] = None,
+                 visited: Optional[InodeSet] = None):
         self.root_path = Path(root_path).resolve()
         self.max_depth = max_depth
         self.follow_symlinks = follow_symlinks
         self.custom_ignores = custom_ignores or set()
+        self.ignore_matcher = ignore_matcher(self.custom_ignores)
         self.progress_callback = progress_callback
+        self.prune_artifacts = prune_artifacts
+        self.jobs = jobs
+        self.cache = cache
+        self.size_mode = size_mode
+        self.deduplicate = deduplicate
+        self.compact = compact
+        self.top = top
+        self.min_size = min_size
+        self.older_than = older_than
+        self.progress = progress
+        self.one_file_system = one_file_system
+        self.skip_fs_types = skip_fs_types or set()
+        self.rules = rules or get_rules()
+        self.mount_filter: Optional[MountFilter] = None
+        # Shared with the scanners of other roots (see MultiRootScanner), else per scan
+        self.shared_accounting = accounting
+        self.shared_visited = visited
+        self.visited: Optional[InodeSet] = None
+        self.cutoff: Optional[float] = None
+        self.size_engine: Optional[SizeEngine] = None
         self.logger = get_logger()
 
         #Stats
@@ -40,51 +85,49 @@ class DirectoryScanner :
         self.directories_scanned = 0
         self.files_scanned = 0
         self.errors: List[str] = []
+        self.scan_duration = 0.0
+        self.current_directory: Optional[Path] = None
+        self._stats_lock = threading.Lock()
 
 
-    def detect_project_type(self, directory: Path) -> Optional[ProjectType]:
-        if not directory.is_dir():
-            return None
-
+    def _read_file_names(self, directory: Path) -> Optional[Set[str]]:
         try:
-            files_in_dir = {f.name for f in directory.iterdir() if f.is_file() }
+            return list_directory(directory, self.follow_symlinks).file_names
         except (OSError, PermissionError) as e:
             self.logger.debug(f"Impossible to read directory {directory}: {e}")
             return None
 
-        for project_type, markers in PROJECT_MARKERS.items():
-            for marker in markers:
-                if '*' in marker:
-                    extension = marker.replace('*', '')
-                    if any(f.endswith(extension) for f in files_in_dir):
-                        return project_type
-                elif marker in files_in_dir:
-                    return project_type
-        return None
+    def detect_project_type(
+            self,
+            directory: Path,
+            file_names: Optional[Set[str]] = None) -> Optional[AnyProjectType]:
 
-    def get_marker_files(self, directory: Path, project_type: ProjectType) -> List[str]:
-        found_markers = []
-        markers = PROJECT_MARKERS.get(project_type, [])
+        if file_names is None:
+            if not directory.is_dir():
+                return None
+            file_names = self._read_file_names(directory)
+            if file_names is None:
+                return None
 
-        try:
-            files_in_dir = {f.name for f in directory.iterdir() if f.is_file()}
-            for marker in markers :
-                if '*' in marker:
-                    extension = marker.replace('*', '')
-                    found_markers.extend([f for f in files_in_dir if f.endswith(extension)])
-                elif marker in files_in_dir:
-                    found_markers.append(marker)
-        except (OSError, PermissionError):
-            pass
-
-        return found_markers
+        return self.rules.markers.first(file_names)
+
+    def get_marker_files(
+            self,
+            directory: Path,
+            project_type: AnyProjectType,
+            file_names: Optional[Set[str]] = None) -> List[str]:
+
+        if file_names is None:
+            file_names = self._read_file_names(directory) or set()
+
+        return self.rules.markers.names_for(file_names, project_type)
 
     def should_skip_directory(self, directory: Path, current_depth: int) -> bool:
 
         if self.max_depth >= 0 and current_depth > self.max_depth :
             return True
 
-        if is_ignored_path(directory, self.custom_ignores):
+        if self.ignore_matcher.matches(directory.name):
             return True
 
         if directory.is_symlink() and not self.follow_symlinks:
@@ -92,113 +135,408 @@ class DirectoryScanner :
 
         return False
 
-    def scan(self) -> ScanResult:
+    def scan(self) -> Union[ScanResult, CompactScanResult]:
+
+        if self.compact:
+            # Projects are packed into columns as they come, never all alive at once
+            result = CompactScanResult(root_path=self.root_path)
+            result.extend(self.iter_projects())
+        else:
+            result = ScanResult(root_path=self.root_path, projects=list(self.iter_projects()))
 
+        return self._finish_result(result)
+
+    def _finish_result(self, result: Union[ScanResult, CompactScanResult]) -> Union[ScanResult, CompactScanResult]:
+        """
+            Copy the stats of the finished scan into its result
+        """
+        result.scan_duration = self.scan_duration
+        result.directories_scanned = self.directories_scanned
+        result.files_scanned = self.files_scanned
+        result.errors = self.errors
+        result.cache_hits = self.cache.hits if self.cache else 0
+        result.cache_misses = self.cache.misses if self.cache else 0
+
+        self.logger.info(
+            f"Scan Ends in {self.scan_duration:.2f}s - "
+            f"{result.total_projects} projects founds"
+        )
+
+        return result
+
+    def iter_projects(self) -> Iterator[Project]:
+        """
+            Scan the root and yield every project as soon as its artifacts are sized
+            Projects come in walk order and are not kept by the scanner, stats
+            (directories_scanned, errors, scan_duration ...) are final once the
+            generator is exhausted.
+            With top, only the projects of the `top` largest artifacts are
+            yielded (largest first) once the walk ends; with min_size,
+            smaller artifacts are left out and empty projects skipped.
+            With older_than (seconds), only artifacts unused for that long
+            are kept; projects whose markers changed more recently are not
+            sized at all.
+        """
+        selector = self._start_scan()
+
+        if selector is None:
+            yield from self._iter_sized_projects()
+            return
+
+        yield from selector.select(self._iter_sized_projects())
+
+    def _start_scan(self) -> Optional[ArtifactSelector]:
+        """
+            Reset the stats and the age cutoff of a new scan
+            return: selector of the kept artifacts, None when all are kept
+        """
         self.logger.info(f"Scanning directory {self.root_path}")
-        start_time = time.time()
+        self.cutoff = time.time() - self.older_than if self.older_than is not None else None
 
-        #Stats
         self.directories_scanned = 0
         self.files_scanned = 0
         self.errors = []
+        self.scan_duration = 0.0
+        self.current_directory = None
+        self.visited = None
+        if self.follow_symlinks:
+            self.visited = self.shared_visited if self.shared_visited is not None else InodeSet()
+        if self.progress:
+            self.progress.begin()
 
-        projects = []
-
-        #recursive scan
         try:
-            projects = self._scan_recursive(self.root_path, depth=0)
-        except Exception as e:
-            self.logger.error(f"Fatal Error while Scanning : {e}")
-            self.errors.append(f"Fatal Error: {str(e)}")
-
-        scan_duration = time.time() - start_time
-        result = ScanResult(
-            root_path=self.root_path,
-            projects=projects,
-            scan_duration=scan_duration,
-            directories_scanned=self.directories_scanned,
-            files_scanned=self.files_scanned,
-            errors=self.errors,
-        )
+            self.mount_filter = mount_filter(self.root_path, self.one_file_system, self.skip_fs_types)
+        except OSError as e:
+            self.mount_filter = None
+            self.logger.debug(f"No mount filter for {self.root_path}: {e}")
 
-        self.logger.info(
-            f"Scan Ends in {scan_duration:.2f}s - "
-            f"{result.total_projects} projects founds"
+        if self.top is None and not self.min_size and self.cutoff is None:
+            return None
+        return ArtifactSelector(self.top, self.min_size, self.cutoff)
+
+    def _iter_sized_projects(self) -> Iterator[Project]:
+        start_time = time.time()
+
+        #recursive scan, artifacts are sized on the engine meanwhile
+        accounting = self.shared_accounting or SizeAccounting(
+            self.size_mode, self.deduplicate, track_directories=self.cache is not None and not self.deduplicate
         )
+        with SizeEngine(self.jobs, self.follow_symlinks, accounting=accounting,
+                        mount_filter=self.mount_filter) as size_engine:
+            self.size_engine = size_engine
+            pending: Deque[Project] = deque()
+
+            try:
+                for project in self._scan_recursive(self.root_path, depth=0):
+                    pending.append(project)
+                    if self.progress:
+                        self.progress.queue(len(pending))
+
+                    while pending and (
+                            len(pending) > MAX_PENDING_PROJECTS
+                            or all(size_engine.is_sized(a) for a in pending[0].artifacts)):
+                        yield self._finalize_project(pending.popleft())
+
+                    if self.cache and not pending and self.cache.pending_count >= CACHE_FLUSH_SIZE:
+                        self.cache.flush()
+
+                while pending:
+                    yield self._finalize_project(pending.popleft())
+
+                if self.cache:
+                    self.cache.flush()
+            except Exception as e:
+                self.logger.error(f"Fatal Error while Scanning : {e}")
+                self.errors.append(f"Fatal Error: {str(e)}")
+            finally:
+                self.size_engine = None
+                self.scan_duration = time.time() - start_time
+                if self.progress:
+                    self.progress.finish()
+
+    def _scan_recursive(self, directory: Path, depth: int) -> Iterator[Project]:
 
-        return result
+        if self.should_skip_directory(directory, depth):
+            return
 
-    def _scan_recursive(
-            self,
-            directory: Path,
-            depth: int,
-            parent_has_artifacts: bool = False,) -> List[Project]:
+        yield from self._scan_directory(directory, depth)
 
-        global project, artifacts
-        projects = []
+    def _scan_directory(self, directory: Path, depth: int) -> Iterator[Project]:
+        project, children = self._visit(directory, depth)
 
-        if self.should_skip_directory(directory, depth):
-            return projects
+        if project is not None:
+            yield project
 
-        self.directories_scanned += 1
+        for child in children:
+            yield from self._scan_directory(child, depth + 1)
 
-        if self.progress_callback:
-            self.progress_callback(f"Scanning {directory}")
+    def _visit(self, directory: Path, depth: int) -> Tuple[Optional[Project], List[Path]]:
+        """
+            Scan one directory from a single os.scandir listing
+            The same listing feeds project detection, marker collection,
+            artifact detection, file counting and the subdirectories to visit.
+            With prune_artifacts, directories classified as artifacts are
+            not descended into.
+            Safe to call from several threads at once.
+            return: project found in the directory (or None), subdirectories
+        """
+        pruned: Set[str] = set()
+        project = None
 
-        project_type = self.detect_project_type(directory)
+        if not self._first_visit(directory):
+            self.logger.debug(f"Already scanned through another path: {directory}")
+            return None, []
 
-        if project_type :
-            self.logger.debug(f"Found project type {project_type.display_name} detected in : {directory}")
+        self._count(directories=1)
+        self.current_directory = directory
 
-            markers_files = self.get_marker_files(directory, project_type)
-            artifacts = detect_artifacts(
-                project_path=directory,
-                project_type=project_type,
-                follow_symlinks=self.follow_symlinks
-            )
-            project = Project(
-                path=directory,
-                project_type=project_type,
-                marker_files=markers_files,
-                artifacts=artifacts
-            )
-
-        projects.append(project)
-
-        if artifacts :
-            total_size = sum(a.size_bytes for a in artifacts)
-            from scythe.utils.utils import format_size
-            self.logger.info(
-                f" {len(artifacts)} found artifacts"
-                f" {format_size(total_size)}"
-            )
+        if self.progress_callback:
+            self.progress_callback(f"Scanning {directory}")
 
         try:
-            for item in directory.iterdir():
-                if item.is_dir():
-                    if not is_ignored_path(item, self.custom_ignores):
-                        sub_projects = self._scan_recursive(item, depth+1, parent_has_artifacts=parent_has_artifacts)
-                        projects.extend(sub_projects)
-                elif item.is_file():
-                    self.files_scanned += 1
+            listing, project_type = self._list_directory(directory)
         except (OSError, PermissionError) as e:
             error_msg = f"Error accessing directory {directory}: {e}"
             self.logger.warning(error_msg)
             self.errors.append(error_msg)
+            return None, []
+
+        self._count(files=len(listing.files))
+
+        if self.progress:
+            self.progress.directory(str(directory), len(listing.files))
+
+        if project_type :
+            self.logger.debug(f"Found project type {project_type.display_name} detected in : {directory}")
+
+            markers_files = self.get_marker_files(directory, project_type, listing.file_names)
+
+            markers_used = None
+            if self.cutoff is not None :
+                markers_used = self._markers_last_used(listing, markers_files)
+
+            if markers_used is not None and markers_used > self.cutoff :
+                # Manifest or lockfile changed recently, no artifact can be stale
+                self.logger.debug(f"Recently used project, artifacts not sized: {directory}")
+                if self.prune_artifacts :
+                    detector = ArtifactDetector(directory, project_type, self.follow_symlinks, rules=self.rules)
+                    pruned = {e.name for e in listing.directories if detector.is_artifact_name(e.name)}
+            else :
+                artifacts = detect_artifacts(
+                    project_path=directory,
+                    project_type=project_type,
+                    follow_symlinks=self.follow_symlinks,
+                    listing=listing,
+                    size_engine=self.size_engine,
+                    cache=self._artifact_cache(directory),
+                    probe_age=self.cutoff is not None,
+                    rules=self.rules
+                )
+                project = Project(
+                    path=directory,
+                    project_type=project_type,
+                    marker_files=markers_files,
+                    artifacts=artifacts
+                )
+
+                if markers_used is not None :
+                    for artifact in artifacts :
+                        artifact.touch(datetime.fromtimestamp(markers_used))
+
+                if self.prune_artifacts :
+                    pruned = {a.path.name for a in artifacts}
+
+                if artifacts and self.size_engine and self.size_engine.is_parallel :
+                    self.logger.info(f" {len(artifacts)} found artifacts")
+                elif artifacts :
+                    self.logger.info(
+                        f" {len(artifacts)} found artifacts"
+                        f" {format_size(project.total_artifact_size)}"
+                    )
+
+        if self.max_depth >= 0 and depth + 1 > self.max_depth:
+            return project, []
+
+        children = []
+        for entry in listing.directories:
+            if entry.name in pruned or self.ignore_matcher.matches(entry.name):
+                continue
+            if self.mount_filter and self.mount_filter.excludes(entry.path, entry.is_symlink()):
+                self.logger.debug(f"Not crossing file system boundary: {entry.path}")
+                continue
+            children.append(Path(entry.path))
+        return project, children
+
+    def _count(self, directories: int = 0, files: int = 0) -> None:
+        with self._stats_lock:
+            self.directories_scanned += directories
+            self.files_scanned += files
+
+    def _first_visit(self, directory: Path) -> bool:
+        """
+            With follow_symlinks, False when the physical directory was
+            already reached through another path (symlink loop, linked tree)
+        """
+        if self.visited is None:
+            return True
+        try:
+            directory_stat = os.stat(directory)
+        except OSError:
+            # Reported by the listing
+            return True
+        return self.visited.add(directory_stat.st_dev, directory_stat.st_ino)
+
+    def _markers_last_used(self, listing: DirectoryListing, marker_files: List[str]) -> Optional[float]:
+        """
+            Latest mtime of the project markers (manifests and lockfiles)
+        """
+        markers = set(marker_files)
+        latest = None
+        for entry in listing.files :
+            if entry.name not in markers :
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+            except OSError:
+                continue
+            if latest is None or mtime > latest :
+                latest = mtime
+        return latest
+
+    def _list_directory(self, directory: Path) -> Tuple[DirectoryListing, Optional[AnyProjectType]]:
+        """
+            Listing and project type of a directory, from the cache when
+            the directory did not change since the last scan
+        """
+        if not self.cache:
+            listing = list_directory(directory, self.follow_symlinks)
+            return listing, self.detect_project_type(directory, listing.file_names)
+
+        directory_stat = os.stat(directory)
+        cached = self.cache.get_listing(directory, directory_stat, self.rules.cache_key)
+        if cached:
+            return cached
+
+        listing = list_directory(directory, self.follow_symlinks)
+        project_type = self.detect_project_type(directory, listing.file_names)
+        self.cache.put_listing(listing, directory_stat, project_type, self.rules.cache_key)
+        return listing, project_type
+
+    def _artifact_cache(self, directory: Path) -> Optional[ScanCache]:
+        """
+            Cache of the artifact sizes of a project, not used when mount
+            points below it are excluded from this scan
+        """
+        if self.mount_filter and self.mount_filter.has_boundary_below(directory):
+            return None
+        return self.cache
+
+    def _finalize_project(self, project: Project) -> Project:
+        if self.size_engine and self.size_engine.is_parallel and project.artifacts:
+            self.size_engine.resolve(project.artifacts)
+            project.total_artifact_size = sum(a.size_bytes for a in project.artifacts)
+        if self.progress:
+            self.progress.sized(project.total_artifact_size)
+        return project
+
+def make_scanner(walkers: Optional[int] = 1, **options) -> DirectoryScanner:
+    """
+        DirectoryScanner, or its threaded backend when walkers is not 1
+    """
+    if walkers == 1:
+        return DirectoryScanner(**options)
+
+    from scythe.scanner.threaded import ThreadedDirectoryScanner
+    return ThreadedDirectoryScanner(walkers=walkers, **options)
 
-        return projects
 
 def scan_directory(
         path: Path,
         max_depth: int = -1,
         follow_symlinks: bool = False,
-        progress_callback: Optional[Callable[[str], None]] = None) -> ScanResult:
-    scanner = DirectoryScanner(
+        progress_callback: Optional[Callable[[str], None]] = None,
+        prune_artifacts: bool = True,
+        jobs: int = 1,
+        cache: Optional[ScanCache] = None,
+        size_mode: str = "apparent",
+        deduplicate: bool = False,
+        compact: bool = False,
+        top: Optional[int] = None,
+        min_size: int = 0,
+        older_than: Optional[float] = None,
+        progress: Optional[ProgressReporter] = None,
+        one_file_system: bool = False,
+        skip_fs_types: Optional[Set[str]] = None,
+        rules: Optional[RuleSet] = None,
+        walkers: Optional[int] = 1) -> Union[ScanResult, CompactScanResult]:
+    """
+        Scan a directory, walkers > 1 (None: every core on free-threaded
+        Python) walks with ThreadedDirectoryScanner
+    """
+    scanner = make_scanner(
+        walkers,
         root_path=path,
         max_depth=max_depth,
         follow_symlinks=follow_symlinks,
-        progress_callback=progress_callback
+        progress_callback=progress_callback,
+        prune_artifacts=prune_artifacts,
+        jobs=jobs,
+        cache=cache,
+        size_mode=size_mode,
+        deduplicate=deduplicate,
+        compact=compact,
+        top=top,
+        min_size=min_size,
+        older_than=older_than,
+        progress=progress,
+        one_file_system=one_file_system,
+        skip_fs_types=skip_fs_types,
+        rules=rules
     )
 
     return scanner.scan()
 
+
+def iter_projects(
+        path: Path,
+        max_depth: int = -1,
+        follow_symlinks: bool = False,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        prune_artifacts: bool = True,
+        jobs: int = 1,
+        cache: Optional[ScanCache] = None,
+        size_mode: str = "apparent",
+        deduplicate: bool = False,
+        top: Optional[int] = None,
+        min_size: int = 0,
+        older_than: Optional[float] = None,
+        progress: Optional[ProgressReporter] = None,
+        one_file_system: bool = False,
+        skip_fs_types: Optional[Set[str]] = None,
+        rules: Optional[RuleSet] = None,
+        walkers: Optional[int] = 1) -> Iterator[Project]:
+    """
+        Streaming version of scan_directory, see DirectoryScanner.iter_projects
+    """
+    scanner = make_scanner(
+        walkers,
+        root_path=path,
+        max_depth=max_depth,
+        follow_symlinks=follow_symlinks,
+        progress_callback=progress_callback,
+        prune_artifacts=prune_artifacts,
+        jobs=jobs,
+        cache=cache,
+        size_mode=size_mode,
+        deduplicate=deduplicate,
+        top=top,
+        min_size=min_size,
+        older_than=older_than,
+        progress=progress,
+        one_file_system=one_file_system,
+        skip_fs_types=skip_fs_types,
+        rules=rules
+    )
+
+    yield from scanner.iter_projects()
+
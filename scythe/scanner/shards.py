@@ -0,0 +1,314 @@
+"""
+    Sharded scanner - one root walked by a pool of worker processes
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from scythe.models.models import Project, ScanResult
+from scythe.models.compact import CompactScanResult
+from scythe.scanner.scanner import DirectoryScanner
+from scythe.selector.selector import select_projects
+from scythe.cache.cache import ScanCache
+from scythe.progress.progress import ProgressReporter
+from scythe.rules.rules import RuleSet, get_rules
+from scythe.logger.logger import get_logger
+
+# Directories a worker walks before handing the rest of its shard back
+SHARD_DIRECTORIES = 1000
+
+Task = Tuple[Path, int]
+
+
+class ShardWalker(DirectoryScanner):
+    """
+        DirectoryScanner of the worker processes
+
+        Walks the (directory, depth) tasks of a shard instead of the whole
+        root and stops after budget directories; the directories left to
+        visit are kept in frontier for other shards.
+    """
+
+    def __init__(self, tasks: List[Task], budget: int, **options):
+        super().__init__(**options)
+        self.tasks = tasks
+        self.budget = budget
+        self.frontier: List[Task] = []
+
+    def _scan_recursive(self, directory: Path, depth: int) -> Iterator[Project]:
+        stack = list(reversed(self.tasks))
+        visited = 0
+
+        while stack and visited < self.budget:
+            directory, depth = stack.pop()
+            project, children = self._visit(directory, depth)
+            visited += 1
+
+            if project is not None:
+                yield project
+            stack.extend((child, depth + 1) for child in reversed(children))
+
+        # Shallowest directories first, they are the largest shards
+        self.frontier = stack
+
+
+def scan_shard(options: Dict[str, Any],
+               cache_path: Optional[Path],
+               tasks: List[Task],
+               budget: int) -> Tuple[CompactScanResult, List[Task]]:
+    """
+        Worker process entry point
+        return: compact result of the shard, directories left to visit
+    """
+    # Only warnings, the parent process owns the console
+    logger = get_logger()
+    logger.setLevel(max(logger.level, logging.WARNING))
+
+    cache = None
+    if cache_path is not None:
+        try:
+            cache = ScanCache(cache_path, follow_symlinks=options["follow_symlinks"])
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Scan cache not available in worker {os.getpid()}: {e}")
+
+    try:
+        walker = ShardWalker(tasks, budget, cache=cache, compact=True, **options)
+        result = walker.scan()
+    finally:
+        if cache is not None:
+            cache.close()
+
+    return result, walker.frontier
+
+
+class ShardedScanner:
+    """
+        Scan one root on a pool of worker processes
+
+        The per-entry Python work of a walk holds the GIL, so a scan uses
+        one core whatever the number of threads. Here the root is listed
+        first, its subdirectories are split into shards and every shard is
+        walked by a DirectoryScanner in a worker process. A worker stops
+        after shard_directories directories and sends back the directories
+        it did not reach, which go to the queue that idle workers take
+        their next shard from: a giant monorepo is spread over every
+        process instead of holding one of them until the end.
+        Workers send CompactScanResults. Projects are merged in path order
+        and --top is applied again on the merged projects, so the result
+        does not depend on which worker finished first.
+        follow_symlinks and deduplicate need one set of inodes for the
+        whole walk, such scans run in a single process.
+
+        Attributes :
+        root_path, processes, shard_directories, shards, errors, scan_duration
+    """
+
+    def __init__(self,
+                 root_path: Path,
+                 processes: int = 1,
+                 max_depth: int = -1,
+                 follow_symlinks: bool = False,
+                 custom_ignores: Optional[Set[str]] = None,
+                 prune_artifacts: bool = True,
+                 jobs: int = 1,
+                 cache: Optional[ScanCache] = None,
+                 size_mode: str = "apparent",
+                 deduplicate: bool = False,
+                 compact: bool = False,
+                 top: Optional[int] = None,
+                 min_size: int = 0,
+                 older_than: Optional[float] = None,
+                 progress: Optional[ProgressReporter] = None,
+                 one_file_system: bool = False,
+                 skip_fs_types: Optional[Set[str]] = None,
+                 rules: Optional[RuleSet] = None,
+                 shard_directories: int = SHARD_DIRECTORIES):
+        self.root_path = Path(root_path).resolve()
+        self.processes = max(1, processes)
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+        self.custom_ignores = custom_ignores
+        self.prune_artifacts = prune_artifacts
+        self.jobs = jobs
+        self.cache = cache
+        self.size_mode = size_mode
+        self.deduplicate = deduplicate
+        self.compact = compact
+        self.top = top
+        self.min_size = min_size
+        self.older_than = older_than
+        self.progress = progress
+        self.one_file_system = one_file_system
+        self.skip_fs_types = skip_fs_types
+        self.rules = rules or get_rules()
+        self.shard_directories = max(1, shard_directories)
+        self.logger = get_logger()
+
+        self.shards = 0
+        self.errors: List[str] = []
+        self.scan_duration = 0.0
+
+    def _options(self) -> Dict[str, Any]:
+        """
+            DirectoryScanner arguments of the workers
+        """
+        return {
+            "root_path": self.root_path,
+            "max_depth": self.max_depth,
+            "follow_symlinks": self.follow_symlinks,
+            "custom_ignores": self.custom_ignores,
+            "prune_artifacts": self.prune_artifacts,
+            "jobs": self.jobs,
+            "size_mode": self.size_mode,
+            "deduplicate": self.deduplicate,
+            "top": self.top,
+            "min_size": self.min_size,
+            "older_than": self.older_than,
+            "one_file_system": self.one_file_system,
+            "skip_fs_types": self.skip_fs_types,
+            "rules": self.rules,
+        }
+
+    def scan(self) -> Union[ScanResult, CompactScanResult]:
+        if self.processes == 1 or self.follow_symlinks or self.deduplicate:
+            if self.processes > 1:
+                self.logger.warning("--follow-symlinks and --dedupe scans run in a single process")
+            return self._scan_in_process()
+
+        start_time = time.time()
+        self.shards = 0
+        self.errors = []
+
+        if self.progress:
+            self.progress.begin()
+
+        queue: Deque[Task] = deque([(self.root_path, 0)])
+        running: Dict[Future, int] = {}
+        results: List[CompactScanResult] = []
+        cache_path = self.cache.path if self.cache else None
+
+        executor = ProcessPoolExecutor(max_workers=self.processes)
+        try:
+            while queue or running:
+                while queue and len(running) < self.processes:
+                    options = self._options()
+                    if self.older_than is not None:
+                        # Same age cutoff for shards started later
+                        options["older_than"] += time.time() - start_time
+
+                    # Split the queue between the idle workers, the root is listed alone
+                    size = math.ceil(len(queue) / (self.processes - len(running)))
+                    tasks = [queue.popleft() for _ in range(min(size, len(queue)))]
+                    budget = self.shard_directories if results else 1
+                    future = executor.submit(scan_shard, options, cache_path, tasks, budget)
+                    running[future] = len(tasks)
+                    self.shards += 1
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    result, frontier = future.result()
+                    results.append(result)
+                    queue.extend(frontier)
+
+                    if self.progress:
+                        self.progress.advance(result.directories_scanned, result.files_scanned,
+                                              result.total_artifacts_size)
+                        self.progress.queue(len(queue))
+        finally:
+            for future in running:
+                future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+            if self.progress:
+                self.progress.finish()
+
+        self.scan_duration = time.time() - start_time
+        return self._merge(results)
+
+    def _scan_in_process(self) -> Union[ScanResult, CompactScanResult]:
+        scanner = DirectoryScanner(cache=self.cache, compact=self.compact, progress=self.progress, **self._options())
+        return scanner.scan()
+
+    def _merge(self, results: List[CompactScanResult]) -> Union[ScanResult, CompactScanResult]:
+        projects = sorted(
+            (project for result in results for project in result.projects),
+            key=lambda project: project.path.parts
+        )
+        if not self.compact:
+            projects = [project.to_project() for project in projects]
+        if self.top is not None:
+            # Every shard kept its own top, the overall top is among them
+            projects = select_projects(projects, top=self.top)
+
+        if self.compact:
+            merged = CompactScanResult(root_path=self.root_path)
+            merged.extend(projects)
+        else:
+            merged = ScanResult(root_path=self.root_path, projects=projects)
+
+        merged.scan_duration = self.scan_duration
+        for result in results:
+            merged.directories_scanned += result.directories_scanned
+            merged.files_scanned += result.files_scanned
+            merged.cache_hits += result.cache_hits
+            merged.cache_misses += result.cache_misses
+            merged.errors.extend(result.errors)
+        merged.errors.sort()
+        self.errors = merged.errors
+
+        self.logger.info(
+            f"Scan of {len(results)} shards on {self.processes} processes ends in "
+            f"{self.scan_duration:.2f}s - {merged.total_projects} projects founds"
+        )
+        return merged
+
+
+def scan_sharded(
+        path: Path,
+        processes: int,
+        max_depth: int = -1,
+        follow_symlinks: bool = False,
+        prune_artifacts: bool = True,
+        jobs: int = 1,
+        cache: Optional[ScanCache] = None,
+        size_mode: str = "apparent",
+        deduplicate: bool = False,
+        compact: bool = False,
+        top: Optional[int] = None,
+        min_size: int = 0,
+        older_than: Optional[float] = None,
+        progress: Optional[ProgressReporter] = None,
+        one_file_system: bool = False,
+        skip_fs_types: Optional[Set[str]] = None,
+        rules: Optional[RuleSet] = None) -> Union[ScanResult, CompactScanResult]:
+    """
+        scan_directory on several processes, see ShardedScanner
+    """
+    scanner = ShardedScanner(
+        root_path=path,
+        processes=processes,
+        max_depth=max_depth,
+        follow_symlinks=follow_symlinks,
+        prune_artifacts=prune_artifacts,
+        jobs=jobs,
+        cache=cache,
+        size_mode=size_mode,
+        deduplicate=deduplicate,
+        compact=compact,
+        top=top,
+        min_size=min_size,
+        older_than=older_than,
+        progress=progress,
+        one_file_system=one_file_system,
+        skip_fs_types=skip_fs_types,
+        rules=rules
+    )
+
+    return scanner.scan()
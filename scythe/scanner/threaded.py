@@ -0,0 +1,263 @@
+"""
+    Threaded scanner - walker threads for free-threaded CPython
+"""
+
+import os
+import queue
+import sys
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from scythe.models.models import Project
+from scythe.scanner.scanner import DirectoryScanner
+
+# Directories reported but not yet passed by the serial walk before the
+# walkers are held back
+REORDER_BUFFER = 4096
+
+# Position of a directory in the walk: its index among its siblings and
+# those of its ancestors, ordered like the serial depth first walk
+Key = Tuple[int, ...]
+
+Task = Tuple[Path, int, Key]
+
+_WALKER_DONE = object()
+
+
+def free_threaded() -> bool:
+    """
+        True on a free-threaded build (3.13t and later) running without the GIL
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def default_walkers() -> int:
+    """
+        Walker threads of a scan: every core without the GIL, one with it
+        (threads only add contention when a single one runs Python code)
+    """
+    return (os.cpu_count() or 1) if free_threaded() else 1
+
+
+class ThreadedDirectoryScanner(DirectoryScanner):
+    """
+        DirectoryScanner walking with several threads
+
+        Every walker thread owns a deque of (directory, depth, key) tasks:
+        it pushes the subdirectories it finds and pops from the same end
+        (depth first), and only when it runs dry takes the oldest task,
+        the shallowest and largest subtree, of another walker. Directory
+        and file counters are kept per walker and summed once the walk
+        ends.
+        Projects come out in the order of the serial walk: every visited
+        directory is reported with its key and its number of
+        subdirectories, and the directories visited ahead of the serial
+        walk wait in a reorder buffer until those before them are done.
+        Once REORDER_BUFFER directories are reported and not yet passed,
+        only the walker whose next task is the directory the serial walk
+        waits for goes on, so the buffer stays bounded whatever the shape
+        of the tree and however slowly the projects are consumed.
+        Walkers without a task they may take wait on their own condition,
+        woken when tasks are pushed, when the buffer drains or when the
+        serial walk comes to their next task.
+        Without the GIL the walkers run Python code on every core. With
+        the GIL, walkers=None means one walker: the plain recursive walk.
+
+        options: DirectoryScanner arguments
+    """
+
+    def __init__(self, root_path: Path, walkers: Optional[int] = None, **options):
+        super().__init__(root_path=root_path, **options)
+        self.walkers = max(1, walkers if walkers is not None else default_walkers())
+
+        self._local = threading.local()
+        # Guards the task deques and the counters below
+        self._lock = threading.Lock()
+        self._wakeups = [threading.Condition(self._lock) for _ in range(self.walkers)]
+        self._waiting: Set[int] = set()
+        self._tasks_left = 0
+        self._buffered = 0
+        # Key of the next directory of the serial walk
+        self._expected: Optional[Key] = ()
+        self._stop = False
+
+    def _count(self, directories: int = 0, files: int = 0) -> None:
+        counters = getattr(self._local, "counters", None)
+        if counters is None:
+            super()._count(directories, files)
+            return
+        counters[0] += directories
+        counters[1] += files
+
+    def _scan_recursive(self, directory: Path, depth: int) -> Iterator[Project]:
+        if self.walkers == 1:
+            yield from super()._scan_recursive(directory, depth)
+            return
+
+        if self.should_skip_directory(directory, depth):
+            return
+
+        tasks: List[Deque[Task]] = [deque() for _ in range(self.walkers)]
+        tasks[0].append((directory, depth, ()))
+        self._waiting.clear()
+        self._tasks_left = 1
+        self._buffered = 0
+        self._expected = ()
+        self._stop = False
+
+        counters = [[0, 0] for _ in range(self.walkers)]
+        found: queue.SimpleQueue = queue.SimpleQueue()
+        threads = [
+            threading.Thread(
+                target=self._walk,
+                args=(index, tasks, counters[index], found),
+                name=f"scythe-walk-{index}",
+                daemon=True
+            )
+            for index in range(self.walkers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        # (project, subdirectories) of the directories visited ahead of the serial walk
+        visited: Dict[Key, Tuple[Optional[Project], int]] = {}
+        # [key, next subdirectory, subdirectories] of the directories the serial walk is in
+        path: List[List] = []
+        expected: Optional[Key] = ()
+
+        try:
+            running = len(threads)
+            while running:
+                item = found.get()
+                if item is _WALKER_DONE:
+                    running -= 1
+                    continue
+                if isinstance(item, BaseException):
+                    raise item
+
+                key, project, children = item
+                visited[key] = (project, children)
+                passed = 0
+                while expected is not None and expected in visited:
+                    project, children = visited.pop(expected)
+                    if project is not None:
+                        yield project
+                    path.append([expected, 0, children])
+                    expected = self._next_key(path)
+                    passed += 1
+
+                if passed:
+                    with self._lock:
+                        self._buffered -= passed
+                        self._expected = expected
+                        if self._buffered < REORDER_BUFFER:
+                            self._wake_all()
+                        else:
+                            # Only the walker holding the expected directory may go on
+                            for index in self._waiting:
+                                if tasks[index] and tasks[index][-1][2] == expected:
+                                    self._wakeups[index].notify()
+        finally:
+            with self._lock:
+                self._stop = True
+                self._wake_all()
+            for thread in threads:
+                thread.join()
+            for directories, files in counters:
+                super()._count(directories, files)
+
+    def _walk(self, index: int, tasks: List[Deque[Task]], counters: List[int], found: queue.SimpleQueue) -> None:
+        self._local.counters = counters
+        own = tasks[index]
+
+        try:
+            with self._lock:
+                task = self._next_task(index, tasks)
+
+            while task is not None:
+                directory, depth, key = task
+                project, children = self._visit(directory, depth)
+                found.put((key, project, len(children)))
+
+                with self._lock:
+                    self._buffered += 1
+                    self._tasks_left += len(children) - 1
+                    # Reversed: the first subdirectory is popped first, as in the serial walk
+                    own.extend((children[i], depth + 1, key + (i,)) for i in reversed(range(len(children))))
+                    if self._tasks_left == 0:
+                        self._wake_all()
+                    elif len(children) > 1 and self._waiting and self._buffered < REORDER_BUFFER:
+                        # One task for this walker, the others can be stolen
+                        self._wake(len(children) - 1)
+                    task = self._next_task(index, tasks)
+        except BaseException as e:
+            with self._lock:
+                self._stop = True
+                self._wake_all()
+            found.put(e)
+        finally:
+            found.put(_WALKER_DONE)
+
+    def _next_task(self, index: int, tasks: List[Deque[Task]]) -> Optional[Task]:
+        """
+            Next task of a walker, waits while there is none it may take
+            Called with _lock held.
+            return: None once the walk is over or stopped
+        """
+        own = tasks[index]
+
+        while not self._stop and self._tasks_left:
+            if self._buffered < REORDER_BUFFER:
+                if own:
+                    return own.pop()
+                task = self._steal(tasks, index)
+                if task is not None:
+                    return task
+            elif own and own[-1][2] == self._expected:
+                # Every deque is ordered by key, its first task in the walk order at the end popped
+                return own.pop()
+
+            self._waiting.add(index)
+            self._wakeups[index].wait()
+            self._waiting.discard(index)
+        return None
+
+    def _wake_all(self) -> None:
+        """
+            Wake the waiting walkers, called with _lock held
+        """
+        self._wake(len(self._waiting))
+
+    def _wake(self, count: int) -> None:
+        """
+            Wake up to count waiting walkers, called with _lock held
+        """
+        for index in list(self._waiting)[:count]:
+            self._waiting.discard(index)
+            self._wakeups[index].notify()
+
+    @staticmethod
+    def _next_key(path: List[List]) -> Optional[Key]:
+        """
+            Key of the directory after the last one of path in the serial
+            walk, None once the walk is over
+        """
+        while path:
+            frame = path[-1]
+            if frame[1] < frame[2]:
+                frame[1] += 1
+                return frame[0] + (frame[1] - 1,)
+            path.pop()
+        return None
+
+    @staticmethod
+    def _steal(tasks: List[Deque[Task]], index: int) -> Optional[Task]:
+        for offset in range(1, len(tasks)):
+            try:
+                return tasks[(index + offset) % len(tasks)].popleft()
+            except IndexError:
+                continue
+        return None
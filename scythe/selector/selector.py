@@ -0,0 +1,109 @@
+"""
+    Artifact selector - largest artifacts of a scan
+"""
+
+import heapq
+import itertools
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from scythe.models.models import ArtifactInfo, Project
+
+
+class ArtifactSelector:
+    """
+        Keep the `top` largest artifacts of at least `min_size` bytes,
+        last used before `cutoff` (epoch) when given
+
+        Candidates live in a min-heap bounded to `top` entries, so a scan
+        of any size only keeps the current winners (and their projects)
+        in memory. On equal sizes the artifact found first wins.
+        threshold is the size an artifact must reach to be kept, it only
+        grows during a scan.
+    """
+
+    def __init__(self, top: Optional[int] = None, min_size: int = 0, cutoff: Optional[float] = None):
+        if top is not None and top < 1:
+            raise ValueError("top must be at least 1")
+
+        self.top = top
+        self.min_size = min_size
+        self.cutoff = cutoff
+        self._heap: List[Tuple[int, int, ArtifactInfo, Project]] = []
+        self._counter = itertools.count()
+
+    @property
+    def threshold(self) -> int:
+        if self.top is not None and len(self._heap) >= self.top:
+            return max(self.min_size, self._heap[0][0] + 1)
+        return self.min_size
+
+    def rejects(self, size: int) -> bool:
+        return size < self.threshold
+
+    def is_stale(self, artifact: ArtifactInfo) -> bool:
+        return self.cutoff is None or artifact.last_activity.timestamp() <= self.cutoff
+
+    def offer(self, project: Project) -> None:
+        for artifact in project.artifacts:
+            size = artifact.size_bytes
+            if self.rejects(size) or not self.is_stale(artifact):
+                continue
+
+            if self.top is None or len(self._heap) < self.top:
+                heapq.heappush(self._heap, (size, -next(self._counter), artifact, project))
+            else:
+                heapq.heapreplace(self._heap, (size, -next(self._counter), artifact, project))
+
+    def keep(self, project: Project) -> Optional[Project]:
+        """
+            Copy of project with only its artifacts of at least min_size
+            and last used before cutoff
+        """
+        artifacts = [a for a in project.artifacts if a.size_bytes >= self.min_size and self.is_stale(a)]
+        if not artifacts:
+            return None
+        return _with_artifacts(project, artifacts)
+
+    def projects(self) -> List[Project]:
+        """
+            Projects of the selected artifacts, largest artifact first
+        """
+        ranked = sorted(self._heap, key=lambda entry: (-entry[0], -entry[1]))
+
+        selected: Dict[int, Tuple[Project, List[ArtifactInfo]]] = {}
+        for _, _, artifact, project in ranked:
+            selected.setdefault(id(project), (project, []))[1].append(artifact)
+
+        return [_with_artifacts(project, artifacts) for project, artifacts in selected.values()]
+
+    def select(self, projects: Iterable[Project]) -> Iterator[Project]:
+        """
+            Selected projects, streamed when there is no top limit
+        """
+        if self.top is None:
+            for project in projects:
+                kept = self.keep(project)
+                if kept is not None:
+                    yield kept
+            return
+
+        for project in projects:
+            self.offer(project)
+        yield from self.projects()
+
+
+def _with_artifacts(project: Project, artifacts: List[ArtifactInfo]) -> Project:
+    return Project(
+        path=project.path,
+        project_type=project.project_type,
+        marker_files=project.marker_files,
+        artifacts=artifacts,
+        last_scanned=project.last_scanned
+    )
+
+
+def select_projects(projects: Iterable[Project],
+                    top: Optional[int] = None,
+                    min_size: int = 0,
+                    cutoff: Optional[float] = None) -> List[Project]:
+    return list(ArtifactSelector(top, min_size, cutoff).select(projects))
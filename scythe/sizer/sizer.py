@@ -0,0 +1,439 @@
+"""
+    Concurrent size calculation of artifacts
+"""
+
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from scythe.models.models import ArtifactInfo, DiskUsage
+from scythe.logger.logger import get_logger
+from scythe.mounts.mounts import MountFilter
+from scythe.fdwalk.fdwalk import walk_tree
+
+SIZE_MODES = ('apparent', 'allocated')
+
+
+class InodeSet:
+    """
+        Compact set of (st_dev, st_ino) pairs
+
+        Inodes of every device are kept in a sorted array of 8 bytes per
+        entry. New inodes go to a small set first, merged into the array
+        once it grows past 1/8 of it, so the set stays cheap at tens of
+        millions of entries. Thread safe.
+    """
+
+    MIN_MERGE = 65536
+
+    def __init__(self):
+        self._sorted: Dict[int, array] = {}
+        self._recent: Dict[int, set] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: Tuple[int, int]) -> bool:
+        dev, ino = key
+        with self._lock:
+            return self._contains(dev, ino)
+
+    def add(self, dev: int, ino: int) -> bool:
+        """
+            return: True if the inode was not in the set yet
+        """
+        with self._lock:
+            recent = self._recent.get(dev)
+            if recent is None:
+                recent = self._recent[dev] = set()
+                self._sorted[dev] = array('Q')
+
+            if ino in recent:
+                return False
+
+            sorted_inodes = self._sorted[dev]
+            if sorted_inodes:
+                index = bisect_left(sorted_inodes, ino)
+                if index < len(sorted_inodes) and sorted_inodes[index] == ino:
+                    return False
+
+            recent.add(ino)
+            self._count += 1
+
+            if len(recent) >= self.MIN_MERGE and len(recent) >= len(sorted_inodes) >> 3:
+                sorted_inodes.extend(recent)
+                self._sorted[dev] = array('Q', sorted(sorted_inodes))
+                recent.clear()
+
+            return True
+
+    def _contains(self, dev: int, ino: int) -> bool:
+        if ino in self._recent.get(dev, ()):
+            return True
+
+        sorted_inodes = self._sorted.get(dev)
+        if not sorted_inodes:
+            return False
+
+        index = bisect_left(sorted_inodes, ino)
+        return index < len(sorted_inodes) and sorted_inodes[index] == ino
+
+
+class SizeAccounting:
+    """
+        How file sizes are added up
+
+        size_mode is 'apparent' (st_size) or 'allocated' (st_blocks * 512).
+        With deduplicate, files with several hard links are counted once for
+        the whole scan, and exclusive_bytes reports the bytes whose every
+        link lives inside the measured tree.
+        The latest access or modification of the files is collected on the
+        way, ages come for free with the sizes.
+        With track_directories, the (path, st_mtime_ns, st_ino) of every sub
+        directory walked is kept in DiskUsage.directories, for the scan
+        cache to tell when the tree changed.
+
+        Attributes :
+        size_mode, deduplicate, track_directories, seen_inodes
+    """
+
+    def __init__(self, size_mode: str = 'apparent', deduplicate: bool = False, track_directories: bool = False):
+        if size_mode not in SIZE_MODES:
+            raise ValueError(f"Unknown size mode: {size_mode}")
+
+        self.size_mode = size_mode
+        self.deduplicate = deduplicate
+        self.track_directories = track_directories
+        self.seen_inodes = InodeSet()
+
+    def new_usage(self) -> DiskUsage:
+        return DiskUsage(
+            exclusive_bytes=0 if self.deduplicate else None,
+            directories=[] if self.track_directories else None
+        )
+
+    def add_file(self, stat_result: os.stat_result, usage: DiskUsage, links: Dict) -> None:
+        """
+            Account one file in usage
+            links collects the hard-linked inodes met in the measured tree
+        """
+        apparent = stat_result.st_size
+        allocated = getattr(stat_result, 'st_blocks', None)
+        allocated = allocated * 512 if allocated is not None else apparent
+        size = allocated if self.size_mode == 'allocated' else apparent
+
+        used = stat_result.st_atime if stat_result.st_atime > stat_result.st_mtime else stat_result.st_mtime
+        if usage.last_used is None or used > usage.last_used:
+            usage.last_used = used
+
+        if not self.deduplicate:
+            usage.apparent_bytes += apparent
+            usage.allocated_bytes += allocated
+            usage.files += 1
+            return
+
+        if stat_result.st_nlink > 1:
+            key = (stat_result.st_dev, stat_result.st_ino)
+            if key in links:
+                links[key][0] += 1
+            else:
+                links[key] = [1, stat_result.st_nlink, size]
+
+            if not self.seen_inodes.add(*key):
+                return
+        else:
+            usage.exclusive_bytes += size
+
+        usage.apparent_bytes += apparent
+        usage.allocated_bytes += allocated
+        usage.files += 1
+
+    @staticmethod
+    def merge_links(links: Dict, other: Dict) -> None:
+        for key, (count, nlink, size) in other.items():
+            if key in links:
+                links[key][0] += count
+            else:
+                links[key] = [count, nlink, size]
+
+    def finish(self, usage: DiskUsage, links: Dict) -> DiskUsage:
+        """
+            Add the hard-linked inodes fully contained in the tree to exclusive_bytes
+        """
+        if self.deduplicate:
+            usage.exclusive_bytes += sum(
+                size for count, nlink, size in links.values() if count >= nlink
+            )
+        return usage
+
+
+def measure_files(
+        path: str,
+        accounting: SizeAccounting,
+        usage: DiskUsage,
+        links: Dict,
+        follow_symlinks: bool = False,
+        mount_filter: Optional[MountFilter] = None,
+        visited: Optional[InodeSet] = None,
+        dir_fd: Optional[int] = None
+) -> List[str]:
+    """
+        Account the files directly inside a directory
+        Sub directories excluded by mount_filter are not walked. With
+        follow_symlinks, symlinked directories are walked too and those
+        already in visited are left out. With dir_fd, an open fd of path,
+        entries are listed and stat'ed relative to it.
+        return: sub directories to walk (their names with dir_fd)
+        raise: OSError if the directory cannot be read
+    """
+    sub_directories = []
+
+    with os.scandir(path if dir_fd is None else dir_fd) as entries:
+        for entry in entries:
+            try:
+                if entry.is_symlink() and not follow_symlinks:
+                    continue
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    if mount_filter is not None and mount_filter.excludes(
+                            os.path.join(path, entry.name), entry.is_symlink()):
+                        continue
+                    stat_result = None
+                    if visited is not None:
+                        stat_result = entry.stat()
+                        if not visited.add(stat_result.st_dev, stat_result.st_ino):
+                            continue
+                    if usage.directories is not None:
+                        stat_result = stat_result or entry.stat(follow_symlinks=follow_symlinks)
+                        usage.directories.append(
+                            (os.path.join(path, entry.name), stat_result.st_mtime_ns, stat_result.st_ino)
+                        )
+                    sub_directories.append(entry.path)
+                elif entry.is_file():
+                    accounting.add_file(entry.stat(), usage, links)
+            except (OSError, PermissionError):
+                continue
+
+    return sub_directories
+
+
+def measure_tree(
+        path: str,
+        accounting: SizeAccounting,
+        usage: DiskUsage,
+        links: Dict,
+        follow_symlinks: bool = False,
+        mount_filter: Optional[MountFilter] = None,
+        visited: Optional[InodeSet] = None
+) -> None:
+    """
+        Account every file below a directory, unreadable entries are skipped
+        The tree is walked through directory fds, see walk_tree
+    """
+    def visit(directory: str, dir_fd: Optional[int]) -> List[str]:
+        return measure_files(directory, accounting, usage, links, follow_symlinks, mount_filter, visited, dir_fd)
+
+    walk_tree(path, visit, follow_symlinks)
+
+
+class _SizeJob:
+    """
+        Usage of one artifact, accumulated by its subtree tasks
+    """
+
+    def __init__(self, future: Future, accounting: SizeAccounting):
+        self.future = future
+        self.accounting = accounting
+        self.usage = accounting.new_usage()
+        self.links: Dict = {}
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def start_task(self) -> None:
+        with self.lock:
+            self.pending += 1
+
+    def finish_task(self, usage: DiskUsage, links: Dict) -> None:
+        with self.lock:
+            self.usage.add(usage)
+            self.accounting.merge_links(self.links, links)
+            self.pending -= 1
+            done = self.pending == 0
+
+        if done:
+            self.future.set_result(self.accounting.finish(self.usage, self.links))
+
+
+class SizeEngine:
+    """
+        Size directories on a bounded pool of threads
+
+        The first split_depth levels of every tree are listed by their own
+        task so that a single huge artifact is spread over all workers.
+        Deeper levels are walked inline by the task that reached them.
+        With follow_symlinks, directories are remembered by (st_dev, st_ino)
+        for the whole engine: a directory reached twice (symlink loop,
+        tree linked from several artifacts) is only walked and counted
+        by the first walk that reaches it.
+
+        Attributes :
+        jobs, follow_symlinks, split_depth, accounting, mount_filter
+    """
+
+    def __init__(
+            self,
+            jobs: int = 1,
+            follow_symlinks: bool = False,
+            split_depth: int = 2,
+            accounting: Optional[SizeAccounting] = None,
+            mount_filter: Optional[MountFilter] = None
+    ):
+        self.jobs = max(1, jobs)
+        self.follow_symlinks = follow_symlinks
+        self.split_depth = split_depth
+        self.accounting = accounting or SizeAccounting()
+        self.mount_filter = mount_filter
+        self.visited: Optional[InodeSet] = InodeSet() if follow_symlinks else None
+        self.logger = get_logger()
+
+        self._executor = None
+        if self.jobs > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.jobs,
+                thread_name_prefix="scythe-size"
+            )
+
+        self._deferred: Dict[int, Tuple[ArtifactInfo, Future]] = {}
+
+    @property
+    def is_parallel(self) -> bool:
+        return self._executor is not None
+
+    def submit(self, path: Path) -> Future:
+        """
+            Start measuring a directory
+            return: a Future holding its DiskUsage
+        """
+        future = Future()
+
+        if not self._first_visit(path):
+            self.logger.debug(f"Already measured through another path: {path}")
+            future.set_result(self.accounting.finish(self.accounting.new_usage(), {}))
+            return future
+
+        if self._executor is None:
+            usage = self.accounting.new_usage()
+            links = {}
+            measure_tree(
+                str(path), self.accounting, usage, links, self.follow_symlinks, self.mount_filter, self.visited
+            )
+            future.set_result(self.accounting.finish(usage, links))
+            return future
+
+        job = _SizeJob(future, self.accounting)
+        self._schedule(job, str(path), 0)
+        return future
+
+    def _first_visit(self, path: Path) -> bool:
+        if self.visited is None:
+            return True
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return True
+        return self.visited.add(stat_result.st_dev, stat_result.st_ino)
+
+    def measure(self, path: Path) -> DiskUsage:
+        return self.submit(path).result()
+
+    def measure_file(self, stat_result: os.stat_result) -> DiskUsage:
+        usage = self.accounting.new_usage()
+        links = {}
+        self.accounting.add_file(stat_result, usage, links)
+        return self.accounting.finish(usage, links)
+
+    def size(self, path: Path) -> int:
+        return self.measure(path).size_bytes(self.accounting.size_mode)
+
+    def size_many(self, paths: List[Path]) -> List[int]:
+        """
+            Size several directories concurrently
+            return: sizes in the same order as paths
+        """
+        futures = [self.submit(path) for path in paths]
+        return [future.result().size_bytes(self.accounting.size_mode) for future in futures]
+
+    def defer(self, artifact: ArtifactInfo) -> Future:
+        """
+            Size an artifact in the background, see resolve()
+        """
+        future = self.submit(artifact.path)
+        self._deferred[id(artifact)] = (artifact, future)
+        return future
+
+    def is_sized(self, artifact: ArtifactInfo) -> bool:
+        deferred = self._deferred.get(id(artifact))
+        return deferred is None or deferred[1].done()
+
+    def pending(self, artifacts: List[ArtifactInfo]) -> List[Future]:
+        """
+            Futures of the artifacts still being sized
+        """
+        futures = []
+        for artifact in artifacts:
+            deferred = self._deferred.get(id(artifact))
+            if deferred and not deferred[1].done():
+                futures.append(deferred[1])
+        return futures
+
+    def resolve(self, artifacts: Optional[List[ArtifactInfo]] = None) -> None:
+        """
+            Wait for deferred artifacts (all of them by default) and store their sizes
+        """
+        keys = list(self._deferred) if artifacts is None else [id(a) for a in artifacts]
+
+        for key in keys:
+            deferred = self._deferred.pop(key, None)
+            if deferred:
+                artifact, future = deferred
+                artifact.apply_usage(future.result(), self.accounting.size_mode)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _schedule(self, job: _SizeJob, path: str, depth: int) -> None:
+        job.start_task()
+        self._executor.submit(self._run, job, path, depth)
+
+    def _run(self, job: _SizeJob, path: str, depth: int) -> None:
+        usage = self.accounting.new_usage()
+        links = {}
+
+        try:
+            if depth < self.split_depth:
+                sub_directories = measure_files(
+                    path, self.accounting, usage, links, self.follow_symlinks, self.mount_filter, self.visited
+                )
+                for sub_directory in sub_directories:
+                    self._schedule(job, sub_directory, depth + 1)
+            else:
+                measure_tree(
+                    path, self.accounting, usage, links, self.follow_symlinks, self.mount_filter, self.visited
+                )
+        except (OSError, PermissionError) as e:
+            self.logger.debug(f"Impossible to calculate the size of {path}: {e}")
+        finally:
+            job.finish_task(usage, links)
@@ -11,10 +11,13 @@ from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
 from rich.tree import Tree
 from rich import box
+from rich.markup import escape
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 
 from scythe.models.models import ScanResult, Project
 from scythe.logger.logger import get_logger
+from scythe.progress.progress import ProgressSnapshot
+from scythe.rules.rules import RuleSet
 
 console = Console()
 logger = get_logger()
@@ -55,7 +58,7 @@ def display_table_view(result: ScanResult, scan_path: Path) -> None:
     table.add_column("Path", style="white")
     table.add_column("Artifacts", style="yellow", justify="right")
     table.add_column("Size", style="green", justify="right")
-    table.add_column("Last Modified", style="dim", no_wrap=True)
+    table.add_column("Last Used", style="dim", no_wrap=True)
 
     for project in result.projects :
         try:
@@ -68,29 +71,29 @@ def display_table_view(result: ScanResult, scan_path: Path) -> None:
 
         size_display = project.total_size_formatted if project.total_artifact_size > 0 else "[dim]0[/dim]"
 
-        last_modified = "N/A"
+        last_used = "N/A"
 
         if project.artifacts :
-            most_recent = max(project.artifacts, key=lambda a: a.last_modified)
-            days_ago = (result.scan_date - most_recent.last_modified).days
+            most_recent = max(a.last_activity for a in project.artifacts)
+            days_ago = (result.scan_date - most_recent).days
 
-            if days_ago == 0 :
-                last_modified = "Today"
+            if days_ago <= 0 :
+                last_used = "Today"
             elif days_ago == 1 :
-                last_modified = "Yesterday"
+                last_used = "Yesterday"
             elif days_ago < 7 :
-                last_modified = f"{days_ago} days ago"
+                last_used = f"{days_ago} days ago"
             elif days_ago < 30 :
-                last_modified = f"{days_ago // 7} weeks ago"
+                last_used = f"{days_ago // 7} weeks ago"
             else :
-                last_modified = f"{days_ago // 30} months ago"
+                last_used = f"{days_ago // 30} months ago"
 
         table.add_row(
             project.project_type.display_name,
             str(relative_path),
             artifact_display,
             size_display,
-            last_modified
+            last_used
         )
     console.print(table)
 
@@ -169,14 +172,135 @@ def display_statistics(result: ScanResult) -> None:
     stats_table.add_row("Directories Scanned", str(result.directories_scanned))
     stats_table.add_row("Files scanned", str(result.files_scanned))
     stats_table.add_row("Projects detected", str(result.total_projects))
-    stats_table.add_row("Artifacts found", str(sum(p.artifact_count for p in result.projects)))
+    stats_table.add_row("Artifacts found", str(result.total_artifacts))
     stats_table.add_row("Total size", result.total_artifact_size_formatted)
 
+    if result.total_exclusive_size is not None :
+        from scythe.utils.utils import format_size
+        stats_table.add_row("Exclusive size", format_size(result.total_exclusive_size))
+
+    if result.cache_hits or result.cache_misses :
+        stats_table.add_row(
+            "Cache hit rate",
+            f"{result.cache_hit_rate:.1f}% ({result.cache_hits}/{result.cache_hits + result.cache_misses})"
+        )
+
     if result.errors :
         stats_table.add_row("Errors", f"[red]{len(result.errors)}[/red]")
 
     console.print(stats_table)
 
+    if len(result.roots) > 1 :
+        display_roots(result)
+
+
+def display_roots(result: ScanResult) -> None:
+    from scythe.utils.utils import format_size
+
+    roots_table = Table(title="Roots", box=box.SIMPLE)
+    roots_table.add_column("Root", style="cyan")
+    roots_table.add_column("Device", style="dim", justify="right")
+    roots_table.add_column("Projects", justify="right")
+    roots_table.add_column("Artifacts", justify="right")
+    roots_table.add_column("Size", style="green", justify="right")
+    roots_table.add_column("Directories", justify="right")
+    roots_table.add_column("Duration", justify="right")
+
+    for root in result.roots :
+        roots_table.add_row(
+            str(root.path),
+            str(root.device),
+            str(root.projects),
+            str(root.artifacts),
+            format_size(root.artifacts_size),
+            str(root.directories_scanned),
+            f"{root.scan_duration:.2f}s"
+        )
+
+    console.print(roots_table)
+
+
+def display_rules(rules: RuleSet) -> None:
+    rules_table = Table(title="Rules", box=box.SIMPLE)
+    rules_table.add_column("Type", style="cyan")
+    rules_table.add_column("Name")
+    rules_table.add_column("Markers")
+    rules_table.add_column("Artifacts", style="green")
+    rules_table.add_column("Source", style="dim")
+
+    for rule in rules.rules :
+        rules_table.add_row(
+            rule.project_type.value,
+            rule.project_type.display_name,
+            ", ".join(rule.markers),
+            ", ".join(rule.artifacts),
+            rule.source
+        )
+
+    console.print(rules_table)
+
+    if rules.sources :
+        console.print(f"[dim]Configuration: {'; '.join(rules.sources)}[/dim]")
+    else :
+        console.print("[dim]No configuration found, built-in rules[/dim]")
+
+
+def display_bench_report(report: dict) -> None:
+    from scythe.utils.utils import format_size
+
+    workspace = report["workspace"]
+    console.print(
+        f"[cyan]Workspace:[/cyan] {workspace['projects']} projects, {workspace['directories']} directories, "
+        f"{workspace['files']} files ({workspace['hard_links']} hard links), {format_size(workspace['bytes'])}"
+    )
+
+    bench_table = Table(title="Benchmarks", box=box.SIMPLE)
+    bench_table.add_column("Benchmark", style="cyan")
+    bench_table.add_column("Best", style="green", justify="right")
+    bench_table.add_column("Median", justify="right")
+    bench_table.add_column("Stdev", style="dim", justify="right")
+    bench_table.add_column("Runs", justify="right")
+
+    for result in report["results"]:
+        bench_table.add_row(
+            escape(result["name"]),
+            f"{result['best'] * 1000:.2f} ms",
+            f"{result['median'] * 1000:.2f} ms",
+            f"{result['stdev'] * 1000:.2f} ms",
+            str(result["runs"])
+        )
+
+    console.print(bench_table)
+
+    scaling = report.get("scaling")
+    if scaling:
+        build = "free-threaded" if report.get("free_threaded") else "GIL"
+        scaling_table = Table(title=f"Scaling (Python {report['python']}, {build}, {report['cpu_count']} CPUs)", box=box.SIMPLE)
+        scaling_table.add_column("Threads", justify="right")
+        scaling_table.add_column("Scan", style="green", justify="right")
+        scaling_table.add_column("Speedup", justify="right")
+        scaling_table.add_column("Sizing", style="green", justify="right")
+        scaling_table.add_column("Speedup", justify="right")
+
+        for run in scaling:
+            scaling_table.add_row(
+                str(run["threads"]),
+                f"{run['scan'] * 1000:.2f} ms",
+                f"{run['scan_speedup']:.2f}x",
+                f"{run['size'] * 1000:.2f} ms",
+                f"{run['size_speedup']:.2f}x"
+            )
+
+        console.print(scaling_table)
+
+    memory = report.get("memory")
+    if memory:
+        console.print(
+            f"[cyan]Result memory ({memory['artifacts']} artifacts):[/cyan] "
+            f"ScanResult {format_size(memory['scan_result_bytes'])} in {memory['scan_result_build']:.2f}s, "
+            f"CompactScanResult {format_size(memory['compact_bytes'])} in {memory['compact_build']:.2f}s"
+        )
+
 
 """def display_artifacts_detail(result: ScanResult) -> None:
     console.print()
@@ -339,6 +463,28 @@ def display_summary_panel(
     )
 
 
+def describe_progress(snapshot: ProgressSnapshot) -> str:
+    """
+        One line summary of a scan or clean ProgressSnapshot
+    """
+    from scythe.utils.utils import format_size
+
+    if snapshot.phase == "clean":
+        line = (
+            f"Cleaning {snapshot.items_done}/{snapshot.items_total or 0} artifacts · "
+            f"{format_size(snapshot.bytes_done)} of {format_size(snapshot.bytes_total or 0)}"
+        )
+        if snapshot.eta is not None and not snapshot.finished:
+            line += f" · ETA {snapshot.eta:.0f}s"
+        return line
+
+    return (
+        f"Scanning {snapshot.directories:,} dirs ({snapshot.directories_per_second:,.0f}/s) · "
+        f"{snapshot.files:,} files ({snapshot.files_per_second:,.0f}/s) · "
+        f"{format_size(snapshot.bytes_done)} sized · {snapshot.queue_depth} queued"
+    )
+
+
 def progress_bar(description: str = "Processing ...") -> Progress:
 
     return Progress(
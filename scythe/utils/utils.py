@@ -2,10 +2,15 @@
     Utils functions
 """
 
+import itertools
 import os
+from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime
-from typing import Set
+from functools import lru_cache
+from typing import Iterable, List, Optional, Set
+
+from scythe.matcher.matcher import PatternMatcher
 
 IGNORED_PATTERNS: Set[str] = {
     '.git',
@@ -19,9 +24,65 @@ IGNORED_PATTERNS: Set[str] = {
     '.vscode',
     '*.swp',
     '*.swo',
-    '*~'
+    '*~',
+    '.scythe-trash*'
 }
 
+IGNORE_MATCHER = PatternMatcher.from_patterns(sorted(IGNORED_PATTERNS))
+
+
+def user_cache_dir() -> Path:
+    """
+        Scythe cache directory, $XDG_CACHE_HOME/scythe or ~/.cache/scythe
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "scythe"
+
+
+def user_config_dir() -> Path:
+    """
+        Scythe configuration directory, $XDG_CONFIG_HOME/scythe or ~/.config/scythe
+    """
+    config_home = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+    return Path(config_home) / "scythe"
+
+@dataclass
+class DirectoryListing:
+    """
+        Entries of a directory read with a single os.scandir call
+
+        The DirEntry objects carry the file type reported by the OS, so
+        callers can classify entries without an extra stat per entry.
+    """
+
+    path: Path
+    files: List[os.DirEntry] = field(default_factory=list)
+    directories: List[os.DirEntry] = field(default_factory=list)
+    file_names: Set[str] = field(default_factory=set)
+
+
+def list_directory(path: Path, follow_symlinks: bool = False) -> DirectoryListing:
+    """
+        List a directory once and split its entries into files and directories
+        Symlinked directories are only reported when follow_symlinks is set.
+        raise: OSError if the directory cannot be read
+    """
+    listing = DirectoryListing(path=path)
+
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    listing.directories.append(entry)
+                elif entry.is_file():
+                    listing.files.append(entry)
+            except OSError:
+                continue
+
+    listing.file_names = {f.name for f in listing.files}
+    return listing
+
+
 def format_size(size_bytes: int) -> str:
     if size_bytes < 0 :
         raise ValueError("Size must be positive")
@@ -33,40 +94,121 @@ def format_size(size_bytes: int) -> str:
     return f"{size_bytes:.1f} PB"
 
 
-def calculate_directory_size(path: Path, follow_symlinks: bool = False) -> int:
+SIZE_UNITS = {
+    '': 1,
+    'B': 1,
+    'K': 1024, 'KB': 1024, 'KIB': 1024,
+    'M': 1024 ** 2, 'MB': 1024 ** 2, 'MIB': 1024 ** 2,
+    'G': 1024 ** 3, 'GB': 1024 ** 3, 'GIB': 1024 ** 3,
+    'T': 1024 ** 4, 'TB': 1024 ** 4, 'TIB': 1024 ** 4,
+}
+
+
+def parse_size(value: str) -> int:
+    """
+        Bytes of a human size ("500M", "1.5 GB", "2048"), binary units like format_size
+    """
+    text = str(value).strip().upper()
+    number = text.rstrip('KMGTIB ')
+    unit = text[len(number):].strip()
+
+    try:
+        size = float(number)
+    except ValueError:
+        raise ValueError(f"Invalid size: {value}") from None
+
+    if unit not in SIZE_UNITS or size < 0:
+        raise ValueError(f"Invalid size: {value}")
+
+    return int(size * SIZE_UNITS[unit])
+
+
+AGE_UNITS = {
+    's': 1,
+    'm': 60,
+    'h': 3600,
+    'd': 86400,
+    'w': 7 * 86400,
+    'y': 365 * 86400,
+}
+
+
+def parse_age(value: str) -> float:
+    """
+        Seconds of an age ("30d", "12h", "2w"), a bare number is in days
+    """
+    text = str(value).strip().lower()
+    unit = text[-1:] if text[-1:] in AGE_UNITS else 'd'
+    number = text[:-1] if text[-1:] in AGE_UNITS else text
+
+    try:
+        age = float(number)
+    except ValueError:
+        raise ValueError(f"Invalid age: {value}") from None
+
+    if age < 0:
+        raise ValueError(f"Invalid age: {value}")
+
+    return age * AGE_UNITS[unit]
+
+
+# Entries looked at by probe_last_used
+LAST_USED_SAMPLE = 64
+
+
+def probe_last_used(path: Path, sample: int = LAST_USED_SAMPLE) -> Optional[float]:
+    """
+        Latest use of a directory and a sample of its entries (epoch)
+
+        A cheap estimate of when a tree was last used, for artifacts that are
+        not walked. Directory atimes are left out, listing a directory (as
+        scans do) updates them. None if the directory cannot be read.
+    """
+    try:
+        latest = os.stat(path).st_mtime
+        with os.scandir(path) as entries:
+            for entry in itertools.islice(entries, sample):
+                try:
+                    entry_stat = entry.stat(follow_symlinks=False)
+                    latest = max(latest, entry_stat.st_mtime)
+                    if not entry.is_dir(follow_symlinks=False):
+                        latest = max(latest, entry_stat.st_atime)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+
+    return latest
+
+
+def calculate_directory_size(path: Path, follow_symlinks: bool = False, jobs: int = 1) -> int:
+    """
+        Size of a directory tree, walked by a SizeEngine on jobs threads
+        (they only run in parallel on free-threaded Python or while in syscalls)
+    """
     if not path.exists():
         raise ValueError("The path does not exist")
     if not path.is_dir():
         raise ValueError("Path is not a directory")
 
-    total_size = 0
+    from scythe.sizer.sizer import SizeEngine
+    with SizeEngine(jobs, follow_symlinks) as size_engine:
+        return size_engine.size(path)
+
+
+def ignore_matcher(custom_ignores: Optional[Iterable[str]] = None) -> PatternMatcher:
+    """
+        Compiled IGNORED_PATTERNS plus custom_ignores
+    """
+    if not custom_ignores:
+        return IGNORE_MATCHER
+    return _compile_ignores(frozenset(custom_ignores))
 
-    try:
-        for entry in path.rglob('*'):
-            if entry.is_symlink() and not follow_symlinks:
-                continue
-            if entry.is_file():
-                try:
-                    total_size+= entry.stat().st_size
-                except (OSError, PermissionError):
-                    continue
-    except (OSError, PermissionError):
-        pass
 
-    return total_size
+@lru_cache(maxsize=32)
+def _compile_ignores(custom_ignores: frozenset) -> PatternMatcher:
+    return PatternMatcher.from_patterns(sorted(IGNORED_PATTERNS | custom_ignores))
 
 
 def is_ignored_path(path: Path, custom_ignores: Set[str] = None) -> bool :
-    ignored = IGNORED_PATTERNS.copy()
-    if custom_ignores:
-        ignored.update(custom_ignores)
-
-    if path.name in ignored:
-        return True
-
-    for pattern in ignored:
-        if '*' in pattern :
-            pattern_clean = pattern.replace('*', '')
-            if pattern_clean in path.name :
-                return True
-    return False
\ No newline at end of file
+    return ignore_matcher(custom_ignores).matches(path.name)
@@ -0,0 +1,70 @@
+"""
+    Async scanner Test
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from scythe.bench.bench import WorkspaceConfig, generate_workspace
+from scythe.scanner.scanner import scan_directory
+from scythe.scanner.async_scanner import AsyncDirectoryScanner, async_iter_projects, async_scan_directory
+from scythe.cache.cache import ScanCache
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    root = tmp_path / "workspace"
+    generate_workspace(root, WorkspaceConfig(projects=12, depth=1, fan_out=3, files=2, artifact_depth=1))
+    return root
+
+
+def sizes(result):
+    return {p.path: p.total_artifact_size for p in result.projects}
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_async_scan_matches_sync_scan(workspace, tmp_path, jobs):
+    expected = scan_directory(workspace, jobs=jobs)
+
+    with ScanCache(tmp_path / "cache.sqlite3") as cache:
+        result = asyncio.run(async_scan_directory(workspace, jobs=jobs, cache=cache, concurrency=4))
+
+    assert sizes(result) == sizes(expected)
+    assert result.directories_scanned == expected.directories_scanned
+    assert result.files_scanned == expected.files_scanned
+    assert result.cache_misses > 0
+    assert not result.errors
+
+
+def test_async_iter_projects_leaves_loop_free(workspace):
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.ensure_future(ticker())
+        projects = [p async for p in async_iter_projects(workspace, top=3)]
+        task.cancel()
+        return projects, ticks
+
+    projects, ticks = asyncio.run(main())
+
+    top = sorted((a.size_bytes for p in scan_directory(workspace).projects for a in p.artifacts), reverse=True)[:3]
+    assert sorted((a.size_bytes for p in projects for a in p.artifacts), reverse=True) == top
+    assert ticks > 0
+
+
+def test_async_progress_is_throttled(workspace):
+    messages = []
+    scanner = AsyncDirectoryScanner(workspace, progress_callback=messages.append, progress_interval=3600)
+
+    result = asyncio.run(scanner.scan())
+
+    assert result.total_projects == 12
+    assert messages == []
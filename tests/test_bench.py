@@ -0,0 +1,62 @@
+"""
+    Benchmark suite Test
+"""
+
+import json
+import os
+from pathlib import Path
+
+from scythe.bench.bench import (
+    PROJECT_TYPES, WorkspaceConfig, generate_workspace, run_benchmarks
+)
+from scythe.scanner.scanner import scan_directory
+
+
+def tree_listing(root: Path):
+    return sorted(
+        (str(path.relative_to(root)), path.stat().st_size if path.is_file() else -1)
+        for path in root.rglob('*')
+    )
+
+
+def test_generate_workspace_is_reproducible(tmp_path):
+    config = WorkspaceConfig(projects=9, depth=1, fan_out=2, files=2, artifact_depth=1, seed=7)
+
+    stats = generate_workspace(tmp_path / "a", config)
+    generate_workspace(tmp_path / "b", config)
+
+    assert tree_listing(tmp_path / "a") == tree_listing(tmp_path / "b")
+    assert stats.projects == 9
+
+
+def test_generate_workspace_covers_every_project_type(tmp_path):
+    config = WorkspaceConfig(projects=len(PROJECT_TYPES), depth=1, fan_out=3, files=2, artifact_depth=0)
+    generate_workspace(tmp_path, config)
+
+    result = scan_directory(tmp_path)
+
+    assert {p.project_type for p in result.projects} == set(PROJECT_TYPES)
+    assert all(p.artifacts for p in result.projects)
+
+
+def test_generate_workspace_hard_links(tmp_path):
+    config = WorkspaceConfig(projects=4, depth=0, files=4, artifact_depth=1, hardlink_ratio=1.0)
+    stats = generate_workspace(tmp_path, config)
+
+    linked = [p for p in tmp_path.rglob('file-*.bin') if os.stat(p).st_nlink > 1]
+    assert stats.hard_links == len(linked) > 0
+
+
+def test_run_benchmarks_report(tmp_path):
+    config = WorkspaceConfig(projects=4, depth=1, fan_out=2, files=2, artifact_depth=1)
+    report = run_benchmarks(config, repeat=2, workdir=tmp_path)
+
+    names = [result["name"] for result in report["results"]]
+    assert names == [
+        "scan_directory", "calculate_directory_size", "format_json",
+        "format_csv", "clean_dry_run", "clean"
+    ]
+    assert all(len(result["timings"]) == 2 for result in report["results"])
+    assert report["workspace"]["projects_found"] == 4
+    assert list(tmp_path.iterdir()) == []
+    json.dumps(report)
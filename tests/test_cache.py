@@ -0,0 +1,132 @@
+"""
+    Scan cache Test
+"""
+
+import os
+import pytest
+from pathlib import Path
+
+from scythe.cache.cache import ScanCache
+from scythe.scanner.scanner import scan_directory
+from scythe.utils.utils import list_directory
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    root = tmp_path / "workspace"
+    project = root / "app"
+    (project / "node_modules" / "pkg").mkdir(parents=True)
+    (project / "package.json").write_text("{}")
+    (project / "node_modules" / "pkg" / "index.js").write_text("x" * 10)
+    return root
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with ScanCache(tmp_path / "cache.sqlite3") as scan_cache:
+        yield scan_cache
+
+
+def test_cache_reuses_unchanged_tree(workspace, cache):
+    first = scan_directory(workspace, cache=cache)
+    assert first.cache_hits == 0
+    assert first.cache_misses > 0
+
+    cache.hits = cache.misses = 0
+    second = scan_directory(workspace, cache=cache)
+    assert second.cache_misses == 0
+    assert second.cache_hit_rate == 100.0
+    assert second.total_artifacts_size == first.total_artifacts_size == 10
+    assert [p.path for p in second.projects] == [p.path for p in first.projects]
+
+
+def test_cache_invalidated_by_mtime(workspace, cache):
+    scan_directory(workspace, cache=cache)
+
+    node_modules = workspace / "app" / "node_modules"
+    (node_modules / "other").mkdir()
+    (node_modules / "other" / "lib.js").write_text("y" * 5)
+    stat_result = node_modules.stat()
+    os.utime(node_modules, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+
+    cache.hits = cache.misses = 0
+    result = scan_directory(workspace, cache=cache)
+    assert result.cache_misses == 1
+    assert result.total_artifacts_size == 15
+
+
+def test_cache_prune_removes_missing_paths(workspace, cache):
+    scan_directory(workspace, cache=cache)
+    assert cache.stats()["artifacts"] == 1
+
+    import shutil
+    shutil.rmtree(workspace / "app")
+
+    assert cache.prune() == 2
+    stats = cache.stats()
+    assert stats["artifacts"] == 0
+    assert stats["directories"] == 1
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_cache_sees_changes_deep_in_an_artifact(workspace, cache, jobs):
+    deps = workspace / "app" / "node_modules" / "pkg" / "lib" / "deps"
+    deps.mkdir(parents=True)
+    scan_directory(workspace, cache=cache, jobs=jobs)
+    assert scan_directory(workspace, cache=cache, jobs=jobs).total_artifacts_size == 10
+
+    # The artifact root keeps its mtime, only deps changes
+    (deps / "big.bin").write_bytes(b"x" * 5000)
+
+    cache.hits = cache.misses = 0
+    result = scan_directory(workspace, cache=cache, jobs=jobs)
+    assert result.total_artifacts_size == 5010
+    assert result.cache_misses == 1
+
+
+def test_dedupe_scans_do_not_store_sizes(workspace, cache):
+    library = workspace / "app" / "node_modules" / "pkg"
+    other = workspace / "other" / "node_modules"
+    other.mkdir(parents=True)
+    (workspace / "other" / "package.json").write_text("{}")
+    os.link(library / "index.js", other / "index.js")
+
+    plain = scan_directory(workspace, cache=cache).total_artifacts_size
+    deduplicated = scan_directory(workspace, cache=cache, deduplicate=True).total_artifacts_size
+    assert (plain, deduplicated) == (20, 10)
+
+    cache.connection.execute("DELETE FROM artifacts")
+    assert scan_directory(workspace, cache=cache, deduplicate=True).total_artifacts_size == 10
+    assert scan_directory(workspace, cache=cache).total_artifacts_size == 20
+    assert scan_directory(workspace, cache=cache).total_artifacts_size == 20
+
+
+def test_cached_listing_keeps_symlinked_directories(workspace, tmp_path):
+    (workspace / "linked").symlink_to(workspace / "app")
+
+    with ScanCache(tmp_path / "cache.sqlite3", follow_symlinks=True) as cache:
+        listing = list_directory(workspace, follow_symlinks=True)
+        cache.put_listing(listing, os.stat(workspace), None)
+        cache.flush()
+        cached, _ = cache.get_listing(workspace, os.stat(workspace))
+
+    assert {d.name: d.is_symlink() for d in cached.directories} == {"app": False, "linked": True}
+
+
+def test_cache_flushes_while_another_process_reads(workspace, tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    with ScanCache(path) as writer, ScanCache(path) as reader:
+        for directory in (workspace, workspace / "app"):
+            writer.put_listing(list_directory(directory), os.stat(directory), None)
+        writer.flush()
+
+        # An unfinished read keeps its snapshot open while the writer commits
+        rows = reader.connection.execute("SELECT path FROM directories")
+        rows.fetchone()
+        app = workspace / "app"
+        writer.put_listing(list_directory(app / "node_modules"), os.stat(app / "node_modules"), None)
+        writer.flush()
+        rows.close()
+
+        assert reader.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert reader.connection.execute("SELECT COUNT(*) FROM directories").fetchone()[0] == 3
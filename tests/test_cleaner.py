@@ -2,11 +2,16 @@
 Test for cleaner
 """
 
+import os
 import pytest
 from pathlib import Path
 from datetime import datetime
 from scythe.models.models import ArtifactInfo, Project, ProjectType
+from scythe.cleaner import cleaner
 from scythe.cleaner.cleaner import ArtifactCleaner, clean_artifacts, safe_delete
+from scythe.cleaner.deleter import TreeDeleter, allocated_bytes
+from scythe.fdwalk.fdwalk import FdBudget
+from scythe.utils.utils import ignore_matcher
 
 @pytest.fixture
 def temp_artifact(tmp_path):
@@ -153,4 +158,185 @@ def test_safe_delete_file(tmp_path):
     result = safe_delete(test_file, dry_run=False)
 
     assert result == True
-    assert not test_file.exists()
\ No newline at end of file
+    assert not test_file.exists()
+
+def test_clean_projects_parallel(tmp_path):
+    """Cleaning multiple projects with several workers"""
+    projects = []
+
+    for i in range(6):
+        project_dir = tmp_path / f"project-{i}"
+        nested = project_dir / "node_modules" / "pkg" / "lib"
+        nested.mkdir(parents=True)
+        (nested / "index.js").write_text("code")
+        (project_dir / "node_modules" / "top.js").write_text("code")
+
+        artifact = ArtifactInfo(
+            path=project_dir / "node_modules",
+            size_bytes=1000,
+            last_modified=datetime.now(),
+            artifact_type="node_modules"
+        )
+        projects.append(Project(path=project_dir, project_type=ProjectType.NODE, artifacts=[artifact]))
+
+    missing = ArtifactInfo(
+        path=tmp_path / "gone" / "node_modules",
+        size_bytes=50,
+        last_modified=datetime.now(),
+        artifact_type="node_modules"
+    )
+    projects.append(Project(path=tmp_path / "gone", project_type=ProjectType.NODE, artifacts=[missing]))
+
+    messages = []
+    clean_result = clean_artifacts(projects, progress_callback=messages.append, jobs=4)
+
+    assert clean_result.artifacts_deleted == 6
+    assert clean_result.space_freed == 6000
+    assert clean_result.skipped == [str(missing.path)]
+    assert clean_result.projects_cleaned == projects[:6]
+    assert len(messages) == 7
+    assert not any((p.path / "node_modules").exists() for p in projects)
+
+
+def test_clean_parallel_reports_errors(tmp_path, monkeypatch):
+    """Errors of a worker end up in CleanResult.errors"""
+    project_dir = tmp_path / "project"
+    (project_dir / "node_modules" / "pkg").mkdir(parents=True)
+    (project_dir / "node_modules" / "other").mkdir()
+
+    artifact = ArtifactInfo(
+        path=project_dir / "node_modules",
+        size_bytes=1000,
+        last_modified=datetime.now(),
+        artifact_type="node_modules"
+    )
+    project = Project(path=project_dir, project_type=ProjectType.NODE, artifacts=[artifact])
+
+    def fail(path):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(ArtifactCleaner, "_delete_entry", staticmethod(fail))
+    clean_result = ArtifactCleaner(jobs=2).clean_projects([project])
+
+    assert clean_result.artifacts_deleted == 0
+    assert len(clean_result.errors) == 1
+    assert "pkg" in clean_result.errors[0] and "other" in clean_result.errors[0]
+    assert clean_result.projects_cleaned == []
+
+
+def test_clean_artifact_instant(project_with_artifact, tmp_path, monkeypatch):
+    """Instant mode moves the artifact to the trash, purge deletes it"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    from scythe.cleaner.trash import purge, pending_entries, read_registry
+
+    cleaner = ArtifactCleaner(instant=True, detach=False)
+    result = cleaner.clean_projects([project_with_artifact])
+    artifact = project_with_artifact.artifacts[0]
+
+    assert result.artifacts_deleted == 1
+    assert not artifact.path.exists()
+    assert len(result.trash_dirs) == 1
+    assert ignore_matcher().matches(Path(result.trash_dirs[0]).name)
+    assert [str(d) for d in read_registry()] == result.trash_dirs
+    assert pending_entries() == 1
+
+    removed, errors = purge()
+    assert removed == 1
+    assert errors == []
+    assert pending_entries() == 0
+
+
+@pytest.mark.parametrize("limit", [0, 1, 64])
+def test_tree_deleter_counts_entries(tmp_path, limit):
+    """Trees are removed through directory fds, within the fd budget"""
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "keep.txt").write_bytes(b"k" * 10)
+
+    tree = tmp_path / "node_modules"
+    for depth in range(4):
+        package = tree.joinpath(*[f"pkg-{level}" for level in range(depth + 1)])
+        package.mkdir(parents=True)
+        (package / "index.js").write_bytes(b"x" * 100)
+        (package / "__pycache__").mkdir()
+    os.symlink(outside, tree / "pkg-0" / "link")
+
+    budget = FdBudget(limit)
+    deleter = TreeDeleter(budget)
+    deleter.remove(tree)
+
+    assert not tree.exists()
+    assert (outside / "keep.txt").exists()
+    assert deleter.files == 5
+    assert deleter.directories == 9
+    assert deleter.bytes_removed == 400 + len(str(outside))
+    assert budget.available == limit
+
+
+def test_clean_result_reports_entries(project_with_artifact):
+    """CleanResult counts the entries removed and their rate"""
+    result = ArtifactCleaner().clean_projects([project_with_artifact])
+
+    assert result.entries_removed == 5
+    assert result.entries_per_second > 0
+    assert result.get_summary()["entries_removed"] == 5
+
+
+def test_tree_deleter_counts_released_inodes(tmp_path):
+    """Only inodes whose last link is removed free their blocks"""
+    tree = tmp_path / "build"
+    tree.mkdir()
+    (tree / "own.bin").write_bytes(b"x" * 10000)
+    (tmp_path / "shared.bin").write_bytes(b"y" * 10000)
+    os.link(tmp_path / "shared.bin", tree / "shared.bin")
+    expected = allocated_bytes(os.lstat(tree / "own.bin")) + allocated_bytes(os.lstat(tree))
+
+    deleter = TreeDeleter()
+    deleter.remove(tree)
+
+    assert deleter.bytes_removed == 20000
+    assert deleter.inodes_freed == 2
+    assert deleter.bytes_freed == expected
+    assert (tmp_path / "shared.bin").exists()
+
+
+def test_clean_result_reports_freed_space(project_with_artifact, monkeypatch):
+    """Measured, estimated and file system freed space"""
+    free = iter([1000, 5000])
+    monkeypatch.setattr(cleaner, "free_bytes", lambda path: next(free))
+
+    result = ArtifactCleaner().clean_projects([project_with_artifact])
+
+    assert result.space_freed == 1024 * 100
+    assert result.space_freed_measured > 0
+    assert result.inodes_freed == 5
+    assert result.space_freed_observed == 4000
+    assert len(result.space_freed_by_filesystem) == 1
+
+    dry_run = ArtifactCleaner(dry_run=True).clean_projects([project_with_artifact])
+    assert dry_run.space_freed_measured is None
+    assert dry_run.space_freed_observed is None
+
+
+def test_clean_fans_out_below_single_directories(tmp_path):
+    """An artifact with a single child is still split between the workers"""
+    target = tmp_path / "project" / "target"
+    for name in ("a", "b", "c"):
+        (target / "debug" / "deps" / name).mkdir(parents=True)
+        (target / "debug" / "deps" / name / "lib.rlib").write_bytes(b"x" * 10)
+    (target / "debug" / ".lock").write_bytes(b"")
+
+    cleaner = ArtifactCleaner(jobs=3)
+    directories, entries = cleaner._fan_out(target)
+
+    assert directories == [str(target), str(target / "debug"), str(target / "debug" / "deps")]
+    assert sorted(entries) == sorted(
+        [str(target / "debug" / ".lock")] + [str(target / "debug" / "deps" / name) for name in "abc"]
+    )
+
+    artifact = ArtifactInfo(path=target, size_bytes=30, last_modified=datetime.now(), artifact_type="target")
+    result = cleaner.clean_projects([Project(path=target.parent, project_type=ProjectType.RUST, artifacts=[artifact])])
+
+    assert result.artifacts_deleted == 1
+    assert not target.exists()
+    assert result.entries_removed == 10
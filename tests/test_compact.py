@@ -0,0 +1,83 @@
+"""
+    Compact scan result Test
+"""
+
+import json
+from pathlib import Path
+from datetime import datetime
+
+from scythe.models.models import ArtifactInfo, Project, ProjectType, ScanResult
+from scythe.models.compact import CompactScanResult
+from scythe.formatter.formatter import format_to_json
+from scythe.bench.bench import WorkspaceConfig, generate_workspace
+from scythe.scanner.scanner import scan_directory
+
+
+def make_result() -> ScanResult:
+    modified = datetime(2025, 1, 1, 12, 30)
+    node = Project(
+        path=Path("/work/app"),
+        project_type=ProjectType.NODE,
+        marker_files=["package.json", "yarn.lock"],
+        artifacts=[
+            ArtifactInfo(Path("/work/app/node_modules"), 300, modified, "node_modules",
+                         apparent_bytes=300, allocated_bytes=4096, exclusive_bytes=100),
+            ArtifactInfo(Path("/work/app/dist"), 20, modified, "dist"),
+        ]
+    )
+    python = Project(
+        path=Path("/work/lib"),
+        project_type=ProjectType.PYTHON,
+        marker_files=["pyproject.toml"],
+        artifacts=[ArtifactInfo(Path("/elsewhere/venv"), 50, modified, ".venv")]
+    )
+    empty = Project(path=Path("/work/tool"), project_type=ProjectType.GO, marker_files=["go.mod"])
+
+    return ScanResult(
+        root_path=Path("/work"),
+        projects=[node, python, empty],
+        directories_scanned=12,
+        files_scanned=40,
+        errors=["boom"]
+    )
+
+
+def test_compact_views_match_projects():
+    result = make_result()
+    compact = CompactScanResult.from_result(result)
+
+    assert len(compact.projects) == 3
+    for project, view in zip(result.projects, compact.projects):
+        assert view.path == project.path
+        assert view.project_type == project.project_type
+        assert view.marker_files == project.marker_files
+        assert view.total_artifact_size == project.total_artifact_size
+        assert view.artifact_count == project.artifact_count
+        for artifact, artifact_view in zip(project.artifacts, view.artifacts):
+            assert artifact_view.to_artifact() == artifact
+
+    assert compact.projects[-1].path == Path("/work/tool")
+
+
+def test_compact_aggregates_match_scan_result():
+    result = make_result()
+    compact = CompactScanResult.from_result(result)
+
+    assert compact.get_summary() == result.get_summary()
+    assert compact.total_artifacts_size == result.total_artifacts_size == 370
+    assert compact.total_exclusive_size == result.total_exclusive_size == 100
+    assert [p.path for p in compact.get_property_by_type(ProjectType.PYTHON)] == [Path("/work/lib")]
+    assert compact.to_scan_result().projects == result.projects
+
+
+def test_scan_directory_compact(tmp_path):
+    generate_workspace(tmp_path, WorkspaceConfig(projects=8, depth=1, fan_out=2, files=2, artifact_depth=1))
+
+    result = scan_directory(tmp_path)
+    compact = scan_directory(tmp_path, compact=True)
+
+    assert isinstance(compact, CompactScanResult)
+    assert compact.get_summary() == result.get_summary()
+
+    expected = json.loads(format_to_json(result))["projects"]
+    assert json.loads(format_to_json(compact))["projects"] == expected
@@ -0,0 +1,96 @@
+"""
+    Rule configuration Test
+"""
+
+import pytest
+
+from scythe.config import ConfigError, find_pyproject, load_rules
+from scythe.models.models import CustomProjectType, ProjectType, get_project_type
+from scythe.rules.rules import DEFAULT_RULES
+from scythe.scanner.scanner import scan_directory
+from scythe.cache.cache import ScanCache
+
+PYPROJECT = """
+[tool.scythe.rules.bazel]
+markers = ["WORKSPACE", "MODULE.bazel"]
+artifacts = ["bazel-*"]
+
+[tool.scythe.rules.python]
+artifacts = [".pdm-build"]
+
+[tool.scythe.rules.ruby]
+enabled = false
+"""
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / "pyproject.toml").write_text(PYPROJECT)
+    (tmp_path / "lib").mkdir()
+
+    mono = tmp_path / "work" / "mono"
+    (mono / "bazel-out").mkdir(parents=True)
+    (mono / "WORKSPACE").write_text("")
+    (mono / "package.json").write_text("{}")
+    (mono / "bazel-out" / "lib.a").write_bytes(b"x" * 300)
+
+    app = tmp_path / "work" / "app"
+    (app / ".pdm-build").mkdir(parents=True)
+    (app / "setup.py").write_text("")
+    (app / ".pdm-build" / "wheel").write_bytes(b"x" * 20)
+
+    (tmp_path / "work" / "gem").mkdir()
+    (tmp_path / "work" / "gem" / "Gemfile").write_text("")
+    return tmp_path
+
+
+def test_load_rules_from_pyproject(workspace):
+    rules = load_rules(user_config=workspace / "missing.toml", project_dir=workspace / "lib")
+
+    assert find_pyproject(workspace / "lib") == workspace / "pyproject.toml"
+    assert rules.rules[0].project_type == get_project_type("bazel") == CustomProjectType("bazel")
+    assert rules.rule(ProjectType.RUBY) is None
+    assert ".pdm-build" in rules.artifact_patterns(ProjectType.PYTHON)
+    assert "__pycache__" in rules.artifact_patterns(ProjectType.PYTHON)
+    assert rules.markers.first({"WORKSPACE", "package.json"}) == CustomProjectType("bazel")
+    assert rules.cache_key != DEFAULT_RULES.cache_key == ""
+
+    assert load_rules(user_config=workspace / "missing.toml", project_dir=workspace.parent) is DEFAULT_RULES
+
+
+def test_scan_with_custom_rules(workspace):
+    rules = load_rules(user_config=workspace / "missing.toml", project_dir=workspace)
+
+    with ScanCache(workspace.parent / f"{workspace.name}.sqlite3") as cache:
+        scan_directory(workspace / "work", cache=cache)
+        cache.flush()
+        result = scan_directory(workspace / "work", cache=cache, rules=rules)
+
+    projects = {p.path.name: p for p in result.projects}
+    assert set(projects) == {"mono", "app"}
+    assert projects["mono"].project_type.value == "bazel"
+    assert projects["mono"].project_type.display_name == "Bazel"
+    assert [a.size_bytes for a in projects["mono"].artifacts] == [300]
+    assert [a.path.name for a in projects["app"].artifacts] == [".pdm-build"]
+
+    compact = scan_directory(workspace / "work", rules=rules, compact=True)
+    assert compact.get_summary()["bazel_projects"] == 1
+
+    assert "BAZEL" not in ProjectType.__members__
+    with pytest.raises(ValueError):
+        ProjectType("bazel")
+
+
+@pytest.mark.parametrize("rule, message", [
+    ("[rules.cmake]\nartifacts = ['build-*']", "without markers"),
+    ("[rules.cmake]\nmarkers = 'CMakeLists.txt'", "list of names"),
+    ("[rules.cmake]\nmarkers = ['CMakeLists.txt']\nartefacts = ['build-*']", "unknown keys"),
+    ("[rules.CMake]\nmarkers = ['CMakeLists.txt']", "invalid rule name"),
+    ("[rules.cmake\n", "Cannot read"),
+])
+def test_invalid_config(tmp_path, rule, message):
+    config = tmp_path / "config.toml"
+    config.write_text(rule)
+
+    with pytest.raises(ConfigError, match=message):
+        load_rules(user_config=config, project_dir=tmp_path)
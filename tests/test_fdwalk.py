@@ -0,0 +1,52 @@
+"""
+    Directory fd walk Test
+"""
+
+import os
+
+import pytest
+
+from scythe.fdwalk import fdwalk
+from scythe.fdwalk.fdwalk import FdBudget, walk_tree
+from scythe.utils.utils import calculate_directory_size
+
+
+@pytest.fixture
+def deep_tree(tmp_path):
+    directory = tmp_path / "node_modules"
+    for depth in range(6):
+        directory = directory / f"pkg-{depth}" / "node_modules"
+        directory.mkdir(parents=True)
+        (directory / "index.js").write_bytes(b"x" * (depth + 1))
+        (directory.parent / "package.json").write_bytes(b"{}")
+    return tmp_path
+
+
+def walked(root, budget):
+    directories = []
+
+    def visit(directory, dir_fd):
+        directories.append(directory)
+        with os.scandir(directory if dir_fd is None else dir_fd) as entries:
+            return [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
+
+    walk_tree(str(root), visit, budget=budget)
+    return sorted(directories)
+
+
+@pytest.mark.skipif(not fdwalk.FD_WALK, reason="no dir_fd support")
+def test_walk_stays_within_fd_budget(deep_tree):
+    expected = sorted(str(path) for path in [deep_tree, *deep_tree.rglob("*")] if path.is_dir())
+
+    for limit in (0, 3, 64):
+        budget = FdBudget(limit)
+        assert walked(deep_tree, budget) == expected
+        assert budget.available == limit
+
+
+def test_tree_size_without_fd_walk(deep_tree, monkeypatch):
+    size = calculate_directory_size(deep_tree)
+    assert size == sum(range(1, 7)) + 6 * 2
+
+    monkeypatch.setattr(fdwalk, "FD_WALK", False)
+    assert calculate_directory_size(deep_tree) == size
@@ -0,0 +1,44 @@
+"""
+    Formatter Test
+"""
+
+import io
+import json
+from pathlib import Path
+from datetime import datetime
+
+from scythe.formatter.formatter import format_to_json, write_ndjson
+from scythe.models.models import ArtifactInfo, Project, ProjectType, ScanResult
+
+
+def make_project(name: str, size: int) -> Project:
+    artifact = ArtifactInfo(
+        path=Path(f"/test/{name}/node_modules"),
+        size_bytes=size,
+        last_modified=datetime(2025, 1, 1),
+        artifact_type="node_modules"
+    )
+    return Project(
+        path=Path(f"/test/{name}"),
+        project_type=ProjectType.NODE,
+        marker_files=["package.json"],
+        artifacts=[artifact]
+    )
+
+
+def test_write_ndjson_one_line_per_project():
+    stream = io.StringIO()
+    count = write_ndjson(iter([make_project("a", 10), make_project("b", 20)]), stream)
+
+    lines = stream.getvalue().splitlines()
+    assert count == 2
+    assert [json.loads(line)["total_artifact_size"] for line in lines] == [10, 20]
+
+
+def test_ndjson_lines_match_json_report():
+    projects = [make_project("a", 10)]
+    stream = io.StringIO()
+    write_ndjson(projects, stream)
+
+    report = json.loads(format_to_json(ScanResult(root_path=Path("/test"), projects=projects)))
+    assert json.loads(stream.getvalue()) == report["projects"][0]
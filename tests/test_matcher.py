@@ -0,0 +1,55 @@
+"""
+    Pattern matcher Test
+"""
+
+from pathlib import Path
+
+from scythe.matcher.matcher import PatternMatcher
+from scythe.models.models import ProjectType
+from scythe.rules.rules import DEFAULT_RULES
+from scythe.utils.utils import is_ignored_path
+
+
+def test_exact_and_glob_patterns():
+    matcher = PatternMatcher.from_patterns(['.git', '*.swp', '*~', 'build-?'])
+
+    assert matcher.matches('.git')
+    assert matcher.matches('main.py.swp')
+    assert matcher.matches('notes.txt~')
+    assert matcher.matches('build-1')
+    assert not matcher.matches('.gitignore')
+    assert not matcher.matches('a~b')
+    assert not matcher.matches('build-10')
+
+
+def test_first_respects_table_order():
+    matcher = PatternMatcher.from_table({
+        'first': ['a.txt', '*.log'],
+        'second': ['b.txt'],
+    })
+
+    assert matcher.first({'b.txt', 'x.log'}) == 'first'
+    assert matcher.first({'b.txt'}) == 'second'
+    assert matcher.first({'c.txt'}) is None
+    # many names take the exact-name table path
+    assert matcher.first({f'f{i}' for i in range(10)} | {'b.txt', 'a.txt'}) == 'first'
+
+
+def test_names_for_value():
+    names = {'App.csproj', 'Lib.csproj', 'App.sln', 'README.md'}
+
+    assert DEFAULT_RULES.markers.first(names) == ProjectType.DOTNET
+    assert DEFAULT_RULES.markers.names_for(names, ProjectType.DOTNET) == ['App.csproj', 'Lib.csproj', 'App.sln']
+
+
+def test_artifact_values():
+    assert DEFAULT_RULES.artifacts.values('target') == {ProjectType.RUST, ProjectType.JAVA_MAVEN}
+    assert DEFAULT_RULES.artifacts.values('scythe.egg-info') == {ProjectType.PYTHON}
+    assert DEFAULT_RULES.artifacts.values('src') == set()
+
+
+def test_ignored_path_uses_fnmatch():
+    assert is_ignored_path(Path('/a/.git'))
+    assert is_ignored_path(Path('/a/backup~'))
+    assert not is_ignored_path(Path('/a/my~project'))
+    assert is_ignored_path(Path('/a/generated'), {'gen*'})
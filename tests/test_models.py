@@ -2,6 +2,7 @@
 Testing Models
 """
 
+from array import array
 from pathlib import Path
 from datetime import datetime
 
@@ -97,4 +98,49 @@ def test_scan_result_summary():
     summary = result.get_summary()
     assert summary['total_projects'] == 1
     assert summary['directories_scanned'] == 50
-    assert summary['python_projects'] == 1
\ No newline at end of file
+    assert summary['python_projects'] == 1
+
+def make_node_project(name: str, sizes) -> Project:
+    return Project(
+        path=Path(f"/test/{name}"),
+        project_type=ProjectType.NODE,
+        marker_files=["package.json"],
+        artifacts=[
+            ArtifactInfo(
+                path=Path(f"/test/{name}/{artifact_type}"),
+                size_bytes=size,
+                last_modified=datetime.now(),
+                artifact_type=artifact_type
+            )
+            for artifact_type, size in sizes
+        ]
+    )
+
+
+def test_scan_result_index_follows_appended_projects():
+    result = ScanResult(root_path=Path("/test"))
+    result.add_project(make_node_project("a", [("node_modules", 100), ("dist", 10)]))
+
+    assert result.total_artifacts_size == 110
+    result.add_project(make_node_project("b", [("node_modules", 50)]))
+    result.projects.append(Project(path=Path("/test/c"), project_type=ProjectType.GO))
+
+    index = result.index
+    assert result.total_artifacts == index.artifacts == 3
+    assert result.total_artifacts_size == 160
+    assert index.projects_by_type == {ProjectType.NODE: array('I', [0, 1]), ProjectType.GO: array('I', [2])}
+    assert index.bytes_by_type == {ProjectType.NODE: 160, ProjectType.GO: 0}
+    assert index.artifacts_by_type == {"node_modules": 2, "dist": 1}
+    assert index.artifact_bytes_by_type == {"node_modules": 150, "dist": 10}
+    assert [p.path.name for p in result.get_property_by_type(ProjectType.NODE)] == ["a", "b"]
+    assert result.get_summary()["go_projects"] == 1
+
+
+def test_scan_result_index_rebuilt_when_projects_replaced():
+    result = ScanResult(root_path=Path("/test"), projects=[make_node_project("a", [("dist", 10)])])
+    assert result.total_artifacts_size == 10
+
+    result.projects = [make_node_project("b", [("dist", 7)])]
+
+    assert result.total_artifacts_size == 7
+    assert result.get_property_by_type(ProjectType.NODE)[0].path == Path("/test/b")
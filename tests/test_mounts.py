@@ -0,0 +1,87 @@
+"""
+    Mount points Test
+"""
+
+import os
+
+from scythe.mounts import mounts
+from scythe.mounts.mounts import Mount, MountFilter, device_id, expand_fs_types, parse_mountinfo, PSEUDO_FS_TYPES
+from scythe.scanner.scanner import scan_directory
+from scythe.cache.cache import ScanCache
+
+MOUNTINFO = """\
+23 28 0:22 / /proc rw,relatime - proc proc rw
+36 28 0:31 / /home/me/my\\040share rw,relatime shared:12 - nfs4 server:/export rw
+bad line
+"""
+
+
+def test_parse_mountinfo():
+    parsed = parse_mountinfo(MOUNTINFO)
+
+    assert parsed == [
+        Mount(mount_point="/proc", fs_type="proc", source="proc", device="0:22"),
+        Mount(mount_point="/home/me/my share", fs_type="nfs4", source="server:/export", device="0:31"),
+    ]
+    assert expand_fs_types(["nfs4,fuse.sshfs", "pseudo"]) == {"nfs4", "fuse.sshfs"} | PSEUDO_FS_TYPES
+
+
+def test_mount_filter_excludes_mounts_below_root(tmp_path, monkeypatch):
+    (tmp_path / "share").mkdir()
+    root_device = device_id(os.stat(tmp_path).st_dev)
+    fake_mounts = [
+        Mount(str(tmp_path), "ext4", "/dev/sda1", root_device),
+        Mount(str(tmp_path / "share"), "nfs4", "server:/export", "0:31"),
+        Mount("/elsewhere", "nfs4", "server:/other", "0:32"),
+    ]
+
+    mount_filter = MountFilter(tmp_path, skip_fs_types={"nfs4"}, mounts=fake_mounts)
+    assert mount_filter.excluded == {str(tmp_path / "share")}
+    assert mount_filter.excludes(str(tmp_path / "share"))
+
+    # Another device below root, told apart from the table alone
+    stat = os.stat
+
+    def no_stat_below_root(path, *args, **kwargs):
+        assert str(path) == str(tmp_path), f"{path} was stat'ed"
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(mounts.os, "stat", no_stat_below_root)
+    mount_filter = MountFilter(tmp_path, one_file_system=True, mounts=fake_mounts)
+    monkeypatch.undo()
+    assert mount_filter.excluded == {str(tmp_path / "share")}
+
+    # Followed symlinks are checked against the mount of their target
+    (tmp_path / "link").symlink_to(tmp_path / "share")
+    (tmp_path / "local").symlink_to(tmp_path / "share" / "..")
+    assert mount_filter.excludes(str(tmp_path / "link"), is_symlink=True)
+    assert not mount_filter.excludes(str(tmp_path / "local"), is_symlink=True)
+
+
+def test_scan_does_not_enter_skipped_mounts(tmp_path, monkeypatch):
+    for name in ("local", "share"):
+        project = tmp_path / name / "app"
+        (project / "node_modules").mkdir(parents=True)
+        (project / "package.json").write_text("{}")
+        (project / "node_modules" / "index.js").write_bytes(b"x" * 100)
+    (tmp_path / "local" / "app" / "node_modules" / "mounted").mkdir()
+    (tmp_path / "local" / "app" / "node_modules" / "mounted" / "big.bin").write_bytes(b"x" * 5000)
+
+    fake_mounts = [
+        Mount(str(tmp_path / "share"), "nfs4", "server:/export", "0:31"),
+        Mount(str(tmp_path / "local" / "app" / "node_modules" / "mounted"), "fuse.sshfs", "host:", "0:40"),
+    ]
+    monkeypatch.setattr(mounts, "read_mounts", lambda path=mounts.MOUNTINFO: fake_mounts)
+
+    result = scan_directory(tmp_path, skip_fs_types={"nfs4", "fuse.sshfs"})
+
+    assert [p.path.name for p in result.projects] == ["app"]
+    assert result.projects[0].path.parent.name == "local"
+    assert result.total_artifacts_size == 100
+
+    assert scan_directory(tmp_path).total_artifacts_size == 5200
+
+    with ScanCache(tmp_path.parent / f"{tmp_path.name}.sqlite3") as cache:
+        scan_directory(tmp_path, cache=cache)
+        filtered = scan_directory(tmp_path, cache=cache, skip_fs_types={"nfs4", "fuse.sshfs"})
+    assert filtered.total_artifacts_size == 100
@@ -0,0 +1,62 @@
+"""
+    Progress reporter Test
+"""
+
+from scythe.progress.progress import ProgressReporter, ProgressSnapshot
+from scythe.scanner.scanner import scan_directory
+from scythe.cleaner.cleaner import clean_artifacts
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_reporter_is_throttled():
+    clock = FakeClock()
+    snapshots = []
+    reporter = ProgressReporter(snapshots.append, interval=1.0, clock=clock)
+
+    for index in range(100):
+        clock.now = index * 0.05
+        reporter.directory(f"/dir-{index}", files=2)
+    reporter.finish()
+
+    assert len(snapshots) == 5
+    assert snapshots[-1].finished
+    assert snapshots[-1].directories == 100
+    assert snapshots[-1].files == 200
+    assert snapshots[-1].directories_per_second == 100 / clock.now
+
+
+def test_snapshot_eta_from_bytes_remaining():
+    snapshot = ProgressSnapshot(phase="clean", elapsed=2.0, bytes_done=100, bytes_total=400)
+
+    assert snapshot.bytes_per_second == 50
+    assert snapshot.eta == 6.0
+    assert ProgressSnapshot(phase="scan").eta is None
+
+
+def test_scan_and_clean_report_totals(tmp_path):
+    project = tmp_path / "app"
+    (project / "node_modules" / "lib").mkdir(parents=True)
+    (project / "package.json").write_text("{}")
+    (project / "node_modules" / "lib" / "index.js").write_bytes(b"x" * 1000)
+
+    scans = []
+    result = scan_directory(tmp_path, progress=ProgressReporter(scans.append))
+
+    assert scans[-1].finished
+    assert scans[-1].directories == result.directories_scanned
+    assert scans[-1].files == result.files_scanned
+    assert scans[-1].bytes_done == result.total_artifacts_size
+
+    cleans = []
+    clean_artifacts(result.projects, dry_run=True, progress=ProgressReporter(cleans.append, phase="clean"))
+
+    assert cleans[-1].items_done == cleans[-1].items_total == 1
+    assert cleans[-1].bytes_done == cleans[-1].bytes_total == result.total_artifacts_size
+    assert cleans[-1].eta == 0.0
@@ -0,0 +1,94 @@
+"""
+    Multi-root scanner Test
+"""
+
+import os
+
+import pytest
+
+from scythe.cache.cache import ScanCache
+from scythe.models.models import ProjectType
+from scythe.rules.rules import DEFAULT_RULES, Rule, RuleSet
+from scythe.scanner.roots import MultiRootScanner, distinct_roots, scan_roots
+from scythe.scanner.scanner import scan_directory
+
+
+@pytest.fixture
+def roots(tmp_path):
+    sizes = {"first": [100, 2000], "second": [50, 3000, 10]}
+    for root, project_sizes in sizes.items():
+        for index, size in enumerate(project_sizes):
+            project = tmp_path / root / f"app-{index}"
+            (project / "node_modules").mkdir(parents=True)
+            (project / "package.json").write_text("{}")
+            (project / "node_modules" / "index.js").write_bytes(b"x" * size)
+    return [tmp_path / "first", tmp_path / "second"]
+
+
+def test_distinct_roots_drops_duplicates_and_nested_roots(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "c").mkdir()
+
+    assert distinct_roots([tmp_path / "a" / "b", tmp_path / "c", tmp_path / "a", tmp_path / "c"]) == [
+        tmp_path / "c", tmp_path / "a"
+    ]
+
+
+def test_scan_roots_merges_results(roots, tmp_path):
+    first, second = scan_directory(roots[0]), scan_directory(roots[1])
+
+    result = scan_roots(roots + [roots[0] / "app-0"], jobs=2)
+
+    assert result.root_path == tmp_path
+    assert result.total_projects == 5
+    assert result.total_artifacts_size == first.total_artifacts_size + second.total_artifacts_size
+    assert result.directories_scanned == first.directories_scanned + second.directories_scanned
+    assert [root.path for root in result.roots] == roots
+    assert [root.projects for root in result.roots] == [2, 3]
+    assert {root.device for root in result.roots} == {os.stat(roots[0]).st_dev}
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_scan_roots_top_is_global(roots, compact):
+    scanner = MultiRootScanner(roots, top=2, compact=compact, device_limits={os.stat(roots[0]).st_dev: 2})
+
+    result = scanner.scan()
+
+    assert [a.size_bytes for p in result.projects for a in p.artifacts] == [3000, 2000]
+    assert list(scanner.devices) == [os.stat(roots[0]).st_dev]
+
+
+def test_scan_roots_rules_per_root(roots):
+    rules = RuleSet([Rule(rule.project_type, rule.markers) if rule.project_type == ProjectType.NODE else rule
+                     for rule in DEFAULT_RULES.rules])
+
+    result = scan_roots(roots, root_rules={roots[1]: rules})
+
+    assert {p.path.parent for p in result.projects if p.artifacts} == {roots[0]}
+    assert sum(len(p.artifacts) for p in result.projects) == 2
+
+
+def test_scan_roots_share_inodes(roots):
+    shared = roots[0] / "app-0" / "node_modules" / "shared.bin"
+    shared.write_bytes(b"x" * 1000)
+    os.link(shared, roots[1] / "app-0" / "node_modules" / "shared.bin")
+    (roots[0] / "linked").symlink_to(roots[1] / "app-1")
+
+    plain = scan_roots(roots)
+    deduplicated = scan_roots(roots, deduplicate=True)
+    assert deduplicated.total_artifacts_size == plain.total_artifacts_size - 1000
+
+    followed = scan_roots(roots, follow_symlinks=True, device_jobs=2)
+    assert followed.total_projects == 5
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_scan_roots_cache_hits(roots, tmp_path, processes):
+    with ScanCache(tmp_path / "cache.sqlite3") as cache:
+        first = scan_roots(roots, cache=cache, processes=processes)
+        cache.flush()
+    with ScanCache(tmp_path / "cache.sqlite3") as cache:
+        second = scan_roots(roots, cache=cache, processes=processes)
+
+    assert first.cache_hits == 0 and first.cache_misses > 0
+    assert second.cache_hits == first.cache_misses and second.cache_misses == 0
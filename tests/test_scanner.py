@@ -46,4 +46,53 @@ def test_scan_complete(test_project_structure):
     project_types = [p.project_type for p in result.projects]
     assert ProjectType.NODE in project_types
     assert ProjectType.PYTHON in project_types
-    assert ProjectType.RUST in project_types
\ No newline at end of file
+    assert ProjectType.RUST in project_types
+
+def test_scan_counts_files_and_directories(test_project_structure):
+    result = scan_directory(test_project_structure)
+
+    # package.json, requirements.txt, Cargo.toml
+    assert result.files_scanned == 3
+    # root and 3 projects (.git is ignored, node_modules and .venv are pruned)
+    assert result.directories_scanned == 4
+
+
+def test_detect_project_type_from_listing(tmp_path):
+    scanner = DirectoryScanner(tmp_path, -1)
+
+    assert scanner.detect_project_type(tmp_path, {"App.csproj"}) == ProjectType.DOTNET
+    assert scanner.get_marker_files(tmp_path, ProjectType.NODE, {"package.json", "yarn.lock"}) == [
+        "package.json", "yarn.lock"
+    ]
+    assert scanner.detect_project_type(tmp_path, set()) is None
+
+
+def test_scan_prunes_artifacts(tmp_path):
+    project = tmp_path / "app"
+    nested = project / "node_modules" / "left-pad"
+    nested.mkdir(parents=True)
+    (project / "package.json").write_text("{}")
+    (nested / "package.json").write_text("{}")
+    (nested / "index.js").write_text("module.exports = {}")
+
+    result = scan_directory(tmp_path)
+    assert [p.path for p in result.projects] == [project]
+    assert result.total_artifacts_size == len("module.exports = {}") + 2
+
+    unpruned = scan_directory(tmp_path, prune_artifacts=False)
+    assert unpruned.total_projects == 2
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_iter_projects_matches_scan(test_project_structure, jobs):
+    scanner = DirectoryScanner(test_project_structure, -1, jobs=jobs)
+    iterator = scanner.iter_projects()
+
+    first = next(iterator)
+    assert first.path.parent == test_project_structure
+
+    streamed = [first] + list(iterator)
+    result = scan_directory(test_project_structure)
+
+    assert [p.path for p in streamed] == [p.path for p in result.projects]
+    assert scanner.directories_scanned == result.directories_scanned
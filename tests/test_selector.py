@@ -0,0 +1,132 @@
+"""
+    Artifact selector Test
+"""
+
+import os
+import time
+from pathlib import Path
+from datetime import datetime, timedelta
+
+import pytest
+
+from scythe.models.models import ArtifactInfo, Project, ProjectType
+from scythe.selector.selector import ArtifactSelector, select_projects
+from scythe.scanner.scanner import scan_directory
+from scythe.utils.utils import parse_age, parse_size
+from scythe.cache.cache import ScanCache
+
+
+def make_project(name: str, *sizes: int) -> Project:
+    return Project(
+        path=Path(f"/test/{name}"),
+        project_type=ProjectType.NODE,
+        marker_files=["package.json"],
+        artifacts=[
+            ArtifactInfo(Path(f"/test/{name}/a{i}"), size, datetime.now(), f"a{i}")
+            for i, size in enumerate(sizes)
+        ]
+    )
+
+
+def test_top_keeps_largest_artifacts():
+    projects = [make_project("a", 10, 500), make_project("b", 300), make_project("c", 50, 400)]
+
+    selected = select_projects(projects, top=3)
+
+    assert [p.path.name for p in selected] == ["a", "c", "b"]
+    assert [a.size_bytes for p in selected for a in p.artifacts] == [500, 400, 300]
+    assert selected[0].total_artifact_size == 500
+
+
+def test_top_threshold_and_ties():
+    selector = ArtifactSelector(top=2)
+    selector.offer(make_project("a", 100, 100))
+    assert selector.threshold == 101
+
+    selector.offer(make_project("b", 100))
+    assert [p.path.name for p in selector.projects()] == ["a"]
+
+
+def test_min_size_streams_filtered_projects():
+    selector = ArtifactSelector(min_size=100)
+    projects = selector.select(iter([make_project("a", 10, 200), make_project("b", 99)]))
+
+    selected = list(projects)
+    assert [p.path.name for p in selected] == ["a"]
+    assert [a.size_bytes for a in selected[0].artifacts] == [200]
+
+
+def test_scan_directory_top(tmp_path):
+    for name, size in [("small", 10), ("big", 3000), ("medium", 800)]:
+        project = tmp_path / name
+        (project / "node_modules").mkdir(parents=True)
+        (project / "package.json").write_text("{}")
+        (project / "node_modules" / "blob").write_bytes(b"x" * size)
+
+    result = scan_directory(tmp_path, top=2)
+
+    assert [p.path.name for p in result.projects] == ["big", "medium"]
+    assert result.total_artifacts_size == 3800
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2048", 2048),
+    ("10k", 10 * 1024),
+    ("1.5 GB", int(1.5 * 1024 ** 3)),
+    ("500MiB", 500 * 1024 ** 2),
+])
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+def test_parse_size_invalid():
+    with pytest.raises(ValueError):
+        parse_size("12 parsecs")
+
+
+def make_node_tree(root: Path, name: str, age_days: float) -> Path:
+    project = root / name
+    artifact = project / "node_modules"
+    artifact.mkdir(parents=True)
+    (project / "package.json").write_text("{}")
+    (artifact / "index.js").write_bytes(b"x" * 100)
+
+    when = time.time() - age_days * 86400
+    for path in (project / "package.json", artifact / "index.js", artifact):
+        os.utime(path, (when, when))
+    return project
+
+
+def test_older_than_uses_markers_and_file_times(tmp_path):
+    make_node_tree(tmp_path, "stale", 90)
+    make_node_tree(tmp_path, "edited", 90)
+    os.utime(tmp_path / "edited" / "package.json")
+    used = make_node_tree(tmp_path, "used", 90)
+    now = time.time()
+    os.utime(used / "node_modules" / "index.js", (now, now - 90 * 86400))
+
+    result = scan_directory(tmp_path, older_than=parse_age("30d"))
+
+    assert [p.path.name for p in result.projects] == ["stale"]
+    assert result.projects[0].artifacts[0].last_used < datetime.now() - timedelta(days=80)
+
+
+def test_older_than_probes_cached_artifacts(tmp_path):
+    make_node_tree(tmp_path, "stale", 90)
+    cache = ScanCache(tmp_path / "cache.sqlite3")
+
+    scan_directory(tmp_path / "stale", cache=cache)
+    result = scan_directory(tmp_path / "stale", cache=cache, older_than=parse_age("30d"))
+
+    assert cache.hits > 0
+    assert result.total_artifacts == 1
+    assert result.projects[0].artifacts[0].last_used is not None
+    cache.close()
+
+
+def test_parse_age():
+    assert parse_age("30d") == 30 * 86400
+    assert parse_age("12h") == 12 * 3600
+    assert parse_age("2") == 2 * 86400
+    with pytest.raises(ValueError):
+        parse_age("soon")
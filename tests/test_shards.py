@@ -0,0 +1,48 @@
+"""
+    Sharded scanner Test
+"""
+
+import pytest
+
+from scythe.config import build_rules
+from scythe.models.compact import CompactScanResult
+from scythe.scanner.scanner import scan_directory
+from scythe.scanner.shards import ShardedScanner
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    for group in range(3):
+        for index in range(4):
+            project = tmp_path / f"group-{group}" / "nested" / f"app-{index}"
+            (project / "node_modules" / "lib").mkdir(parents=True)
+            (project / "package.json").write_text("{}")
+            (project / "node_modules" / "lib" / "index.js").write_bytes(b"x" * (100 * group + index + 1))
+    (tmp_path / "infra" / ".terraform").mkdir(parents=True)
+    (tmp_path / "infra" / "main.tf").write_text("")
+    (tmp_path / "infra" / ".terraform" / "plugin").write_bytes(b"x" * 1000)
+    return tmp_path
+
+
+def test_sharded_scan_matches_single_process(workspace):
+    expected = scan_directory(workspace)
+
+    scanner = ShardedScanner(workspace, processes=3, shard_directories=2)
+    result = scanner.scan()
+
+    assert scanner.shards > 3
+    assert [p.path for p in result.projects] == sorted(p.path for p in expected.projects)
+    assert result.total_artifacts_size == expected.total_artifacts_size
+    assert result.directories_scanned == expected.directories_scanned
+    assert result.files_scanned == expected.files_scanned
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_sharded_scan_top_and_custom_rules(workspace, compact):
+    rules = build_rules([("test", {"rules": {"terraform": {"markers": ["*.tf"], "artifacts": [".terraform"]}}})])
+
+    result = ShardedScanner(workspace, processes=2, shard_directories=3, top=3, compact=compact, rules=rules).scan()
+
+    assert isinstance(result, CompactScanResult) == compact
+    assert [a.size_bytes for p in result.projects for a in p.artifacts] == [1000, 204, 203]
+    assert result.projects[0].project_type.value == "terraform"
@@ -0,0 +1,165 @@
+"""
+    Size engine Test
+"""
+
+import pytest
+from pathlib import Path
+
+import os
+
+from scythe.sizer.sizer import InodeSet, SizeAccounting, SizeEngine
+from scythe.scanner.scanner import scan_directory
+from scythe.utils.utils import calculate_directory_size
+
+
+@pytest.fixture
+def artifact_trees(tmp_path):
+    trees = []
+
+    for i in range(3):
+        tree = tmp_path / f"tree-{i}"
+        for j in range(4):
+            package = tree / f"pkg{j}" / "lib" / "deep"
+            package.mkdir(parents=True)
+            (package / "index.js").write_text("x" * (i + 1) * 100)
+            (package.parent / "lib.js").write_text("y" * j)
+        (tree / "root.txt").write_text("root")
+        trees.append(tree)
+
+    return trees
+
+
+def test_size_engine_serial(artifact_trees):
+    with SizeEngine(jobs=1) as engine:
+        assert not engine.is_parallel
+        assert engine.size(artifact_trees[0]) == calculate_directory_size(artifact_trees[0])
+
+
+def test_size_engine_parallel_keeps_order(artifact_trees):
+    expected = [calculate_directory_size(tree) for tree in artifact_trees]
+
+    with SizeEngine(jobs=4, split_depth=1) as engine:
+        assert engine.size_many(artifact_trees) == expected
+
+
+def test_size_engine_missing_directory(tmp_path):
+    with SizeEngine(jobs=2) as engine:
+        assert engine.size(tmp_path / "missing") == 0
+
+
+def test_scan_with_jobs_is_deterministic(tmp_path):
+    for i in range(5):
+        project = tmp_path / f"app-{i}"
+        (project / "node_modules" / "pkg").mkdir(parents=True)
+        (project / "package.json").write_text("{}")
+        (project / "node_modules" / "pkg" / "index.js").write_text("z" * (i + 1))
+
+    serial = scan_directory(tmp_path)
+    parallel = scan_directory(tmp_path, jobs=4)
+
+    assert [p.path for p in parallel.projects] == [p.path for p in serial.projects]
+    assert [p.total_artifact_size for p in parallel.projects] == [p.total_artifact_size for p in serial.projects]
+    assert parallel.total_artifacts_size == serial.total_artifacts_size == 15
+
+
+@pytest.fixture
+def hard_linked_stores(tmp_path):
+    store_a = tmp_path / "a" / "node_modules"
+    store_b = tmp_path / "b" / "node_modules"
+    store_a.mkdir(parents=True)
+    store_b.mkdir(parents=True)
+
+    (store_a / "shared.js").write_text("s" * 1000)
+    os.link(store_a / "shared.js", store_b / "shared.js")
+    (store_a / "internal.js").write_text("i" * 100)
+    os.link(store_a / "internal.js", store_a / "internal-copy.js")
+    (store_b / "own.js").write_text("o" * 10)
+
+    return store_a, store_b
+
+
+def test_inode_set_merges_into_sorted_array(monkeypatch):
+    monkeypatch.setattr(InodeSet, "MIN_MERGE", 4)
+    inodes = InodeSet()
+
+    for ino in [9, 3, 7, 1, 5, 2]:
+        assert inodes.add(1, ino)
+    assert not inodes.add(1, 3)
+    assert not inodes.add(1, 2)
+    assert inodes.add(2, 3)
+
+    assert len(inodes) == 7
+    assert (1, 9) in inodes
+    assert (2, 9) not in inodes
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_size_engine_counts_hard_links_once(hard_linked_stores, jobs):
+    store_a, store_b = hard_linked_stores
+
+    with SizeEngine(jobs=jobs, split_depth=1, accounting=SizeAccounting(deduplicate=True)) as engine:
+        usage_a = engine.measure(store_a)
+        usage_b = engine.measure(store_b)
+
+    assert usage_a.apparent_bytes == 1100
+    assert usage_b.apparent_bytes == 10
+    # shared.js is also linked from b, deleting a frees only internal.js
+    assert usage_a.exclusive_bytes == 100
+    assert usage_b.exclusive_bytes == 10
+
+
+def test_size_engine_without_dedupe_counts_every_link(hard_linked_stores):
+    store_a, _ = hard_linked_stores
+
+    with SizeEngine() as engine:
+        usage = engine.measure(store_a)
+
+    assert usage.apparent_bytes == 1200
+    assert usage.exclusive_bytes is None
+
+
+def test_allocated_size_of_sparse_file(tmp_path):
+    tree = tmp_path / "target"
+    tree.mkdir()
+    with open(tree / "sparse.bin", "wb") as sparse:
+        sparse.truncate(64 * 1024 * 1024)
+
+    with SizeEngine(accounting=SizeAccounting(size_mode="allocated")) as engine:
+        usage = engine.measure(tree)
+        assert engine.size(tree) == usage.allocated_bytes
+
+    assert usage.apparent_bytes == 64 * 1024 * 1024
+    assert usage.allocated_bytes < usage.apparent_bytes
+
+
+def test_unknown_size_mode():
+    with pytest.raises(ValueError):
+        SizeAccounting(size_mode="blocks")
+
+
+@pytest.fixture
+def symlink_loops(tmp_path):
+    workspace = tmp_path / "workspace"
+    library = workspace / "app" / "node_modules" / "lib"
+    library.mkdir(parents=True)
+    (workspace / "app" / "package.json").write_text("{}")
+    (library / "index.js").write_bytes(b"x" * 1000)
+
+    # pnpm-like link back to the package root, workspace linked to its parent
+    os.symlink(workspace / "app" / "node_modules", library / "self")
+    os.symlink(workspace, workspace / "parent")
+    os.symlink(workspace / "app", workspace / "alias")
+    return workspace
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_follow_symlinks_walks_every_directory_once(symlink_loops, jobs):
+    result = scan_directory(symlink_loops, follow_symlinks=True, jobs=jobs)
+
+    assert result.total_projects == 1
+    assert result.total_artifacts_size == 1000
+    assert calculate_directory_size(symlink_loops / "app" / "node_modules", follow_symlinks=True) == 1000
+
+    with SizeEngine(jobs, follow_symlinks=True) as engine:
+        sizes = engine.size_many([symlink_loops / "app", symlink_loops / "alias"])
+    assert sorted(sizes) == [0, 1002]
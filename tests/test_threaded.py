@@ -0,0 +1,92 @@
+"""
+    Threaded scanner Test
+"""
+
+import time
+
+import pytest
+
+from scythe.scanner import threaded
+from scythe.scanner.scanner import iter_projects, scan_directory
+from scythe.scanner.threaded import ThreadedDirectoryScanner, default_walkers
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    for group in range(3):
+        for index in range(5):
+            project = tmp_path / f"group-{group}" / "nested" / f"app-{index}"
+            (project / "node_modules" / "lib").mkdir(parents=True)
+            (project / "package.json").write_text("{}")
+            (project / "node_modules" / "lib" / "index.js").write_bytes(b"x" * (100 * group + index + 1))
+    return tmp_path
+
+
+def test_threaded_scan_matches_serial_scan(workspace):
+    expected = scan_directory(workspace)
+
+    scanner = ThreadedDirectoryScanner(workspace, walkers=3, max_depth=-1)
+    result = scanner.scan()
+
+    assert [p.path for p in result.projects] == [p.path for p in expected.projects]
+    assert result.total_artifacts_size == expected.total_artifacts_size
+    # Per-walker counters are merged once the walk ends
+    assert result.directories_scanned == expected.directories_scanned
+    assert result.files_scanned == expected.files_scanned
+
+    streamed = iter_projects(workspace, walkers=3)
+    next(streamed)
+    streamed.close()
+
+
+@pytest.mark.parametrize("walkers, reorder_buffer", [(2, 4096), (4, 4096), (8, 4096), (4, 1), (8, 3)])
+def test_threaded_scan_keeps_walk_order(tmp_path, monkeypatch, walkers, reorder_buffer):
+    # A small buffer holds walkers back most of the time
+    monkeypatch.setattr(threaded, "REORDER_BUFFER", reorder_buffer)
+
+    # Nested projects and uneven subtrees, so walkers finish out of order
+    for index in range(40):
+        project = tmp_path.joinpath(*(f"d{level}-{index % (level + 2)}" for level in range(index % 6)), f"app-{index}")
+        (project / "node_modules").mkdir(parents=True, exist_ok=True)
+        (project / "package.json").write_text("{}")
+        (project / "sub" / "lib").mkdir(parents=True, exist_ok=True)
+        (project / "sub" / "lib" / "setup.py").write_text("")
+
+    expected = [p.path for p in iter_projects(tmp_path, prune_artifacts=False)]
+
+    for _ in range(5):
+        assert [p.path for p in iter_projects(tmp_path, prune_artifacts=False, walkers=walkers)] == expected
+
+
+def test_default_walkers_follows_the_gil(monkeypatch):
+    monkeypatch.setattr(threaded.os, "cpu_count", lambda: 8)
+
+    monkeypatch.setattr(threaded.sys, "_is_gil_enabled", lambda: True, raising=False)
+    assert not threaded.free_threaded()
+    assert default_walkers() == 1
+
+    monkeypatch.setattr(threaded.sys, "_is_gil_enabled", lambda: False, raising=False)
+    assert threaded.free_threaded()
+    assert default_walkers() == 8
+
+
+def test_threaded_scan_bounds_the_reorder_buffer(tmp_path, monkeypatch):
+    for index in range(60):
+        project = tmp_path / f"group-{index % 3}" / f"app-{index}"
+        (project / "node_modules").mkdir(parents=True)
+        (project / "package.json").write_text("{}")
+    monkeypatch.setattr(threaded, "REORDER_BUFFER", 4)
+
+    scanner = ThreadedDirectoryScanner(tmp_path, walkers=4, max_depth=-1)
+    buffered = []
+    visit = scanner._visit
+    monkeypatch.setattr(scanner, "_visit", lambda *args: (buffered.append(scanner._buffered), visit(*args))[1])
+
+    # Slow consumer: the walkers must wait for it instead of running ahead
+    projects = []
+    for project in scanner.iter_projects():
+        projects.append(project)
+        time.sleep(0.001)
+
+    assert len(projects) == 60
+    assert max(buffered) <= 4 + 4